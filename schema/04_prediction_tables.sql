@@ -11,4 +11,52 @@ CREATE TABLE image_prediction (
     created_at TIMESTAMP,
     updated_at TIMESTAMP,
     PRIMARY KEY (batch_key, product_key)
-); 
\ No newline at end of file
+); 
+
+CREATE TABLE batch_checkpoint (
+    batch_key UUID PRIMARY KEY,
+    last_product_key UUID,
+    products_processed BIGINT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE llm_verdict_cache (
+    verdict_key TEXT PRIMARY KEY,
+    colour_status TEXT,
+    colour_justification TEXT,
+    image_summary TEXT,
+    description_synthesis TEXT,
+    final_colour_status TEXT,
+    final_colour_justification TEXT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+CREATE TABLE batch_llm_usage (
+    batch_key UUID,
+    model TEXT,
+    stage TEXT,
+    calls BIGINT,
+    failures BIGINT,
+    retries BIGINT,
+    input_tokens BIGINT,
+    cached_input_tokens BIGINT,
+    output_tokens BIGINT,
+    latency_seconds DOUBLE PRECISION,
+    cost_usd DOUBLE PRECISION,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    PRIMARY KEY (batch_key, model, stage)
+);
+
+CREATE TABLE batch_failed_product (
+    batch_key UUID,
+    product_key UUID,
+    stage TEXT,
+    error TEXT,
+    attempts BIGINT,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    PRIMARY KEY (batch_key, product_key)
+);
@@ -0,0 +1,8 @@
+CREATE INDEX IF NOT EXISTS product_product_key_idx
+    ON product (product_key);
+
+CREATE INDEX IF NOT EXISTS product_attribute_value_product_key_idx
+    ON product_attribute_value (product_key);
+
+CREATE INDEX IF NOT EXISTS image_file_path_mapping_image_url_idx
+    ON image_file_path_mapping (image_url);
@@ -0,0 +1,89 @@
+-- Pre-built product overviews, one row per product, read by
+-- AsyncProductOverviewRepository (with PRODUCT_OVERVIEW_MATERIALIZED=true)
+-- instead of joining at request time. Refresh after ingest with:
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY product_overview;
+-- (see src/core/data_ingestion/jobs/refresh_product_overview.py).
+-- A refresh recomputes the whole view; CONCURRENTLY only keeps readers
+-- unblocked while it runs.
+
+-- Mirrors trim_image_url in src/core/image_encoding/filepath_mapping.py.
+CREATE OR REPLACE FUNCTION trim_image_url(image_url TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(
+        substring(image_url FROM '(?i)^.*?\.(?:jpg|jpeg|png|webp|gif)'),
+        image_url
+    )
+$$;
+
+CREATE OR REPLACE FUNCTION image_local_path(image_url TEXT)
+RETURNS TEXT
+LANGUAGE sql STABLE AS $$
+    SELECT 'data/image/' || regexp_replace(m.image_path, '^.*[/\\]', '')
+    FROM image_file_path_mapping m
+    WHERE m.image_url = trim_image_url($1)
+    ORDER BY m.image_path
+    LIMIT 1
+$$;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS product_overview AS
+SELECT DISTINCT ON (p.product_key)
+    p.product_key,
+    p.system_name,
+    p.friendly_name,
+    dco.product_code,
+    dco.product_title,
+    dco.product_url,
+    dco.category_0,
+    dco.category_1,
+    dco.category_2,
+    dco.category_3,
+    dco.description_text,
+    dco.specification_text,
+    dco.specification_attributes_xml,
+    image_local_path(dco.image_url_1) AS image_local_path_1,
+    image_local_path(dco.image_url_2) AS image_local_path_2,
+    image_local_path(dco.image_url_3) AS image_local_path_3,
+    image_local_path(dco.image_url_4) AS image_local_path_4,
+    image_local_path(dco.image_url_5) AS image_local_path_5,
+    image_local_path(dco.image_url_6) AS image_local_path_6,
+    image_local_path(dco.image_url_7) AS image_local_path_7,
+    image_local_path(dco.image_url_8) AS image_local_path_8,
+    image_local_path(dco.image_url_9) AS image_local_path_9,
+    image_local_path(dco.image_url_10) AS image_local_path_10,
+    dco.now_price,
+    dco.was_price,
+    dco.save_message,
+    dco.on_promotion,
+    dco.review_count,
+    dco.review_rating,
+    COALESCE(av.attribute_values, '[]'::jsonb) AS attribute_values
+FROM product p
+JOIN dunelm_coalesce_output dco
+    ON dco.product_url = p.system_name
+LEFT JOIN LATERAL (
+    SELECT jsonb_agg(
+        jsonb_build_object(
+            'attribute_key', pav.attribute_key::text,
+            'attribute_name', a.friendly_name,
+            'value', pav.value,
+            'unit', pav.unit,
+            'minimum_value', pav.minimum_value,
+            'minimum_unit', pav.minimum_unit,
+            'maximum_value', pav.maximum_value,
+            'maximum_unit', pav.maximum_unit,
+            'range_qualifier_enum', pav.range_qualifier_enum
+        )
+        ORDER BY a.friendly_name, pav.attribute_key
+    ) AS attribute_values
+    FROM product_attribute_value pav
+    LEFT JOIN attribute a
+        ON a.attribute_key = pav.attribute_key
+    WHERE pav.product_key = p.product_key
+) av ON TRUE
+-- Of several coalesce rows for a product, keep the lowest product_code.
+ORDER BY p.product_key, dco.product_code;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE UNIQUE INDEX IF NOT EXISTS product_overview_product_key_idx
+    ON product_overview (product_key);
@@ -18,3 +18,4 @@ python -m src.core.data_ingestion.jobs.ingest_csvs data/csv/Category.csv categor
 python -m src.core.data_ingestion.jobs.ingest_csvs data/csv/AttributeAllowableValuesApplicableInEveryCategory.csv attribute_allowable_values_applicable_in_every_category
 python -m src.core.data_ingestion.jobs.ingest_csvs data/csv/AttributeAllowableValueInAnyCategory.csv attribute_allowable_value_in_any_category
 python -m src.core.data_ingestion.jobs.ingest_csvs data/csv/Attribute.csv attribute
+python -m src.core.data_ingestion.jobs.refresh_product_overview
@@ -1,15 +1,15 @@
 import asyncio
 import logging
+import signal
 import sys
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-
 from src.common.db.base import uuid as uuid4
-from src.common.db.engine import engine
 from src.common.llm import Llm
+from src.config import config
+from src.core.image_text_alignment.batch_runner import BatchRunner
 from src.core.image_text_alignment.repositories import (
-    ProductOverviewRepository,
+    AsyncProductOverviewRepository,
 )
 from src.core.image_text_alignment.service import ImageTextAlignmentService
 
@@ -18,40 +18,74 @@ logger = logging.getLogger(__name__)
 
 
 def main(batch_key: str | None = None):
+    if batch_key is not None:
+        batch_uuid = UUID(batch_key)
+        logger.info(f"Using provided batch key: {batch_uuid}")
+    else:
+        batch_uuid = uuid4()
+        logger.info(f"Generated new batch key: {batch_uuid}")
+
     async def run():
-        with Session(engine) as session:
-            if batch_key is not None:
-                batch_uuid = UUID(batch_key)
-                logger.info(f"Using provided batch key: {batch_uuid}")
-            else:
-                batch_uuid = uuid4()
-                logger.info(f"Generated new batch key: {batch_uuid}")
-
-            product_overview_repo = ProductOverviewRepository(session)
-            llm = Llm()
-            service = ImageTextAlignmentService(
-                product_overview_repo=product_overview_repo, llm=llm
+        # Cancel cleanly on SIGINT/SIGTERM so buffered results are flushed
+        # and the checkpoint is saved before exiting.
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+
+        service = ImageTextAlignmentService(
+            product_overview_repo=AsyncProductOverviewRepository(), llm=Llm()
+        )
+        runner = BatchRunner(service, batch_uuid)
+        if runner.use_batch_api:
+            logger.info(
+                f"Using the {config.LLM_BATCH_PROVIDER} batch API "
+                f"({config.LLM_BATCH_MAX_REQUESTS} requests per job)"
             )
-            logger.info(f"Async worker pool size: {service.max_workers}")
-            product_keys = service.check_unprocessed_products(
-                session, batch_uuid
+        else:
+            logger.info(f"LLM worker ceiling: {service.max_workers}")
+        summary = await runner.run()
+        logger.info(
+            f"Processing complete. {summary.products_processed} "
+            f"products processed in {summary.elapsed_seconds:.1f}s: "
+            f"{summary.status_counts}"
+        )
+        if summary.products_failed:
+            logger.warning(
+                f"{summary.products_failed} products failed and were "
+                f"skipped; rerun with batch key {batch_uuid} to retry them"
             )
-            if not product_keys:
-                logger.info("No unprocessed product keys found for the batch.")
-                return
+        for usage in summary.llm_usage:
             logger.info(
-                f"Starting processing for {len(product_keys)} "
-                "unprocessed products."
+                f"Prompt cache hit rate for {usage.stage}: "
+                f"{usage.cache_hit_rate:.1%} of {usage.input_tokens} "
+                f"input tokens"
             )
-
-            results = await service.check_images_for_products(
-                product_keys, batch_key=batch_uuid
+        for batch_usage in summary.batch_llm_usage:
+            cost = (
+                f"${batch_usage.cost_usd:.4f}"
+                if batch_usage.cost_usd is not None
+                else "unpriced"
+            )
+            logger.info(
+                f"Batch LLM usage for {batch_usage.stage} on "
+                f"{batch_usage.model}: {batch_usage.calls} calls, "
+                f"{batch_usage.latency_seconds:.1f}s in calls, {cost}"
             )
+        cache_stats = summary.verdict_cache
+        if cache_stats is not None:
             logger.info(
-                f"Processing complete. {len(results)} products processed."
+                f"Verdict cache hit rate: {cache_stats.hit_rate:.1%} "
+                f"({cache_stats.hits} hits, {cache_stats.misses} misses)"
             )
 
-    asyncio.run(run())
+    try:
+        asyncio.run(run())
+    except asyncio.CancelledError:
+        logger.info(
+            f"Interrupted. Resume with: "
+            f"python process_all_products.py {batch_uuid}"
+        )
 
 
 if __name__ == "__main__":
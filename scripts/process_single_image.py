@@ -9,7 +9,7 @@ from src.common.db.engine import engine
 from src.common.llm import Llm
 from src.core.data_ingestion.queries import get_random_product_keys
 from src.core.image_text_alignment.repositories import (
-    ProductOverviewRepository,
+    AsyncProductOverviewRepository,
 )
 from src.core.image_text_alignment.service import ImageTextAlignmentService
 
@@ -41,7 +41,7 @@ def main(product_key: str | None = None):
                 print(f"Randomly selected product_key: {key}")
             else:
                 key = product_key
-            product_overview_repo = ProductOverviewRepository(session)
+            product_overview_repo = AsyncProductOverviewRepository()
             llm = Llm()
             service = ImageTextAlignmentService(
                 product_overview_repo=product_overview_repo, llm=llm
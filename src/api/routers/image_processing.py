@@ -1,15 +1,32 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 
 from src.api.dto.image_processing import ImageProcessingResponse
-from src.common.db import get_db
 from src.common.llm import Llm
+from src.config import config
 from src.core.image_text_alignment.repositories import (
-    ProductOverviewRepository,
+    AsyncProductOverviewRepository,
 )
 from src.core.image_text_alignment.service import ImageTextAlignmentService
 
 
+@lru_cache(maxsize=1)
+def get_llm() -> Llm:
+    """The default Llm, shared by every request."""
+    return Llm()
+
+
+@lru_cache(maxsize=1)
+def get_service() -> ImageTextAlignmentService:
+    """The alignment service, shared by every request."""
+    return ImageTextAlignmentService(
+        product_overview_repo=AsyncProductOverviewRepository(),
+        llm=get_llm(),
+        use_verdict_cache=config.VERDICT_CACHE_API_ENABLED,
+    )
+
+
 def image_processing_router() -> APIRouter:
     router = APIRouter(prefix="/image-processing", tags=["image-processing"])
 
@@ -17,14 +34,10 @@ def image_processing_router() -> APIRouter:
         "/predict/{product_key}", response_model=ImageProcessingResponse
     )
     async def check_colour_matches_description(
-        product_key: str, db: Session = Depends(get_db)
+        product_key: str,
+        service: ImageTextAlignmentService = Depends(get_service),
     ) -> ImageProcessingResponse:
-        llm = Llm()
-        service = ImageTextAlignmentService(
-            product_overview_repo=ProductOverviewRepository(session=db),
-            llm=llm,
-        )
-        predictions = await service.check_images_for_products([product_key])
-        return ImageProcessingResponse(predictions=predictions)
+        prediction = await service.check_image_for_product(product_key)
+        return ImageProcessingResponse(predictions=[prediction])
 
     return router
@@ -0,0 +1,16 @@
+from .adaptive_limiter import AdaptiveConcurrencyLimiter, AdaptiveLimiterStats
+from .circuit_breaker import CircuitBreaker, CircuitBreakerStats
+from .pipeline import Pipeline, PipelineStats, Stage
+from .worker_pool import WorkerPool, WorkerPoolStats
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "AdaptiveLimiterStats",
+    "CircuitBreaker",
+    "CircuitBreakerStats",
+    "Pipeline",
+    "PipelineStats",
+    "Stage",
+    "WorkerPool",
+    "WorkerPoolStats",
+]
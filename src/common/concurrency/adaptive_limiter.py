@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from pydantic import BaseModel
+
+from src.common.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class AdaptiveLimiterStats(BaseModel):
+    """Current limit and outcome counters for an adaptive limiter."""
+
+    name: str
+    limit: float
+    min_limit: int
+    max_limit: int
+    in_flight: int
+    successes: int
+    overloads: int
+    errors: int
+    latency_seconds: float | None
+    baseline_latency_seconds: float | None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit tuned by additive increase, multiplicative decrease.
+
+    Each call holds a slot for its duration. While calls succeed and the
+    smoothed latency stays within `latency_tolerance` times the best
+    latency seen, the limit grows by roughly one per window of `limit`
+    successes. An overload error (as decided by `is_overload`, e.g. a 429
+    or a timeout) multiplies the limit by `backoff_factor`, at most once
+    per smoothed latency so a burst of failures from the same window
+    counts once. Other errors leave the limit unchanged.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        is_overload: Callable[[BaseException], bool],
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.is_overload = is_overload
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self._in_flight = 0
+        self._condition: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._latency: float | None = None
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self._successes = 0
+        self._overloads = 0
+        self._errors = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one unit of concurrency for the duration of a call."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(
+                lambda: self._in_flight < math.floor(self.limit)
+            )
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if self.is_overload(e):
+                self._on_overload()
+            else:
+                self._errors += 1
+            raise
+        else:
+            self._on_success(time.perf_counter() - started)
+        finally:
+            async with condition:
+                self._in_flight -= 1
+                condition.notify_all()
+
+    def stats(self) -> AdaptiveLimiterStats:
+        return AdaptiveLimiterStats(
+            name=self.name,
+            limit=self.limit,
+            min_limit=self.min_limit,
+            max_limit=self.max_limit,
+            in_flight=self._in_flight,
+            successes=self._successes,
+            overloads=self._overloads,
+            errors=self._errors,
+            latency_seconds=self._latency,
+            baseline_latency_seconds=self._baseline,
+        )
+
+    def _get_condition(self) -> asyncio.Condition:
+        # The limiter may outlive an event loop (e.g. successive
+        # asyncio.run calls); asyncio primitives are bound to one loop.
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._condition
+
+    def _on_success(self, latency: float) -> None:
+        self._successes += 1
+        self._latency = (
+            latency
+            if self._latency is None
+            else self.smoothing * latency
+            + (1 - self.smoothing) * self._latency
+        )
+        if self._baseline is None or self._latency < self._baseline:
+            self._baseline = self._latency
+        if self._latency <= self._baseline * self.latency_tolerance:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_overload(self) -> None:
+        self._overloads += 1
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * self.backoff_factor)
+        logger.info(
+            f"{self.name}: overloaded, concurrency limit "
+            f"{previous:.1f} -> {self.limit:.1f}"
+        )
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+from pydantic import BaseModel
+
+from src.common.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreakerStats(BaseModel):
+    name: str
+    state: str
+    successes: int
+    failures: int
+    opened: int
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an endpoint that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    `allow` refuses calls for `cooldown` seconds. It then half-opens and
+    lets a single trial call through: a success closes it again, a
+    failure reopens it for another cooldown.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int, cooldown: float
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._successes = 0
+        self._failures = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == OPEN
+                and time.monotonic() - self._opened_at >= self.cooldown
+            ):
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; claims the half-open trial."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # Half-open: let one trial through and hold the rest back
+            # until it reports.
+            self._state = HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                logger.info(f"{self.name}: circuit closed")
+                self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    f"{self.name}: circuit opened after "
+                    f"{self._consecutive_failures} consecutive failures"
+                )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._opened += 1
+
+    def stats(self) -> CircuitBreakerStats:
+        return CircuitBreakerStats(
+            name=self.name,
+            state=self.state,
+            successes=self._successes,
+            failures=self._failures,
+            opened=self._opened,
+        )
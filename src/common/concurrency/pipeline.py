@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+
+from pydantic import BaseModel
+
+from src.common.logging import setup_logging
+
+from .worker_pool import WorkerPool, WorkerPoolStats
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class Stage:
+    """
+    One step of a pipeline: an async function run by its own group of
+    `concurrency` workers, fed through a queue of at most `queue_size`
+    items.
+
+    With `batch_size` set, incoming items are grouped into lists of up to
+    that many and `func` takes a list and returns a list, whose items are
+    passed on one by one. The stage's counters then count batches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Awaitable[Any]],
+        concurrency: int,
+        queue_size: int | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("Stage batch size must be at least 1")
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+
+
+class PipelineStats(BaseModel):
+    """Per-stage counters and queue depths for a pipeline."""
+
+    name: str
+    stages: list[WorkerPoolStats]
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{s.name}: {s.completed} done, {s.in_flight}/{s.size} busy, "
+            f"queue {s.input_queue_depth}/{s.queue_size}"
+            for s in self.stages
+        )
+
+
+class Pipeline:
+    """
+    Chain of stages joined by bounded queues.
+
+    Each stage pulls from the output of the previous one, so when a stage
+    backs up its input queue fills and the stages before it block rather
+    than buffering without limit. Items are yielded in completion order.
+
+    By default an item whose stage raises stops the whole run. With
+    `on_error`, it is called with the stage name, the item (the whole
+    batch, for batched stages) and the error instead, and the item is
+    dropped while the run carries on.
+    """
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        name: str = "pipeline",
+        stats_log_interval: float = 0,
+        on_error: Callable[[str, Any, Exception], None] | None = None,
+    ) -> None:
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.name = name
+        self.stats_log_interval = stats_log_interval
+        self.pools: list[WorkerPool[Any, Any]] = [
+            WorkerPool(
+                stage.func,
+                size=stage.concurrency,
+                name=stage.name,
+                queue_size=stage.queue_size,
+                on_error=(
+                    partial(on_error, stage.name)
+                    if on_error is not None
+                    else None
+                ),
+            )
+            for stage in stages
+        ]
+
+    def stats(self) -> PipelineStats:
+        return PipelineStats(
+            name=self.name, stages=[pool.stats() for pool in self.pools]
+        )
+
+    async def run(
+        self, items: Iterable[Any] | AsyncIterable[Any]
+    ) -> AsyncIterator[Any]:
+        stream: AsyncGenerator[Any, None] = _passthrough(items)
+        for stage, pool in zip(self.stages, self.pools, strict=True):
+            if stage.batch_size is None:
+                stream = pool.map(stream)
+            else:
+                stream = _unbatch(pool.map(_batch(stream, stage.batch_size)))
+
+        monitor = (
+            asyncio.create_task(self._log_stats())
+            if self.stats_log_interval > 0
+            else None
+        )
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            if monitor is not None:
+                monitor.cancel()
+            await stream.aclose()
+
+    async def _log_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.stats_log_interval)
+            logger.info(f"{self.name} pipeline: {self.stats().summary()}")
+
+
+async def _passthrough(
+    items: Iterable[Any] | AsyncIterable[Any],
+) -> AsyncGenerator[Any, None]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _batch(
+    items: AsyncGenerator[Any, None], size: int
+) -> AsyncGenerator[list[Any], None]:
+    """Group items into lists of up to `size`, yielding each when full."""
+    batch: list[Any] = []
+    try:
+        async for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        await items.aclose()
+
+
+async def _unbatch(
+    batches: AsyncGenerator[list[Any], None],
+) -> AsyncGenerator[Any, None]:
+    try:
+        async for batch in batches:
+            for item in batch:
+                yield item
+    finally:
+        await batches.aclose()
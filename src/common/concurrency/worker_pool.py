@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import time
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    TypeVar,
+    cast,
+)
+
+from pydantic import BaseModel, computed_field
+
+from src.common.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class WorkerPoolStats(BaseModel):
+    """Point-in-time counters for a worker pool."""
+
+    name: str
+    size: int
+    submitted: int
+    completed: int
+    failed: int
+    in_flight: int
+    queue_size: int
+    input_queue_depth: int
+    output_queue_depth: int
+    elapsed_seconds: float
+    busy_seconds: float
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def throughput(self) -> float:
+        """Completed items per second since the pool started."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.completed / self.elapsed_seconds
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def utilisation(self) -> float:
+        """Fraction of available worker time spent processing items."""
+        if self.elapsed_seconds <= 0 or self.size <= 0:
+            return 0.0
+        return min(1.0, self.busy_seconds / (self.size * self.elapsed_seconds))
+
+
+class WorkerPool(Generic[T, R]):
+    """
+    Fixed-size pool of asyncio workers that keeps up to `size` items in
+    flight and yields results as soon as each one completes.
+
+    Workers pull from a bounded input queue, so a slow item only occupies
+    its own slot rather than holding back a whole chunk. Results are
+    yielded in completion order, not submission order. If processing an
+    item raises, the remaining work is cancelled and the error is raised
+    to the consumer, unless `on_error` is given: it is then called with
+    the item and the error, and the item is dropped while the rest carry
+    on.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[T], Awaitable[R]],
+        size: int,
+        name: str = "worker_pool",
+        queue_size: int | None = None,
+        on_error: Callable[[T, Exception], None] | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Worker pool size must be at least 1")
+        self.func = func
+        self.size = size
+        self.name = name
+        self.queue_size = queue_size or size
+        self.on_error = on_error
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._in_flight = 0
+        self._busy_seconds = 0.0
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._inputs: asyncio.Queue | None = None
+        self._outputs: asyncio.Queue | None = None
+
+    def stats(self) -> WorkerPoolStats:
+        now = time.perf_counter()
+        started = self._started_at if self._started_at is not None else now
+        finished = self._finished_at if self._finished_at is not None else now
+        return WorkerPoolStats(
+            name=self.name,
+            size=self.size,
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            in_flight=self._in_flight,
+            queue_size=self.queue_size,
+            input_queue_depth=self._inputs.qsize() if self._inputs else 0,
+            output_queue_depth=self._outputs.qsize() if self._outputs else 0,
+            elapsed_seconds=finished - started,
+            busy_seconds=self._busy_seconds,
+        )
+
+    async def map(
+        self, items: Iterable[T] | AsyncIterable[T]
+    ) -> AsyncGenerator[R, None]:
+        """Process items with the pool, yielding results as they finish."""
+        inputs: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        outputs: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._inputs, self._outputs = inputs, outputs
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+        feeder = asyncio.create_task(self._feed(items, inputs))
+        workers = [
+            asyncio.create_task(self._work(inputs, outputs))
+            for _ in range(self.size)
+        ]
+        tasks = [feeder, *workers]
+        try:
+            finished_workers = 0
+            while finished_workers < self.size:
+                item = await outputs.get()
+                if item is _DONE:
+                    finished_workers += 1
+                elif isinstance(item, _Failure):
+                    raise item.error
+                else:
+                    yield item
+            # Surface feeder errors (e.g. a failing key source).
+            await feeder
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._finished_at = time.perf_counter()
+            logger.debug(f"Worker pool finished: {self.stats()}")
+
+    async def _feed(
+        self, items: Iterable[T] | AsyncIterable[T], inputs: asyncio.Queue
+    ) -> None:
+        try:
+            if isinstance(items, AsyncIterable):
+                async for item in items:
+                    await inputs.put(item)
+                    self._submitted += 1
+            else:
+                for item in items:
+                    await inputs.put(item)
+                    self._submitted += 1
+        except Exception:
+            await self._stop_workers(inputs)
+            raise
+        finally:
+            # Close upstream generators (e.g. a previous pipeline stage) so
+            # their workers are cancelled along with ours.
+            if isinstance(items, AsyncGenerator):
+                await items.aclose()
+        await self._stop_workers(inputs)
+
+    async def _stop_workers(self, inputs: asyncio.Queue) -> None:
+        for _ in range(self.size):
+            await inputs.put(_DONE)
+
+    async def _work(
+        self, inputs: asyncio.Queue, outputs: asyncio.Queue
+    ) -> None:
+        try:
+            await self._work_items(inputs, outputs)
+        except Exception as e:
+            # A dying worker must still signal completion, or the
+            # consumer waits forever for its _DONE.
+            await outputs.put(_Failure(e))
+        await outputs.put(_DONE)
+
+    async def _work_items(
+        self, inputs: asyncio.Queue, outputs: asyncio.Queue
+    ) -> None:
+        while True:
+            item = await inputs.get()
+            if item is _DONE:
+                return
+            self._in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = await self.func(item)
+            except Exception as e:
+                self._failed += 1
+                if self.on_error is not None:
+                    self._report(item, e)
+                else:
+                    await outputs.put(_Failure(e))
+                continue
+            finally:
+                self._in_flight -= 1
+                self._busy_seconds += time.perf_counter() - started
+            self._completed += 1
+            await outputs.put(result)
+
+    def _report(self, item: T, error: Exception) -> None:
+        on_error = cast(Callable[[T, Exception], None], self.on_error)
+        try:
+            on_error(item, error)
+        except Exception:
+            logger.exception(
+                f"{self.name} error handler failed for an item that "
+                f"raised {error!r}"
+            )
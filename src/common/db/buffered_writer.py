@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from types import TracebackType
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from src.common.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+T = TypeVar("T")
+
+
+class BufferedWriterStats(BaseModel):
+    name: str
+    buffered: int
+    rows_written: int
+    flushes: int
+    flush_seconds: float
+
+
+class BufferedWriter(Generic[T]):
+    """
+    Write-behind buffer that collects items and hands them to `flush` in
+    batches, once `max_batch_size` items are waiting or every
+    `flush_interval` seconds, whichever comes first.
+
+    Use as an async context manager: anything still buffered is flushed
+    on exit, including when the surrounding task is cancelled. A failed
+    flush puts its batch back at the front of the buffer and re-raises.
+
+    An item accepted by `add` stays buffered until it is written, so a
+    failed flush that `add` triggers is logged rather than raised. Once
+    `max_buffered` items are waiting (default ten batches), `add` must
+    flush before it accepts another; if that fails it raises without
+    buffering the item, so a persistent failure holds up writers
+    instead of growing the buffer.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], Awaitable[None]],
+        max_batch_size: int,
+        flush_interval: float,
+        name: str = "buffered_writer",
+        max_buffered: int | None = None,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("Buffered writer batch size must be at least 1")
+        self._flush_func = flush
+        self.max_batch_size = max_batch_size
+        self.max_buffered = max(
+            max_buffered or 10 * max_batch_size, max_batch_size
+        )
+        self.flush_interval = flush_interval
+        self.name = name
+        self._buffer: list[T] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._rows_written = 0
+        self._flushes = 0
+        self._flush_seconds = 0.0
+
+    async def __aenter__(self) -> "BufferedWriter[T]":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    def start(self) -> None:
+        if self._timer is None and self.flush_interval > 0:
+            self._timer = asyncio.create_task(self._flush_periodically())
+
+    async def aclose(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            await asyncio.gather(self._timer, return_exceptions=True)
+            self._timer = None
+        await self.flush()
+        logger.info(f"{self.name} closed: {self.stats()}")
+
+    async def add(self, item: T) -> None:
+        while len(self._buffer) >= self.max_buffered:
+            await self.flush()
+        self._buffer.append(item)
+        if len(self._buffer) >= self.max_batch_size:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(
+                    f"{self.name} flush failed, {len(self._buffer)} rows "
+                    f"stay buffered: {e}"
+                )
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch_size]
+                del self._buffer[: self.max_batch_size]
+                started = time.perf_counter()
+                try:
+                    await self._flush_func(batch)
+                except BaseException:
+                    self._buffer[:0] = batch
+                    raise
+                self._flush_seconds += time.perf_counter() - started
+                self._flushes += 1
+                self._rows_written += len(batch)
+                logger.debug(f"{self.name} flushed {len(batch)} rows")
+
+    def stats(self) -> BufferedWriterStats:
+        return BufferedWriterStats(
+            name=self.name,
+            buffered=len(self._buffer),
+            rows_written=self._rows_written,
+            flushes=self._flushes,
+            flush_seconds=self._flush_seconds,
+        )
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"{self.name} periodic flush failed: {e}")
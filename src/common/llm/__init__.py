@@ -4,6 +4,7 @@ import pkgutil
 
 from src.common.logging import setup_logging
 
+from .batch_llm import BatchLlm
 from .embedding import Embedding
 from .image_processor import ImageEncoder
 from .llm import Llm
@@ -19,4 +20,4 @@ for _, name, is_pkg in pkgutil.iter_modules(__path__, __name__ + "."):
         except ImportError as e:
             logger.warning(f"Failed to import provider package {name}: {e}")
 
-__all__ = ["Llm", "Embedding", "ImageEncoder"]
+__all__ = ["Llm", "BatchLlm", "Embedding", "ImageEncoder"]
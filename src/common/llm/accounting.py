@@ -0,0 +1,219 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from pydantic import BaseModel, computed_field
+
+from src.common.llm.base_classes import LlmUsage
+from src.common.llm.pricing import usage_cost
+from src.common.llm.usage import LlmStageUsage
+
+
+class LlmCall(BaseModel):
+    """
+    Accounting for one `Llm` call: the tokens of every response it took,
+    including retried and hedged attempts, how often it was retried, and
+    its latency from first attempt to result.
+
+    Each response is priced at the model that served it, and the call is
+    attributed to the model of its last response: behind a router or a
+    hedge to another model, that is not the model the call asked for.
+    """
+
+    model: str
+    stage: str
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    failed: bool = False
+    # None until a response is served by a model with a price.
+    cost_usd: float | None = None
+
+    def add(
+        self,
+        usage: LlmUsage,
+        model: str | None = None,
+        price_factor: float = 1.0,
+    ) -> None:
+        """
+        Count a response's tokens, served by `model` if known and priced
+        at `price_factor` times the model's price.
+        """
+        if model is not None:
+            self.model = model
+        meter = _usage_meter.get()
+        if meter is not None:
+            meter.input_tokens += usage.input_tokens
+            meter.cached_input_tokens += usage.cached_input_tokens
+            meter.output_tokens += usage.output_tokens
+        self.input_tokens += usage.input_tokens
+        self.cached_input_tokens += usage.cached_input_tokens
+        self.output_tokens += usage.output_tokens
+        cost = usage_cost(
+            self.model,
+            LlmStageUsage(
+                stage=self.stage,
+                calls=1,
+                input_tokens=usage.input_tokens,
+                cached_input_tokens=usage.cached_input_tokens,
+                output_tokens=usage.output_tokens,
+            ),
+        )
+        if cost is not None:
+            self.cost_usd = (self.cost_usd or 0.0) + cost * price_factor
+
+    def total_usage(self) -> LlmUsage:
+        return LlmUsage(
+            input_tokens=self.input_tokens,
+            cached_input_tokens=self.cached_input_tokens,
+            output_tokens=self.output_tokens,
+        )
+
+
+class LlmCallStats(BaseModel):
+    """
+    Calls of one model in one stage: tokens, retries, latency and cost in
+    USD (None if the model has no price in `LLM_MODEL_PRICES`).
+    """
+
+    model: str
+    stage: str
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    cost_usd: float | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def since(self, earlier: "LlmCallStats | None") -> "LlmCallStats":
+        """The calls counted here but not yet in `earlier`."""
+        if earlier is None:
+            return self.model_copy()
+        cost = (
+            self.cost_usd - (earlier.cost_usd or 0.0)
+            if self.cost_usd is not None
+            else None
+        )
+        return LlmCallStats(
+            model=self.model,
+            stage=self.stage,
+            calls=self.calls - earlier.calls,
+            failures=self.failures - earlier.failures,
+            retries=self.retries - earlier.retries,
+            input_tokens=self.input_tokens - earlier.input_tokens,
+            cached_input_tokens=(
+                self.cached_input_tokens - earlier.cached_input_tokens
+            ),
+            output_tokens=self.output_tokens - earlier.output_tokens,
+            seconds=self.seconds - earlier.seconds,
+            cost_usd=cost,
+        )
+
+    def summary(self) -> str:
+        cost = f"${self.cost_usd:.4f}" if self.cost_usd is not None else "n/a"
+        return (
+            f"{self.stage} on {self.model}: {self.calls} calls "
+            f"({self.failures} failed, {self.retries} retries), "
+            f"{self.input_tokens} input tokens "
+            f"({self.cached_input_tokens} cached), "
+            f"{self.output_tokens} output tokens, "
+            f"{self.mean_seconds:.2f}s per call, cost {cost}"
+        )
+
+
+_current_call: ContextVar[LlmCall | None] = ContextVar(
+    "llm_call", default=None
+)
+
+
+_usage_meter: ContextVar[LlmUsage | None] = ContextVar(
+    "llm_usage_meter", default=None
+)
+
+
+@contextmanager
+def metered_usage() -> Iterator[LlmUsage]:
+    """
+    Sum the tokens of every response received inside the block, by any
+    Llm and including retried and hedged attempts.
+    """
+    meter = LlmUsage(input_tokens=0, output_tokens=0)
+    token = _usage_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _usage_meter.reset(token)
+
+
+def current_call() -> LlmCall | None:
+    """The call being accounted in this context, if any."""
+    return _current_call.get()
+
+
+def count_retry(details: Any = None) -> None:
+    """Count a retry of the current call; usable as a backoff handler."""
+    call = _current_call.get()
+    if call is not None:
+        call.retries += 1
+
+
+class LlmCallLedger:
+    """Sums the accounting of calls per model and stage."""
+
+    def __init__(self) -> None:
+        self._totals: dict[tuple[str, str], LlmCallStats] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def call(self, model: str, stage: str) -> Iterator[LlmCall]:
+        """
+        Account the call made inside the block. Responses and retries are
+        attributed to it through a context variable, so attempts made in
+        other tasks (e.g. hedged requests) count too.
+        """
+        call = LlmCall(model=model, stage=stage)
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            call.seconds = time.perf_counter() - started
+            _current_call.reset(token)
+            self.record(call)
+
+    def record(self, call: LlmCall) -> None:
+        cost = call.cost_usd
+        with self._lock:
+            key = (call.model, call.stage)
+            totals = self._totals.get(key)
+            if totals is None:
+                totals = self._totals[key] = LlmCallStats(
+                    model=call.model, stage=call.stage
+                )
+            totals.calls += 1
+            totals.failures += call.failed
+            totals.retries += call.retries
+            totals.input_tokens += call.input_tokens
+            totals.cached_input_tokens += call.cached_input_tokens
+            totals.output_tokens += call.output_tokens
+            totals.seconds += call.seconds
+            if cost is not None:
+                totals.cost_usd = (totals.cost_usd or 0.0) + cost
+
+    def stats(self) -> list[LlmCallStats]:
+        with self._lock:
+            return [totals.model_copy() for totals in self._totals.values()]
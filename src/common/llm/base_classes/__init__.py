@@ -1,5 +1,23 @@
+from .base_batch_llm import (
+    BATCH_TERMINAL_STATUSES,
+    BaseBatchLlmProvider,
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+)
 from .base_embedding import BaseEmbeddingProvider
 from .base_image_processor import BaseImageProcessor
-from .base_llm import BaseLlmProvider
+from .base_llm import BaseLlmProvider, LlmResponse, LlmUsage
 
-__all__ = ["BaseEmbeddingProvider", "BaseImageProcessor", "BaseLlmProvider"]
+__all__ = [
+    "BATCH_TERMINAL_STATUSES",
+    "BaseBatchLlmProvider",
+    "BaseEmbeddingProvider",
+    "BaseImageProcessor",
+    "BaseLlmProvider",
+    "BatchJob",
+    "BatchRequest",
+    "BatchResult",
+    "LlmResponse",
+    "LlmUsage",
+]
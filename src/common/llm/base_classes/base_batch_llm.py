@@ -0,0 +1,194 @@
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+from .base_llm import LlmUsage
+
+# Batch statuses follow the OpenAI Batch API; other providers map theirs.
+BATCH_TERMINAL_STATUSES = frozenset(
+    {"completed", "failed", "expired", "cancelled"}
+)
+
+
+class BatchRequest(BaseModel):
+    """One chat completion request in a batch file."""
+
+    custom_id: str
+    system: str
+    human: str
+    images: list[str] = []
+    # Chat completions `response_format`, e.g. a JSON schema.
+    response_format: dict[str, Any] | None = None
+
+
+class BatchResult(BaseModel):
+    """The outcome of one batch request: its content or an error."""
+
+    custom_id: str
+    content: str | None = None
+    error: str | None = None
+    usage: LlmUsage | None = None
+
+
+class BatchJob(BaseModel):
+    job_id: str
+    status: str
+    output_file: str | None = None
+    error_file: str | None = None
+    request_count: int = 0
+    completed_count: int = 0
+    failed_count: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in BATCH_TERMINAL_STATUSES
+
+
+class BaseBatchLlmProvider(ABC):
+    """
+    Base class for providers with an asynchronous batch API.
+
+    Requests are written to a JSONL file in the OpenAI batch format (one
+    chat completion request per line, identified by `custom_id`), which is
+    submitted as a job and polled until it reaches a terminal status.
+    Results are read back from the job's output and error files, which
+    use the OpenAI batch output format.
+    """
+
+    model: str
+    temperature: float
+    endpoint: str = "/v1/chat/completions"
+
+    def write_requests(
+        self, requests: Iterable[BatchRequest], path: Path
+    ) -> int:
+        """Write requests to a JSONL batch file and return their count."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with path.open("w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(self.request_line(request)) + "\n")
+                count += 1
+        return count
+
+    def read_requests(self, path: Path) -> list[BatchRequest]:
+        """Read back the requests of a batch file written by this class."""
+        with path.open(encoding="utf-8") as f:
+            return [self.parse_request_line(json.loads(line)) for line in f]
+
+    def request_line(self, request: BatchRequest) -> dict[str, Any]:
+        if request.images:
+            # Images before text, as in build_chat_messages.
+            human: str | list[dict[str, Any]] = [
+                *[
+                    {"type": "image_url", "image_url": {"url": url}}
+                    for url in request.images
+                ],
+                {"type": "text", "text": request.human},
+            ]
+        else:
+            human = request.human
+        body: dict[str, Any] = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": [
+                {"role": "system", "content": request.system},
+                {"role": "user", "content": human},
+            ],
+        }
+        if request.response_format is not None:
+            body["response_format"] = request.response_format
+        return {
+            "custom_id": request.custom_id,
+            "method": "POST",
+            "url": self.endpoint,
+            "body": body,
+        }
+
+    @staticmethod
+    def parse_request_line(line: dict[str, Any]) -> BatchRequest:
+        system, human = line["body"]["messages"]
+        content = human["content"]
+        response_format = line["body"].get("response_format")
+        if isinstance(content, str):
+            return BatchRequest(
+                custom_id=line["custom_id"],
+                system=system["content"],
+                human=content,
+                response_format=response_format,
+            )
+        return BatchRequest(
+            custom_id=line["custom_id"],
+            system=system["content"],
+            response_format=response_format,
+            human=next(p["text"] for p in content if p["type"] == "text"),
+            images=[
+                p["image_url"]["url"]
+                for p in content
+                if p["type"] == "image_url"
+            ],
+        )
+
+    @staticmethod
+    def parse_result_line(line: dict[str, Any]) -> BatchResult:
+        custom_id = line["custom_id"]
+        error = line.get("error")
+        if error:
+            return BatchResult(
+                custom_id=custom_id,
+                error=f"{error.get('code')}: {error.get('message')}",
+            )
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") != 200:
+            message = (body.get("error") or {}).get("message")
+            return BatchResult(
+                custom_id=custom_id,
+                error=f"HTTP {response.get('status_code')}: {message}",
+            )
+        usage = body.get("usage")
+        return BatchResult(
+            custom_id=custom_id,
+            content=body["choices"][0]["message"]["content"],
+            usage=(
+                LlmUsage(
+                    input_tokens=usage["prompt_tokens"],
+                    output_tokens=usage["completion_tokens"],
+                    cached_input_tokens=(
+                        usage.get("prompt_tokens_details") or {}
+                    ).get("cached_tokens")
+                    or 0,
+                )
+                if usage
+                else None
+            ),
+        )
+
+    def parse_results(self, text: str) -> list[BatchResult]:
+        return [
+            self.parse_result_line(json.loads(line))
+            for line in text.splitlines()
+            if line.strip()
+        ]
+
+    @abstractmethod
+    async def submit(self, path: Path) -> BatchJob:
+        """Upload a batch file and start a job for it."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    @abstractmethod
+    async def retrieve(self, job_id: str) -> BatchJob:
+        """Fetch the current status of a job."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    @abstractmethod
+    async def results(self, job: BatchJob) -> list[BatchResult]:
+        """Read the results of a finished job, including failed requests."""
+        raise NotImplementedError("Subclasses must implement this method")
+
+    @abstractmethod
+    async def cancel(self, job_id: str) -> None:
+        raise NotImplementedError("Subclasses must implement this method")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from typing import Any, AsyncIterator, TypeVar, cast
 
 import backoff
 from pydantic import BaseModel
@@ -9,7 +9,74 @@ from src.config import config
 T = TypeVar("T", bound=BaseModel)
 
 
+class LlmUsage(BaseModel):
+    input_tokens: int
+    output_tokens: int
+    # Input tokens served from the provider's prompt-prefix cache.
+    cached_input_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class LlmResponse(BaseModel):
+    """
+    Provider output with the response headers, token usage and the model
+    that served it (which a router or hedge may pick per call).
+    """
+
+    content: str
+    headers: dict[str, str] = {}
+    usage: LlmUsage | None = None
+    model: str | None = None
+
+    @classmethod
+    def from_message(
+        cls, message: Any, model: str | None = None
+    ) -> "LlmResponse":
+        """Build from a LangChain AIMessage served by `model`."""
+        metadata = getattr(message, "response_metadata", None) or {}
+        usage = getattr(message, "usage_metadata", None)
+        return cls(
+            content=cast(str, message.content),
+            headers={
+                str(k): str(v) for k, v in metadata.get("headers", {}).items()
+            },
+            usage=(
+                LlmUsage(
+                    input_tokens=usage["input_tokens"],
+                    output_tokens=usage["output_tokens"],
+                    cached_input_tokens=_cache_read_tokens(usage),
+                )
+                if usage
+                else None
+            ),
+            model=model,
+        )
+
+
+def _cache_read_tokens(usage: Any) -> int:
+    # LangChain prefixes the key with the service tier, e.g. "flex_".
+    details = usage.get("input_token_details") or {}
+    return sum(
+        count or 0
+        for key, count in details.items()
+        if key.endswith("cache_read")
+    )
+
+
 class BaseLlmProvider(ABC):
+    """
+    Base class for chat providers. `output_type` is the Pydantic model
+    the caller will parse the output into; providers that support
+    structured output constrain the response to its schema (see
+    `structured_output.response_format`), others may ignore it.
+    """
+
+    model: str
+    temperature: float
+
     @backoff.on_exception(
         backoff.expo,
         Exception,
@@ -22,8 +89,12 @@ class BaseLlmProvider(ABC):
     )
     @abstractmethod
     def invoke(
-        self, system: str, human: str, images: list[str] | None = None
-    ) -> str | dict:
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> str | LlmResponse:
         raise NotImplementedError(
             "invoke has not been defined for this class."
         )
@@ -40,8 +111,33 @@ class BaseLlmProvider(ABC):
     )
     @abstractmethod
     async def ainvoke(
-        self, system: str, human: str, images: list[str] | None = None
-    ) -> str | dict:
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> str | LlmResponse:
         raise NotImplementedError(
             "ainvoke has not been defined for this class."
         )
+
+    async def astream(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str | LlmResponse]:
+        """
+        Stream the completion as content deltas. Headers and usage may
+        arrive on any chunk. Providers without streaming yield the whole
+        response as one chunk.
+        """
+        yield await self.ainvoke(system, human, images, output_type)
+
+    async def awarm_up(self) -> None:
+        """
+        Open a connection to the provider ahead of the first call.
+        Providers without a network client have nothing to warm up.
+        """
+        return None
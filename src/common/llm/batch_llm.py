@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from src.common.llm.base_classes import (
+    BaseBatchLlmProvider,
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+)
+from src.common.llm.registry import get_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class BatchLlm:
+    """
+    Main class for running LLM requests through a provider's batch API.
+
+    Batch jobs trade latency (up to the provider's completion window) for
+    a separate, larger quota and a lower price per token, so they suit
+    offline runs. The provider must serve the same model as the
+    interactive Llm for results to be interchangeable.
+    """
+
+    def __init__(
+        self,
+        provider: str | None = None,
+        poll_interval: float | None = None,
+    ) -> None:
+        provider = (provider or config.LLM_BATCH_PROVIDER).lower()
+        logger.debug(f"Initialising batch LLM provider: {provider}")
+        provider_cls = get_provider("batch_llm", provider)
+        self._provider: BaseBatchLlmProvider = provider_cls()
+        self.provider_name = provider
+        self.model: str = self._provider.model
+        self.temperature: float = self._provider.temperature
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else config.LLM_BATCH_POLL_INTERVAL
+        )
+
+    def write_requests(
+        self, requests: Iterable[BatchRequest], path: Path
+    ) -> int:
+        return self._provider.write_requests(requests, path)
+
+    def read_requests(self, path: Path) -> list[BatchRequest]:
+        return self._provider.read_requests(path)
+
+    async def run(self, path: Path) -> dict[str, BatchResult]:
+        """
+        Submit a batch file, wait for the job to finish and return its
+        results by custom_id. Requests missing from the results (e.g.
+        when the job expired part-way) are returned as errors. The job is
+        cancelled if the caller is cancelled while waiting.
+
+        A file larger than `LLM_BATCH_MAX_FILE_BYTES` (inline images add
+        up quickly) is split into parts under the limit, which are
+        submitted as jobs of their own and run concurrently.
+        """
+        results: dict[str, BatchResult] = {}
+        parts = self._split(path)
+        for part_results in await asyncio.gather(*map(self._run_job, parts)):
+            results.update(part_results)
+        return results
+
+    async def _run_job(self, path: Path) -> dict[str, BatchResult]:
+        job = await self._provider.submit(path)
+        try:
+            job = await self._wait(job)
+        except asyncio.CancelledError:
+            logger.warning(f"Cancelling batch job {job.job_id}")
+            await asyncio.shield(self._provider.cancel(job.job_id))
+            raise
+        results = {
+            result.custom_id: result
+            for result in await self._provider.results(job)
+        }
+        for request in self.read_requests(path):
+            if request.custom_id not in results:
+                results[request.custom_id] = BatchResult(
+                    custom_id=request.custom_id,
+                    error=f"No result (batch job {job.status})",
+                )
+        logger.info(
+            f"Batch job {job.job_id} {job.status}: "
+            f"{sum(1 for r in results.values() if r.error is None)}/"
+            f"{len(results)} requests succeeded"
+        )
+        return results
+
+    @staticmethod
+    def _split(path: Path) -> list[Path]:
+        """
+        Split a batch file into parts of at most `LLM_BATCH_MAX_FILE_BYTES`
+        each, or return it as is if it fits. A single request over the
+        limit gets a part of its own, for the provider to reject.
+        """
+        limit = config.LLM_BATCH_MAX_FILE_BYTES
+        if path.stat().st_size <= limit:
+            return [path]
+        parts: list[Path] = []
+        part: BinaryIO | None = None
+        part_size = 0
+        try:
+            with path.open("rb") as f:
+                for line in f:
+                    if part is None or part_size + len(line) > limit:
+                        if part is not None:
+                            part.close()
+                        parts.append(
+                            path.with_suffix(f".part{len(parts) + 1}.jsonl")
+                        )
+                        part = parts[-1].open("wb")
+                        part_size = 0
+                    part.write(line)
+                    part_size += len(line)
+        finally:
+            if part is not None:
+                part.close()
+        logger.info(
+            f"Split batch file {path} into {len(parts)} parts of at most "
+            f"{limit} bytes"
+        )
+        return parts
+
+    async def _wait(self, job: BatchJob) -> BatchJob:
+        while not job.done:
+            await asyncio.sleep(self.poll_interval)
+            job = await self._provider.retrieve(job.job_id)
+            logger.debug(
+                f"Batch job {job.job_id}: {job.status} "
+                f"({job.completed_count}/{job.request_count} done)"
+            )
+        return job
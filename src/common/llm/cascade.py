@@ -0,0 +1,147 @@
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from pydantic import BaseModel, computed_field
+
+from .llm import Llm
+from .pricing import usage_cost
+from .usage import LlmStageUsage
+
+CHEAP_TIER = "cheap"
+PREMIUM_TIER = "premium"
+
+
+class CascadeTierStats(BaseModel):
+    """Calls, latency, tokens and cost of one model tier in one stage."""
+
+    tier: str
+    model: str
+    calls: int = 0
+    seconds: float = 0.0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class CascadeStageStats(BaseModel):
+    """How often a stage escalated from the cheap to the premium tier."""
+
+    stage: str
+    calls: int
+    escalated: int
+    threshold: float
+    tiers: list[CascadeTierStats]
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.calls if self.calls else 0.0
+
+    def summary(self) -> str:
+        tiers = "; ".join(
+            f"{tier.tier} {tier.model}: {tier.calls} calls, "
+            f"{tier.mean_seconds:.2f}s mean"
+            + (f", ${tier.cost_usd:.4f}" if tier.cost_usd is not None else "")
+            for tier in self.tiers
+        )
+        return (
+            f"{self.stage}: escalated {self.escalated} of {self.calls} "
+            f"({self.escalation_rate:.1%}); {tiers}"
+        )
+
+
+class ModelCascade:
+    """
+    A cheap model tried first and a premium model for what it is unsure of.
+
+    Callers ask the `cheap` Llm for an answer with a confidence and call
+    `premium` only when the confidence is below the stage's threshold
+    (or their own escalation rule says so), timing each call with
+    `tier`. Token usage and cost per tier come from each Llm's usage for
+    the stage, so both must be used only through the cascade for stages
+    it handles.
+    """
+
+    def __init__(
+        self, cheap: Llm, premium: Llm, thresholds: dict[str, float]
+    ) -> None:
+        self.cheap = cheap
+        self.premium = premium
+        self.thresholds = thresholds
+        self._lock = threading.Lock()
+        self._calls: dict[str, int] = {}
+        self._escalated: dict[str, int] = {}
+        self._tiers: dict[tuple[str, str], CascadeTierStats] = {}
+
+    def threshold(self, stage: str) -> float:
+        return self.thresholds.get(stage, 1.0)
+
+    def is_confident(self, stage: str, confidence: float) -> bool:
+        return confidence >= self.threshold(stage)
+
+    @asynccontextmanager
+    async def tier(self, stage: str, tier: str) -> AsyncIterator[Llm]:
+        """Time a call to one tier for a stage and yield its Llm."""
+        llm = self.cheap if tier == CHEAP_TIER else self.premium
+        started = time.perf_counter()
+        yield llm
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if tier == CHEAP_TIER:
+                self._calls[stage] = self._calls.get(stage, 0) + 1
+            else:
+                self._escalated[stage] = self._escalated.get(stage, 0) + 1
+            stats = self._tiers.get((stage, tier))
+            if stats is None:
+                stats = self._tiers[(stage, tier)] = CascadeTierStats(
+                    tier=tier, model=llm.model
+                )
+            stats.calls += 1
+            stats.seconds += elapsed
+
+    def stats(self) -> list[CascadeStageStats]:
+        usage = {
+            CHEAP_TIER: _by_stage(self.cheap.usage_stats()),
+            PREMIUM_TIER: _by_stage(self.premium.usage_stats()),
+        }
+        with self._lock:
+            stages = list(self._calls)
+            tiers = {
+                key: stats.model_copy() for key, stats in self._tiers.items()
+            }
+        results = []
+        for stage in stages:
+            stage_tiers = []
+            for tier in (CHEAP_TIER, PREMIUM_TIER):
+                stats = tiers.get((stage, tier))
+                if stats is None:
+                    continue
+                tier_usage = usage[tier].get(stage)
+                if tier_usage is not None:
+                    stats.input_tokens = tier_usage.input_tokens
+                    stats.cached_input_tokens = tier_usage.cached_input_tokens
+                    stats.output_tokens = tier_usage.output_tokens
+                    stats.cost_usd = usage_cost(stats.model, tier_usage)
+                stage_tiers.append(stats)
+            results.append(
+                CascadeStageStats(
+                    stage=stage,
+                    calls=self._calls[stage],
+                    escalated=self._escalated.get(stage, 0),
+                    threshold=self.threshold(stage),
+                    tiers=stage_tiers,
+                )
+            )
+        return results
+
+
+def _by_stage(usage: list[LlmStageUsage]) -> dict[str, LlmStageUsage]:
+    return {stage_usage.stage: stage_usage for stage_usage in usage}
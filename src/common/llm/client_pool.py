@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from typing import Any
+
+from src.common.llm.base_classes import BaseImageProcessor, BaseLlmProvider
+from src.common.llm.registry import get_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class ProviderClientPool:
+    """
+    Process-wide pool of provider instances, keyed by provider type,
+    provider name, model and temperature.
+
+    Building a provider resolves the registry and creates its SDK client,
+    so each combination is built once and shared; the LLM providers in
+    turn share one keep-alive HTTP client (see `http_client`). `awarm_up`
+    builds the default providers and opens their connections ahead of
+    the first request.
+    """
+
+    def __init__(self) -> None:
+        self._providers: dict[tuple[Any, ...], Any] = {}
+        # Reentrant: a provider may build other pooled providers (the
+        # router builds one per deployment).
+        self._lock = threading.RLock()
+
+    def llm_provider(
+        self,
+        provider: str,
+        model: str | None = None,
+        temperature: float | None = None,
+    ) -> BaseLlmProvider:
+        kwargs: dict[str, Any] = {}
+        if model is not None:
+            kwargs["model"] = model
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        instance: BaseLlmProvider = self._get(
+            "llm", provider, model, temperature, **kwargs
+        )
+        return instance
+
+    def image_processor(self, provider: str) -> BaseImageProcessor:
+        instance: BaseImageProcessor = self._get("image_processor", provider)
+        return instance
+
+    async def awarm_up(self, provider: str | None = None) -> None:
+        """Build the default providers and connect to the LLM endpoint."""
+        provider = (provider or config.LLM_PROVIDER).lower()
+        started = time.perf_counter()
+        self.image_processor(provider)
+        llm_provider = self.llm_provider(provider)
+        try:
+            await llm_provider.awarm_up()
+        except Exception as e:
+            logger.warning(f"Warm-up of {provider} LLM provider failed: {e}")
+            return
+        logger.info(
+            f"Warmed up {provider} LLM provider in "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+    def _get(
+        self,
+        provider_type: str,
+        provider: str,
+        *key: Any,
+        **kwargs: Any,
+    ) -> Any:
+        pool_key = (provider_type, provider, *key)
+        instance = self._providers.get(pool_key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._providers.get(pool_key)
+            if instance is None:
+                logger.debug(f"Creating {provider_type} provider: {pool_key}")
+                instance = get_provider(provider_type, provider)(**kwargs)
+                self._providers[pool_key] = instance
+        return instance
+
+
+provider_pool = ProviderClientPool()
@@ -0,0 +1,33 @@
+import threading
+
+from src.common.concurrency import AdaptiveConcurrencyLimiter
+from src.config import config
+
+from .errors import is_overload_error
+
+_limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(
+    provider: str, model: str, deployments: int = 1
+) -> AdaptiveConcurrencyLimiter:
+    """
+    Return the process-wide adaptive concurrency limiter for a provider
+    and model, shared by every Llm instance (and so by the classifier and
+    referee) that calls it. For a router over several `deployments`, the
+    configured limits are those of each deployment, and are summed.
+    """
+    name = f"{provider}:{model}"
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                f"llm_concurrency[{name}]",
+                initial_limit=config.LLM_INITIAL_CONCURRENCY * deployments,
+                min_limit=config.LLM_MIN_CONCURRENCY * deployments,
+                max_limit=config.LLM_MAX_CONCURRENCY * deployments,
+                is_overload=is_overload_error,
+            )
+            _limiters[name] = limiter
+    return limiter
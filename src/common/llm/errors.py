@@ -0,0 +1,63 @@
+from typing import Mapping
+
+import httpx
+import openai
+
+
+def status_code(error: BaseException) -> int | None:
+    """HTTP status of a provider error, if it carries one."""
+    code = getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    return status_code(error) == 429
+
+
+def error_headers(error: BaseException) -> Mapping[str, str]:
+    """Response headers of a provider error, or an empty mapping."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers if headers is not None else {}
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    return isinstance(
+        error, (TimeoutError, openai.APITimeoutError, httpx.TimeoutException)
+    )
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an error means the endpoint is taking more than it can."""
+    return is_rate_limit_error(error) or is_timeout_error(error)
+
+
+def is_deployment_error(error: BaseException) -> bool:
+    """
+    Whether an error is the endpoint's fault (overload, server error or
+    no connection) rather than the request's, so another deployment may
+    succeed.
+    """
+    code = status_code(error)
+    return (
+        is_overload_error(error)
+        or (code is not None and code >= 500)
+        or isinstance(error, (openai.APIConnectionError, httpx.TransportError))
+    )
+
+
+def is_unretryable_error(error: BaseException) -> bool:
+    """Whether retrying the same call right away cannot succeed."""
+    return isinstance(error, NoHealthyDeploymentError)
+
+
+class NoHealthyDeploymentError(RuntimeError):
+    """Every deployment's circuit breaker is open."""
+
+
+class LlmOutputParseError(ValueError):
+    """LLM output that does not parse as the expected type, even repaired."""
+
+    def __init__(self, message: str, content: str) -> None:
+        super().__init__(message)
+        self.content = content
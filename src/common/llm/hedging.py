@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from pydantic import BaseModel, computed_field
+
+from src.common.logging import setup_logging
+from src.config import config
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+R = TypeVar("R")
+
+
+class HedgeStats(BaseModel):
+    """Calls made through a hedger, how many were hedged and won."""
+
+    name: str
+    calls: int
+    hedged: int
+    hedge_wins: int
+    budget: float
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.calls if self.calls else 0.0
+
+
+class Hedger:
+    """
+    Sends a second copy of a slow call and takes whichever finishes first.
+
+    A call that has not returned after the `percentile` latency of recent
+    calls in the same stage is hedged: a duplicate is started and the
+    first successful result wins, the other being cancelled. Hedges are
+    capped at `budget` times the number of calls so a general slowdown
+    cannot double the load. Until a stage has `min_samples` latencies
+    its calls are not hedged.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float,
+        budget: float,
+        min_samples: int,
+        window: int,
+    ) -> None:
+        self.name = name
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    async def run(
+        self,
+        stage: str,
+        primary: Callable[[], Awaitable[R]],
+        hedge: Callable[[], Awaitable[R]],
+    ) -> R:
+        started = time.perf_counter()
+        self._calls += 1
+        tasks: list[asyncio.Future[R]] = [asyncio.ensure_future(primary())]
+        try:
+            delay = self._hedge_delay(stage)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+            if delay is not None and not tasks[0].done():
+                if self._take_budget():
+                    logger.debug(
+                        f"{self.name}: hedging {stage} call after "
+                        f"{delay:.2f}s"
+                    )
+                    tasks.append(asyncio.ensure_future(hedge()))
+            winner = await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if winner > 0:
+            self._hedge_wins += 1
+        self._record(stage, time.perf_counter() - started)
+        return tasks[winner].result()
+
+    @staticmethod
+    async def _first_success(tasks: list[asyncio.Future[R]]) -> int:
+        """Index of the first task to succeed; the primary's error if none."""
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return tasks.index(task)
+        error = tasks[0].exception()
+        assert error is not None
+        raise error
+
+    def stats(self) -> HedgeStats:
+        return HedgeStats(
+            name=self.name,
+            calls=self._calls,
+            hedged=self._hedged,
+            hedge_wins=self._hedge_wins,
+            budget=self.budget,
+        )
+
+    def _hedge_delay(self, stage: str) -> float | None:
+        with self._lock:
+            latencies = self._latencies.get(stage)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        rank = math.ceil(self.percentile / 100 * len(ordered)) - 1
+        return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+    def _take_budget(self) -> bool:
+        if self._hedged + 1 > self.budget * self._calls:
+            return False
+        self._hedged += 1
+        return True
+
+    def _record(self, stage: str, latency: float) -> None:
+        with self._lock:
+            latencies = self._latencies.get(stage)
+            if latencies is None:
+                latencies = self._latencies[stage] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+
+_hedgers: dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(provider: str, model: str) -> Hedger:
+    """Return the process-wide hedger for a provider and model."""
+    name = f"{provider}:{model}"
+    with _hedgers_lock:
+        hedger = _hedgers.get(name)
+        if hedger is None:
+            hedger = Hedger(
+                f"llm_hedging[{name}]",
+                percentile=config.LLM_HEDGE_PERCENTILE,
+                budget=config.LLM_HEDGE_BUDGET,
+                min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+                window=config.LLM_HEDGE_WINDOW,
+            )
+            _hedgers[name] = hedger
+    return hedger
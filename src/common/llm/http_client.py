@@ -0,0 +1,61 @@
+import logging
+import threading
+
+import httpx
+
+from src.common.logging import setup_logging
+from src.config import config
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+_lock = threading.Lock()
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide keep-alive HTTP client shared by sync LLM clients."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                limits=_limits(), timeout=config.LLM_HTTP_TIMEOUT
+            )
+        return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide keep-alive HTTP client shared by async LLM clients.
+
+    Pooled connections belong to the event loop that opened them, so the
+    client is meant for one long-lived loop (e.g. the API server's).
+    """
+    global _async_client
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(
+                limits=_limits(), timeout=config.LLM_HTTP_TIMEOUT
+            )
+        return _async_client
+
+
+async def aclose_http_clients() -> None:
+    """Close the shared clients and their connections, e.g. at shutdown."""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+    if async_client is not None:
+        await async_client.aclose()
+    if client is not None:
+        client.close()
@@ -1,6 +1,6 @@
 import logging
 
-from src.common.llm.registry import get_provider
+from src.common.llm.client_pool import provider_pool
 from src.common.logging import setup_logging
 from src.config import config
 
@@ -9,17 +9,16 @@ setup_logging()
 
 
 class ImageEncoder:
-    """Main class for handling image encoding."""
+    """Main class for handling image encoding, backed by a pooled processor."""
 
     def __init__(self) -> None:
         provider = config.LLM_PROVIDER.lower()
         logger.debug(f"Initialising image processor: {provider}")
-        processor_cls = get_provider("image_processor", provider)
-        self._processor = processor_cls()
+        self._processor = provider_pool.image_processor(provider)
 
     def encode_image(self, image_bytes: bytes) -> str:
         """
         Encode image bytes into the format required by the current provider.
         """
         logger.debug("Encoding image bytes")
-        return self._processor.encode_image(image_bytes)  # type: ignore
+        return self._processor.encode_image(image_bytes)
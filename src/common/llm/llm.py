@@ -1,10 +1,37 @@
 import logging
-from typing import Type, TypeVar, cast, overload
+from typing import Any, Callable, Type, TypeVar, overload
 
 import backoff
 from pydantic import BaseModel
 
-from src.common.llm.registry import get_provider
+from src.common.llm.accounting import (
+    LlmCall,
+    LlmCallLedger,
+    LlmCallStats,
+    count_retry,
+    current_call,
+)
+from src.common.llm.base_classes import LlmResponse, LlmUsage
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.concurrency import get_concurrency_limiter
+from src.common.llm.errors import (
+    LlmOutputParseError,
+    error_headers,
+    is_rate_limit_error,
+    is_unretryable_error,
+)
+from src.common.llm.hedging import HedgeStats, get_hedger
+from src.common.llm.rate_limiter import (
+    estimate_tokens,
+    get_rate_limiter,
+    retry_after,
+)
+from src.common.llm.streaming import IncrementalJsonParser
+from src.common.llm.structured_output import (
+    StructuredOutputStats,
+    parse_output,
+)
+from src.common.llm.usage import LlmStageUsage, LlmUsageTracker
 from src.common.logging import setup_logging
 from src.config import config
 
@@ -13,15 +40,87 @@ setup_logging()
 
 T = TypeVar("T", bound=BaseModel)
 
+DEFAULT_STAGE = "default"
+
 
 class Llm:
-    """Main class for handling LLM interactions."""
+    """
+    Main class for handling LLM interactions.
+
+    Calls are admitted through the process-wide rate limiter for the
+    provider and model, which every Llm instance for that model shares.
+    Async calls also hold a slot of the model's adaptive concurrency
+    limiter, which finds the concurrency the endpoint can sustain. Behind
+    the router, the rate is limited per deployment by the router, and
+    the concurrency limits are the deployments' combined. The
+    provider client comes from the process-wide pool, so constructing an
+    Llm is cheap.
+
+    Reported token usage, including input tokens served from the
+    provider's prompt cache, is summed per `stage` for this instance.
+    Each `invoke` call is also accounted as a whole in `ledger`: the
+    tokens of all its attempts, its retries, latency and cost, under the
+    model that served it.
 
-    def __init__(self) -> None:
-        provider = config.LLM_PROVIDER.lower()
+    With `hedge` (default `LLM_HEDGE_ENABLED`), async calls slower than
+    the recent `LLM_HEDGE_PERCENTILE` latency are duplicated, to
+    `LLM_HEDGE_PROVIDER`/`LLM_HEDGE_MODEL` if set, and the first result
+    is used.
+
+    With an `output_type`, the provider is asked for output matching its
+    JSON schema (`LLM_RESPONSE_FORMAT`), and malformed output is repaired
+    locally before it is parsed. Output that cannot be repaired is
+    retried up to `LLM_PARSE_MAX_TRIES` times, apart from the backoff
+    retries for provider errors.
+    """
+
+    def __init__(
+        self,
+        provider: str | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        hedge: bool | None = None,
+    ) -> None:
+        provider = (provider or config.LLM_PROVIDER).lower()
         logger.debug(f"Initialising LLM provider: {provider}")
-        provider_cls = get_provider("llm", provider)
-        self._provider = provider_cls()
+        self._provider = provider_pool.llm_provider(
+            provider, model, temperature
+        )
+        self.provider_name = provider
+        self.model: str = getattr(self._provider, "model", provider)
+        self.temperature: float | None = getattr(
+            self._provider, "temperature", None
+        )
+        # A router limits the rate of each deployment itself, so the
+        # configured limits, which are per deployment, must not cap all of
+        # them together here.
+        deployments = getattr(self._provider, "deployment_names", None)
+        self.rate_limiter = get_rate_limiter(
+            provider, self.model, configured=not deployments
+        )
+        self.concurrency_limiter = get_concurrency_limiter(
+            provider, self.model, len(deployments or [provider])
+        )
+        self.usage = LlmUsageTracker()
+        self.ledger = LlmCallLedger()
+        self.output_stats = StructuredOutputStats()
+        self.hedger = (
+            get_hedger(provider, self.model)
+            if (config.LLM_HEDGE_ENABLED if hedge is None else hedge)
+            else None
+        )
+        self._hedge_target = self
+        if self.hedger is not None and (
+            config.LLM_HEDGE_PROVIDER or config.LLM_HEDGE_MODEL
+        ):
+            self._hedge_target = Llm(
+                config.LLM_HEDGE_PROVIDER or provider,
+                config.LLM_HEDGE_MODEL or model,
+                temperature,
+                hedge=False,
+            )
+            # Usage of hedged calls counts towards this instance's stages.
+            self._hedge_target.usage = self.usage
 
     @overload
     def invoke(
@@ -30,6 +129,7 @@ class Llm:
         human: str,
         output_type: Type[T],
         images: list[str] | None = None,
+        stage: str | None = None,
     ) -> T: ...
 
     @overload
@@ -39,29 +139,30 @@ class Llm:
         human: str,
         output_type: None = None,
         images: list[str] | None = None,
+        stage: str | None = None,
     ) -> str: ...
 
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,
-        max_tries=config.OPENAI_LLM_MAX_TRIES,
-        max_time=config.OPENAI_LLM_MAX_TIME,
-        base=config.OPENAI_LLM_BACKOFF_BASE,
-        jitter=(
-            backoff.full_jitter if config.OPENAI_LLM_BACKOFF_JITTER else None
-        ),
-    )
     def invoke(
         self,
         system: str,
         human: str,
         output_type: Type[T] | None = None,
         images: list[str] | None = None,
+        stage: str | None = None,
     ) -> T | str:
-        output = cast(str, self._provider.invoke(system, human, images))
-        if output_type:
-            return output_type.model_validate_json(output)
-        return output
+        with self.ledger.call(self.model, stage or DEFAULT_STAGE):
+            attempt = 1
+            while True:
+                output = self._complete(
+                    system, human, output_type, images, stage
+                )
+                if output_type is None:
+                    return output
+                try:
+                    return self.parse_output(output_type, output)
+                except LlmOutputParseError as e:
+                    self._on_parse_error(e, attempt)
+                attempt += 1
 
     @overload
     async def ainvoke(
@@ -70,6 +171,8 @@ class Llm:
         human: str,
         output_type: Type[T],
         images: list[str] | None = None,
+        stage: str | None = None,
+        parse_tries: int | None = None,
     ) -> T: ...
 
     @overload
@@ -79,8 +182,123 @@ class Llm:
         human: str,
         output_type: None = None,
         images: list[str] | None = None,
+        stage: str | None = None,
+        parse_tries: int | None = None,
     ) -> str: ...
 
+    async def ainvoke(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[T] | None = None,
+        images: list[str] | None = None,
+        stage: str | None = None,
+        parse_tries: int | None = None,
+    ) -> T | str:
+        """
+        Invoke the LLM asynchronously. `parse_tries` overrides
+        `LLM_PARSE_MAX_TRIES` for this call.
+        """
+        with self.ledger.call(self.model, stage or DEFAULT_STAGE):
+            attempt = 1
+            while True:
+                output = await self._acomplete(
+                    system, human, output_type, images, stage
+                )
+                if output_type is None:
+                    return output
+                try:
+                    return self.parse_output(output_type, output)
+                except LlmOutputParseError as e:
+                    self._on_parse_error(e, attempt, parse_tries)
+                attempt += 1
+
+    async def ainvoke_unparsed(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[BaseModel] | None = None,
+        images: list[str] | None = None,
+        stage: str | None = None,
+    ) -> LlmResponse:
+        """
+        Invoke the LLM asynchronously and return its output unparsed, as a
+        batch API would, with the token usage of all of the call's
+        attempts. Output is requested in the format of `output_type`, but
+        unparseable output is not retried.
+        """
+        with self.ledger.call(self.model, stage or DEFAULT_STAGE) as call:
+            content = await self._acomplete(
+                system, human, output_type, images, stage
+            )
+        return LlmResponse(
+            content=content, usage=call.total_usage(), model=call.model
+        )
+
+    async def ainvoke_streaming(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[T],
+        images: list[str] | None = None,
+        stage: str | None = None,
+        on_field: Callable[[str, Any], None] | None = None,
+    ) -> T:
+        """
+        Like `ainvoke`, but streams the completion and calls `on_field`
+        with each top-level field of the JSON output as soon as its value
+        is complete, before the rest of the output has arrived. If the
+        call is retried, fields may be reported again.
+        """
+        with self.ledger.call(self.model, stage or DEFAULT_STAGE):
+            attempt = 1
+            while True:
+                output = await self._astream_once(
+                    system, human, output_type, images, stage, on_field
+                )
+                try:
+                    return self.parse_output(output_type, output)
+                except LlmOutputParseError as e:
+                    self._on_parse_error(e, attempt)
+                attempt += 1
+
+    def parse_output(self, output_type: Type[T], content: str) -> T:
+        """
+        Parse output into `output_type`, repairing malformed JSON locally
+        (see `structured_output.parse_output`), and count the outcome.
+        """
+        try:
+            output, repaired = parse_output(output_type, content)
+        except LlmOutputParseError:
+            self.output_stats.invalid += 1
+            raise
+        if repaired:
+            self.output_stats.repaired += 1
+        else:
+            self.output_stats.parsed += 1
+        return output
+
+    def deployments(self) -> list[str]:
+        """
+        `provider:model` of every deployment that may answer a call: the
+        router's deployments when routing, and the hedge target's.
+        """
+        names = set(
+            getattr(self._provider, "deployment_names", None)
+            or [f"{self.provider_name}:{self.model}"]
+        )
+        if self._hedge_target is not self:
+            names.update(self._hedge_target.deployments())
+        return sorted(names)
+
+    def structured_output_stats(self) -> StructuredOutputStats:
+        """Outputs parsed as returned, after repair, and unparseable."""
+        return self.output_stats.model_copy()
+
+    def hedge_stats(self) -> HedgeStats | None:
+        """Hedged calls and wins, if hedging is enabled."""
+        return self.hedger.stats() if self.hedger is not None else None
+
     @backoff.on_exception(
         backoff.expo,
         Exception,
@@ -90,16 +308,202 @@ class Llm:
         jitter=(
             backoff.full_jitter if config.OPENAI_LLM_BACKOFF_JITTER else None
         ),
+        giveup=is_unretryable_error,
+        on_backoff=count_retry,
     )
-    async def ainvoke(
+    def _complete(
         self,
         system: str,
         human: str,
-        output_type: Type[T] | None = None,
-        images: list[str] | None = None,
-    ) -> T | str:
-        """Invoke the LLM asynchronously."""
-        output = cast(str, await self._provider.ainvoke(system, human, images))
-        if output_type:
-            return output_type.model_validate_json(output)
-        return output
+        output_type: Type[BaseModel] | None,
+        images: list[str] | None,
+        stage: str | None,
+    ) -> str:
+        estimated_tokens = estimate_tokens(system, human, images)
+        self.rate_limiter.acquire_blocking(estimated_tokens)
+        try:
+            response = self._provider.invoke(
+                system, human, images, output_type=output_type
+            )
+        except Exception as e:
+            self._on_error(e)
+            raise
+        return self._on_response(response, estimated_tokens, stage)
+
+    @backoff.on_exception(
+        backoff.expo,
+        Exception,
+        max_tries=config.OPENAI_LLM_MAX_TRIES,
+        max_time=config.OPENAI_LLM_MAX_TIME,
+        base=config.OPENAI_LLM_BACKOFF_BASE,
+        jitter=(
+            backoff.full_jitter if config.OPENAI_LLM_BACKOFF_JITTER else None
+        ),
+        giveup=is_unretryable_error,
+        on_backoff=count_retry,
+    )
+    async def _acomplete(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[BaseModel] | None,
+        images: list[str] | None,
+        stage: str | None,
+    ) -> str:
+        if self.hedger is None:
+            return await self._ainvoke_once(
+                system, human, output_type, images, stage
+            )
+        hedge_target = self._hedge_target
+        return await self.hedger.run(
+            stage or DEFAULT_STAGE,
+            lambda: self._ainvoke_once(
+                system, human, output_type, images, stage
+            ),
+            lambda: hedge_target._ainvoke_once(
+                system, human, output_type, images, stage
+            ),
+        )
+
+    async def _ainvoke_once(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[BaseModel] | None,
+        images: list[str] | None,
+        stage: str | None,
+    ) -> str:
+        estimated_tokens = estimate_tokens(system, human, images)
+        await self.rate_limiter.acquire(estimated_tokens)
+        try:
+            async with self.concurrency_limiter.slot():
+                response = await self._provider.ainvoke(
+                    system, human, images, output_type=output_type
+                )
+        except Exception as e:
+            self._on_error(e)
+            raise
+        return self._on_response(response, estimated_tokens, stage)
+
+    @backoff.on_exception(
+        backoff.expo,
+        Exception,
+        max_tries=config.OPENAI_LLM_MAX_TRIES,
+        max_time=config.OPENAI_LLM_MAX_TIME,
+        base=config.OPENAI_LLM_BACKOFF_BASE,
+        jitter=(
+            backoff.full_jitter if config.OPENAI_LLM_BACKOFF_JITTER else None
+        ),
+        giveup=is_unretryable_error,
+        on_backoff=count_retry,
+    )
+    async def _astream_once(
+        self,
+        system: str,
+        human: str,
+        output_type: Type[BaseModel] | None,
+        images: list[str] | None,
+        stage: str | None,
+        on_field: Callable[[str, Any], None] | None,
+    ) -> str:
+        estimated_tokens = estimate_tokens(system, human, images)
+        await self.rate_limiter.acquire(estimated_tokens)
+        parser = IncrementalJsonParser()
+        response = LlmResponse(content="")
+        parts: list[str] = []
+        try:
+            async with self.concurrency_limiter.slot():
+                async for chunk in self._provider.astream(
+                    system, human, images, output_type=output_type
+                ):
+                    if isinstance(chunk, LlmResponse):
+                        text = chunk.content
+                        response.headers = response.headers or chunk.headers
+                        response.usage = chunk.usage or response.usage
+                        response.model = chunk.model or response.model
+                    else:
+                        text = chunk
+                    parts.append(text)
+                    if on_field is not None:
+                        for name, value in parser.feed(text):
+                            on_field(name, value)
+        except Exception as e:
+            self._on_error(e)
+            raise
+        response.content = "".join(parts)
+        return self._on_response(response, estimated_tokens, stage)
+
+    def record_usage(self, stage: str | None, usage: LlmUsage) -> None:
+        """Count token usage reported for a call made outside `invoke`."""
+        self.usage.record(stage or DEFAULT_STAGE, usage)
+
+    def record_batch_call(
+        self,
+        stage: str | None,
+        model: str,
+        usage: LlmUsage | None,
+        failed: bool = False,
+    ) -> None:
+        """
+        Account a request answered through the batch API. Its tokens count
+        towards the stage's usage, and the call is recorded in the ledger
+        under the `<stage>_batch` stage, priced at LLM_BATCH_PRICE_FACTOR
+        times the model's price.
+        """
+        stage = stage or DEFAULT_STAGE
+        call = LlmCall(model=model, stage=f"{stage}_batch", failed=failed)
+        if usage is not None:
+            self.record_usage(stage, usage)
+            call.add(usage, price_factor=config.LLM_BATCH_PRICE_FACTOR)
+        self.ledger.record(call)
+
+    def usage_stats(self) -> list[LlmStageUsage]:
+        """Token usage and prompt-cache hit rate per stage."""
+        return self.usage.stats()
+
+    def call_stats(self) -> list[LlmCallStats]:
+        """Calls, retries, latency and cost per model and stage."""
+        return self.ledger.stats()
+
+    def _on_response(
+        self,
+        response: str | LlmResponse,
+        estimated_tokens: int,
+        stage: str | None,
+    ) -> str:
+        if not isinstance(response, LlmResponse):
+            return response
+        if response.headers:
+            self.rate_limiter.update_from_headers(response.headers)
+        if response.usage is not None:
+            self.rate_limiter.settle(
+                estimated_tokens, response.usage.total_tokens
+            )
+            self.record_usage(stage, response.usage)
+            call = current_call()
+            if call is not None:
+                call.add(response.usage, response.model or self.model)
+        return response.content
+
+    def _on_parse_error(
+        self,
+        error: LlmOutputParseError,
+        attempt: int,
+        max_tries: int | None = None,
+    ) -> None:
+        # Retried separately from transport errors, and only a few times:
+        # each retry resends the whole prompt, images included.
+        max_tries = max_tries or config.LLM_PARSE_MAX_TRIES
+        if attempt >= max_tries:
+            raise error
+        count_retry()
+        logger.warning(
+            f"Retrying unparseable LLM output "
+            f"({attempt}/{max_tries}): {error}"
+        )
+
+    def _on_error(self, error: Exception) -> None:
+        if is_rate_limit_error(error):
+            self.rate_limiter.on_rate_limited(
+                retry_after(error_headers(error))
+            )
@@ -0,0 +1,57 @@
+from functools import lru_cache
+
+from pydantic import BaseModel
+
+from src.config import config
+
+from .usage import LlmStageUsage
+
+
+class ModelPrice(BaseModel):
+    """Price of a model in USD per million tokens."""
+
+    input: float
+    output: float
+    cached_input: float
+
+    def cost(self, usage: LlmStageUsage) -> float:
+        uncached = usage.input_tokens - usage.cached_input_tokens
+        return (
+            uncached * self.input
+            + usage.cached_input_tokens * self.cached_input
+            + usage.output_tokens * self.output
+        ) / 1_000_000
+
+
+def parse_prices(spec: str) -> dict[str, ModelPrice]:
+    """
+    Parse a comma-separated list of `model:input:output[:cached_input]`
+    prices in USD per million tokens, e.g. "gpt-4o-mini:0.15:0.6:0.075".
+    Cached input defaults to the input price.
+    """
+    prices = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        parts = [part.strip() for part in entry.split(":")]
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Invalid LLM model price: {entry!r}")
+        model, *amounts = parts
+        input, output, *cached = map(float, amounts)
+        prices[model] = ModelPrice(
+            input=input,
+            output=output,
+            cached_input=cached[0] if cached else input,
+        )
+    return prices
+
+
+@lru_cache(maxsize=1)
+def _configured_prices() -> dict[str, ModelPrice]:
+    return parse_prices(config.LLM_MODEL_PRICES)
+
+
+def usage_cost(model: str, usage: LlmStageUsage) -> float | None:
+    """Cost of some usage of a model, or None if it has no price set."""
+    price = _configured_prices().get(model)
+    return price.cost(usage) if price is not None else None
@@ -1,4 +1,17 @@
 from src.common.llm.providers.azure.llm import AzureLlmProvider
+from src.common.llm.providers.cassette import CassetteLlmProvider
+from src.common.llm.providers.local.batch_llm import LocalBatchLlmProvider
+from src.common.llm.providers.mock import MockLlmProvider
+from src.common.llm.providers.openai.batch_llm import OpenAiBatchLlmProvider
 from src.common.llm.providers.openai.llm import OpenAiLlmProvider
+from src.common.llm.providers.router import RouterLlmProvider
 
-__all__ = ["AzureLlmProvider", "OpenAiLlmProvider"]
+__all__ = [
+    "AzureLlmProvider",
+    "CassetteLlmProvider",
+    "LocalBatchLlmProvider",
+    "MockLlmProvider",
+    "OpenAiBatchLlmProvider",
+    "OpenAiLlmProvider",
+    "RouterLlmProvider",
+]
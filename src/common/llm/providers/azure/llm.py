@@ -1,10 +1,17 @@
-from typing import TypeVar, cast
+from typing import AsyncIterator, TypeVar
 
-from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import AzureChatOpenAI
 from pydantic import BaseModel, SecretStr
 
-from src.common.llm.base_classes import BaseLlmProvider
+from src.common.llm.base_classes import BaseLlmProvider, LlmResponse
+from src.common.llm.http_client import (
+    get_async_http_client,
+    get_http_client,
+)
+from src.common.llm.providers.messages import (
+    build_chat_messages,
+    response_format_kwargs,
+)
 from src.common.llm.registry import register_provider
 from src.config import config
 
@@ -24,13 +31,19 @@ class AzureLlmProvider(BaseLlmProvider):
     def __init__(
         self, model: str | None = None, temperature: float | None = None
     ):
+        self.model = model or config.AZURE_OPENAI_DEPLOYMENT
+        self.temperature = (
+            temperature
+            if temperature is not None
+            else config.OPENAI_LLM_TEMPERATURE
+        )
         self._client = AzureChatOpenAI(
-            model=model or config.AZURE_OPENAI_DEPLOYMENT,
-            temperature=(
-                temperature
-                if temperature is not None
-                else config.OPENAI_LLM_TEMPERATURE
-            ),
+            model=self.model,
+            temperature=self.temperature,
+            include_response_headers=True,
+            stream_usage=True,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
             api_key=SecretStr(config.AZURE_OPENAI_API_KEY),
             azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
             api_version=config.AZURE_OPENAI_API_VERSION,
@@ -38,45 +51,44 @@ class AzureLlmProvider(BaseLlmProvider):
         )
 
     def invoke(
-        self, system: str, human: str, images: list[str] | None = None
-    ) -> str:
-        system_msg = SystemMessage(content=system)
-
-        if images:
-            human_msg = HumanMessage(
-                content=[
-                    {"type": "text", "text": human},
-                    *[
-                        {"type": "image_url", "image_url": {"url": url}}
-                        for url in images
-                    ],
-                ]
-            )
-        else:
-            human_msg = HumanMessage(content=human)
-
-        messages = [system_msg, human_msg]
-        response = self._client.invoke(messages)
-        return cast(str, response.content)
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        messages = build_chat_messages(system, human, images)
+        response = self._client.invoke(
+            messages, **response_format_kwargs(output_type)
+        )
+        return LlmResponse.from_message(response, self.model)
 
     async def ainvoke(
-        self, system: str, human: str, images: list[str] | None = None
-    ) -> str:
-        system_msg = SystemMessage(content=system)
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        messages = build_chat_messages(system, human, images)
+        response = await self._client.ainvoke(
+            messages, **response_format_kwargs(output_type)
+        )
+        return LlmResponse.from_message(response, self.model)
 
-        if images:
-            human_msg = HumanMessage(
-                content=[
-                    {"type": "text", "text": human},
-                    *[
-                        {"type": "image_url", "image_url": {"url": url}}
-                        for url in images
-                    ],
-                ]
-            )
-        else:
-            human_msg = HumanMessage(content=human)
+    async def astream(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> AsyncIterator[LlmResponse]:
+        # Streamed output is not schema-constrained; it is repaired and
+        # parsed by the caller as usual.
+        messages = build_chat_messages(system, human, images)
+        async for chunk in self._client.astream(messages):
+            yield LlmResponse.from_message(chunk, self.model)
 
-        messages = [system_msg, human_msg]
-        response = await self._client.ainvoke(messages)
-        return cast(str, response.content)
+    async def awarm_up(self) -> None:
+        # Listing models opens a pooled, TLS-established connection.
+        await self._client.root_async_client.models.list()
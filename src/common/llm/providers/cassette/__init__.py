@@ -0,0 +1,4 @@
+from .image_processor import CassetteImageProcessor
+from .llm import CassetteLlmProvider
+
+__all__ = ["CassetteImageProcessor", "CassetteLlmProvider"]
@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from src.common.llm.base_classes import LlmUsage
+from src.common.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class CassetteMissError(LookupError):
+    """A replayed request that the cassette holds no recording of."""
+
+
+class CassetteEntry(BaseModel):
+    """One recorded response, the model that gave it, and its latency."""
+
+    key: str
+    requested_model: str
+    model: str
+    content: str
+    usage: LlmUsage | None = None
+    seconds: float
+    # Time to the first streamed chunk, for streamed recordings.
+    first_chunk_seconds: float | None = None
+
+
+class CassetteStats(BaseModel):
+    recorded: int = 0
+    replayed: int = 0
+    misses: int = 0
+
+
+def request_key(
+    requested_model: str,
+    system: str,
+    human: str,
+    images: list[str] | None,
+    output_type: type[BaseModel] | None,
+) -> str:
+    """
+    Hash identifying a request by the model it asked for, its prompts,
+    images and output type.
+    """
+    payload = json.dumps(
+        [
+            requested_model,
+            system,
+            human,
+            images or [],
+            output_type.__name__ if output_type is not None else None,
+        ]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded LLM responses in a gzipped JSON lines file, keyed by request
+    hash. Only the hash of each request is stored, not its images.
+
+    A request recorded more than once (e.g. retried for unparseable
+    output) replays its responses in order, then repeats the last one.
+    Each recording is appended as a gzip member of its own, so the file
+    stays readable if recording stops abruptly.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[str, list[CassetteEntry]] = {}
+        self._models: dict[str, str] = {}
+        self._replays: dict[str, int] = {}
+        self._stats = CassetteStats()
+        self._lock = threading.Lock()
+        self._load()
+
+    def model_for(self, requested_model: str) -> str | None:
+        """The model that answered requests for `requested_model`."""
+        return self._models.get(requested_model)
+
+    def replay(self, key: str) -> CassetteEntry:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self._stats.misses += 1
+                raise CassetteMissError(
+                    f"No recorded LLM response for request {key[:12]} "
+                    f"in {self.path}"
+                )
+            index = self._replays.get(key, 0)
+            self._replays[key] = index + 1
+            self._stats.replayed += 1
+            return entries[min(index, len(entries) - 1)]
+
+    def record(self, entry: CassetteEntry) -> None:
+        line = entry.model_dump_json() + "\n"
+        with self._lock:
+            self._add(entry)
+            self._stats.recorded += 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    def stats(self) -> CassetteStats:
+        with self._lock:
+            return self._stats.model_copy()
+
+    def _add(self, entry: CassetteEntry) -> None:
+        self._entries.setdefault(entry.key, []).append(entry)
+        self._models.setdefault(entry.requested_model, entry.model)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._add(CassetteEntry.model_validate_json(line))
+                    count += 1
+        logger.info(f"Loaded {count} recorded LLM responses from {self.path}")
+
+
+_cassettes: dict[Path, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: Path) -> Cassette:
+    """Return the process-wide cassette for a file."""
+    path = path.resolve()
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path)
+    return cassette
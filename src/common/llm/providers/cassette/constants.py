@@ -0,0 +1 @@
+PROVIDER = "cassette"
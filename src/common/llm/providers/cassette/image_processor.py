@@ -0,0 +1,29 @@
+import logging
+
+from src.common.llm.base_classes import BaseImageProcessor
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@register_provider("image_processor", PROVIDER)
+class CassetteImageProcessor(BaseImageProcessor):
+    """
+    Image processor for cassettes, using the recorded provider's format
+    so that replayed requests hash the same as when they were recorded.
+    """
+
+    def __init__(self, provider: str | None = None) -> None:
+        self._processor = provider_pool.image_processor(
+            provider or config.LLM_CASSETTE_PROVIDER
+        )
+
+    def encode_image(self, image_bytes: bytes) -> str:
+        logger.debug("Encoding image for cassette provider")
+        return self._processor.encode_image(image_bytes)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+from src.common.llm.base_classes import BaseLlmProvider, LlmResponse
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+from .cassette import (
+    CassetteEntry,
+    CassetteStats,
+    get_cassette,
+    request_key,
+)
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+RECORD = "record"
+REPLAY = "replay"
+
+_STREAM_CHUNK_CHARS = 16
+
+
+@register_provider("llm", PROVIDER)
+class CassetteLlmProvider(BaseLlmProvider):
+    """
+    Records the responses of another provider to a cassette, or replays
+    them without network access, for reproducible pipeline benchmarks.
+
+    In `record` mode, calls go to `LLM_CASSETTE_PROVIDER` and each
+    successful response is stored with its token usage and latency. In
+    `replay` mode, responses are served from the cassette, immediately
+    or, with `LLM_CASSETTE_REPLAY_TIMING`, after their recorded latency;
+    a request that was never recorded raises CassetteMissError. Errors
+    are not recorded, so replays see only the successful responses.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        temperature: float | None = None,
+        mode: str | None = None,
+        path: Path | None = None,
+    ):
+        self.mode = (mode or config.LLM_CASSETTE_MODE).lower()
+        if self.mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown LLM cassette mode: {self.mode}")
+        self.cassette = get_cassette(path or config.LLM_CASSETTE_PATH)
+        self.requested_model = model or ""
+        self._provider: BaseLlmProvider | None = None
+        if self.mode == RECORD:
+            self._provider = provider_pool.llm_provider(
+                config.LLM_CASSETTE_PROVIDER, model, temperature
+            )
+            self.model = getattr(
+                self._provider, "model", config.LLM_CASSETTE_PROVIDER
+            )
+            self.temperature = getattr(self._provider, "temperature", 0.0)
+        else:
+            self.model = (
+                model
+                or self.cassette.model_for(self.requested_model)
+                or PROVIDER
+            )
+            self.temperature = temperature if temperature is not None else 0.0
+
+    def invoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse | str:
+        key = self._key(system, human, images, output_type)
+        if self._provider is None:
+            entry = self.cassette.replay(key)
+            if config.LLM_CASSETTE_REPLAY_TIMING:
+                time.sleep(entry.seconds)
+            return self._replayed(entry)
+        started = time.perf_counter()
+        response = self._provider.invoke(
+            system, human, images, output_type=output_type
+        )
+        self._record(key, response, time.perf_counter() - started)
+        return response
+
+    async def ainvoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse | str:
+        key = self._key(system, human, images, output_type)
+        if self._provider is None:
+            entry = self.cassette.replay(key)
+            if config.LLM_CASSETTE_REPLAY_TIMING:
+                await asyncio.sleep(entry.seconds)
+            return self._replayed(entry)
+        started = time.perf_counter()
+        response = await self._provider.ainvoke(
+            system, human, images, output_type=output_type
+        )
+        self._record(key, response, time.perf_counter() - started)
+        return response
+
+    async def astream(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str | LlmResponse]:
+        key = self._key(system, human, images, output_type)
+        if self._provider is None:
+            async for replayed in self._replay_stream(key):
+                yield replayed
+            return
+
+        started = time.perf_counter()
+        first_chunk: float | None = None
+        recorded = LlmResponse(content="")
+        parts: list[str] = []
+        async for chunk in self._provider.astream(
+            system, human, images, output_type=output_type
+        ):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            if isinstance(chunk, LlmResponse):
+                parts.append(chunk.content)
+                recorded.usage = chunk.usage or recorded.usage
+                recorded.model = chunk.model or recorded.model
+            else:
+                parts.append(chunk)
+            yield chunk
+        recorded.content = "".join(parts)
+        self._record(key, recorded, time.perf_counter() - started, first_chunk)
+
+    async def _replay_stream(self, key: str) -> AsyncIterator[LlmResponse]:
+        entry = self.cassette.replay(key)
+        content = entry.content
+        chunks = [
+            content[i : i + _STREAM_CHUNK_CHARS]
+            for i in range(0, len(content), _STREAM_CHUNK_CHARS)
+        ]
+        timed = config.LLM_CASSETTE_REPLAY_TIMING
+        first_chunk = (
+            entry.first_chunk_seconds
+            if entry.first_chunk_seconds is not None
+            else entry.seconds
+        )
+        if timed:
+            await asyncio.sleep(first_chunk)
+        for chunk in chunks:
+            yield LlmResponse(content=chunk)
+            if timed:
+                await asyncio.sleep(
+                    max(0.0, entry.seconds - first_chunk) / len(chunks)
+                )
+        yield LlmResponse(content="", usage=entry.usage, model=entry.model)
+
+    async def awarm_up(self) -> None:
+        if self._provider is not None:
+            await self._provider.awarm_up()
+
+    def stats(self) -> CassetteStats:
+        """Responses recorded to and replayed from the cassette."""
+        return self.cassette.stats()
+
+    @staticmethod
+    def _replayed(entry: CassetteEntry) -> LlmResponse:
+        return LlmResponse(
+            content=entry.content, usage=entry.usage, model=entry.model
+        )
+
+    def _key(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None,
+        output_type: type[BaseModel] | None,
+    ) -> str:
+        return request_key(
+            self.requested_model, system, human, images, output_type
+        )
+
+    def _record(
+        self,
+        key: str,
+        response: LlmResponse | str,
+        seconds: float,
+        first_chunk_seconds: float | None = None,
+    ) -> None:
+        if not isinstance(response, LlmResponse):
+            response = LlmResponse(content=response)
+        self.cassette.record(
+            CassetteEntry(
+                key=key,
+                requested_model=self.requested_model,
+                model=response.model or self.model,
+                content=response.content,
+                usage=response.usage,
+                seconds=seconds,
+                first_chunk_seconds=first_chunk_seconds,
+            )
+        )
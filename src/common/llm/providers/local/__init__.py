@@ -0,0 +1,3 @@
+from .batch_llm import LocalBatchLlmProvider
+
+__all__ = ["LocalBatchLlmProvider"]
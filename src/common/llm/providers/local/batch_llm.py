@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from src.common.llm.base_classes import (
+    BaseBatchLlmProvider,
+    BatchJob,
+    BatchRequest,
+    BatchResult,
+)
+from src.common.llm.llm import Llm
+from src.common.llm.registry import register_provider
+from src.common.llm.structured_output import output_type_for
+from src.common.logging import setup_logging
+from src.config import config
+
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@register_provider("batch_llm", PROVIDER)
+class LocalBatchLlmProvider(BaseBatchLlmProvider):
+    """
+    File-based stand-in for a provider batch API, for testing the batch
+    mode without one.
+
+    Each job is a directory under `root` holding the submitted input
+    file, a `job.json` status file and, once finished, an output file in
+    the OpenAI batch output format. Requests are run through the
+    interactive Llm for `LLM_PROVIDER` in a background task, so the
+    whole submit, poll and ingest cycle is exercised against whichever
+    chat provider is configured. A JSON schema `response_format` is
+    requested through the output type it was made for, and the output
+    reports each request's token usage, as the provider's would. A job
+    left unfinished by an earlier process is restarted when it is next
+    polled.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        temperature: float | None = None,
+        root: Path | None = None,
+    ):
+        self._llm = Llm()
+        self.model = model or self._llm.model
+        self.temperature = (
+            temperature
+            if temperature is not None
+            else self._llm.temperature or 0.0
+        )
+        self.root = root or config.LLM_BATCH_WORK_DIR / PROVIDER
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def submit(self, path: Path) -> BatchJob:
+        job_id = f"local_batch_{uuid4().hex}"
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True)
+        shutil.copyfile(path, job_dir / "input.jsonl")
+        job = BatchJob(job_id=job_id, status="in_progress")
+        self._save(job)
+        self._start(job_id)
+        logger.info(f"Submitted local batch {job_id} from {path}")
+        return job
+
+    async def retrieve(self, job_id: str) -> BatchJob:
+        job = self._load(job_id)
+        task = self._tasks.get(job_id)
+        if not job.done and (
+            task is None
+            or task.done()
+            or task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._start(job_id)
+        return job
+
+    async def results(self, job: BatchJob) -> list[BatchResult]:
+        if job.output_file is None:
+            return []
+        return self.parse_results(Path(job.output_file).read_text())
+
+    async def cancel(self, job_id: str) -> None:
+        task = self._tasks.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+        job = self._load(job_id)
+        if not job.done:
+            job.status = "cancelled"
+            self._save(job)
+
+    def _start(self, job_id: str) -> None:
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: str) -> None:
+        job_dir = self.root / job_id
+        requests = self.read_requests(job_dir / "input.jsonl")
+        limit = asyncio.Semaphore(config.LLM_MAX_CONCURRENCY)
+
+        async def run_one(request: BatchRequest) -> dict[str, Any]:
+            async with limit:
+                return await self._complete(request)
+
+        lines = await asyncio.gather(*map(run_one, requests))
+        output_file = job_dir / "output.jsonl"
+        with output_file.open("w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line) + "\n")
+        failed = sum(1 for line in lines if line["error"])
+        self._save(
+            BatchJob(
+                job_id=job_id,
+                status="completed",
+                output_file=str(output_file),
+                request_count=len(lines),
+                completed_count=len(lines) - failed,
+                failed_count=failed,
+            )
+        )
+
+    async def _complete(self, request: BatchRequest) -> dict[str, Any]:
+        try:
+            response = await self._llm.ainvoke_unparsed(
+                system=request.system,
+                human=request.human,
+                output_type=output_type_for(request.response_format),
+                images=request.images or None,
+            )
+        except Exception as e:
+            return {
+                "custom_id": request.custom_id,
+                "response": None,
+                "error": {"code": type(e).__name__, "message": str(e)},
+            }
+        body: dict[str, Any] = {
+            "model": response.model or self.model,
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": response.content,
+                    }
+                }
+            ],
+        }
+        if response.usage is not None:
+            body["usage"] = {
+                "prompt_tokens": response.usage.input_tokens,
+                "completion_tokens": response.usage.output_tokens,
+                "total_tokens": response.usage.total_tokens,
+                "prompt_tokens_details": {
+                    "cached_tokens": response.usage.cached_input_tokens
+                },
+            }
+        return {
+            "custom_id": request.custom_id,
+            "response": {"status_code": 200, "body": body},
+            "error": None,
+        }
+
+    def _load(self, job_id: str) -> BatchJob:
+        return BatchJob.model_validate_json(
+            (self.root / job_id / "job.json").read_text()
+        )
+
+    def _save(self, job: BatchJob) -> None:
+        (self.root / job.job_id / "job.json").write_text(job.model_dump_json())
@@ -0,0 +1,49 @@
+from typing import Any
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+from src.common.llm.structured_output import response_format
+
+
+def build_chat_messages(
+    system: str, human: str, images: list[str] | None = None
+) -> list[BaseMessage]:
+    """
+    Build chat messages with the most stable content first: the system
+    prompt, then the images, then the per-call text.
+
+    Providers cache prompts by exact prefix, so the static system prompt,
+    which every call of a stage repeats, is served from the cache. The
+    classifier and referee have different system prompts, so they do not
+    share a cached prefix, image included; the image only precedes the
+    text so that calls repeating a stage's image with different text
+    (e.g. after a product description changes) can reuse it.
+    """
+    if images:
+        human_msg = HumanMessage(
+            content=[
+                *[
+                    {"type": "image_url", "image_url": {"url": url}}
+                    for url in images
+                ],
+                {"type": "text", "text": human},
+            ]
+        )
+    else:
+        human_msg = HumanMessage(content=human)
+    return [SystemMessage(content=system), human_msg]
+
+
+def response_format_kwargs(
+    output_type: type[BaseModel] | None,
+) -> dict[str, Any]:
+    """
+    Invocation kwargs asking a LangChain OpenAI chat model for output in
+    the JSON schema of `output_type`. Only used for non-streaming calls:
+    with a response format, LangChain streams through the beta parsing
+    helper, which drops the response headers the rate limiter learns
+    from.
+    """
+    requested = response_format(output_type)
+    return {"response_format": requested} if requested is not None else {}
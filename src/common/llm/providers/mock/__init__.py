@@ -0,0 +1,4 @@
+from .image_processor import MockImageProcessor
+from .llm import MockLlmProvider
+
+__all__ = ["MockImageProcessor", "MockLlmProvider"]
@@ -0,0 +1 @@
+PROVIDER = "mock"
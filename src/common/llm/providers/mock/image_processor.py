@@ -0,0 +1,25 @@
+import base64
+import logging
+
+from src.common.llm.base_classes import BaseImageProcessor
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@register_provider("image_processor", PROVIDER)
+class MockImageProcessor(BaseImageProcessor):
+    """
+    Image processor for the simulated provider. Images are encoded as
+    they are for OpenAI's API, so load tests pay the real encoding cost.
+    """
+
+    def encode_image(self, image_bytes: bytes) -> str:
+        logger.debug("Encoding image for mock provider")
+        return (
+            f"data:image/jpeg;base64,{base64.b64encode(image_bytes).decode()}"
+        )
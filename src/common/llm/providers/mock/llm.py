@@ -0,0 +1,323 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
+
+import httpx
+from pydantic import BaseModel
+
+from src.common.llm.base_classes import BaseLlmProvider, LlmResponse, LlmUsage
+from src.common.llm.registry import register_provider
+from src.config import config
+
+from .constants import PROVIDER
+
+Latency = Callable[[random.Random], float]
+
+_MOCK_URL = "https://mock.invalid/v1/chat/completions"
+_PRODUCT_KEY = re.compile(r"^product_key: (\S+)$", re.MULTILINE)
+_PROMPT_CACHE_BLOCK = 1024
+_STREAM_CHUNK_CHARS = 16
+# Share of a streamed call's latency spent before the first chunk.
+_FIRST_CHUNK_SHARE = 0.3
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Parse a latency distribution in seconds: `fixed:S`, `uniform:LO:HI`,
+    `exponential:MEAN` or `lognormal:MEDIAN:SIGMA`.
+    """
+    name, *params = [part.strip() for part in spec.split(":")]
+    try:
+        values = [float(param) for param in params]
+    except ValueError:
+        raise ValueError(f"Invalid mock LLM latency: {spec!r}") from None
+    if name == "fixed" and len(values) == 1:
+        seconds = values[0]
+        return lambda rng: seconds
+    if name == "uniform" and len(values) == 2:
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if name == "exponential" and len(values) == 1:
+        mean = values[0]
+        return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    if name == "lognormal" and len(values) == 2 and values[0] > 0:
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Invalid mock LLM latency: {spec!r}")
+
+
+def parse_statuses(spec: str) -> list[tuple[str, float]]:
+    """Parse comma-separated `status:weight` choices."""
+    statuses = []
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        status, _, weight = entry.strip().rpartition(":")
+        try:
+            statuses.append((status, float(weight)))
+        except ValueError:
+            raise ValueError(f"Invalid mock LLM status: {entry!r}") from None
+    if not statuses or sum(weight for _, weight in statuses) <= 0:
+        raise ValueError(f"Invalid mock LLM statuses: {spec!r}")
+    return statuses
+
+
+@register_provider("llm", PROVIDER)
+class MockLlmProvider(BaseLlmProvider):
+    """
+    Simulated chat provider for load testing the pipeline offline.
+
+    Output matches the JSON schema of the requested `output_type` and is
+    derived deterministically from the prompt and images, so repeated
+    runs classify each product the same way: fields named `*_status`
+    are drawn from `MOCK_LLM_STATUSES`, booleans are true for
+    `MOCK_LLM_TRUE_RATE` of inputs, numbers lie in [0, 1], and a list of
+    objects with a `product_key` gets one entry per `product_key:` line
+    of the prompt. Token usage is estimated like the rate limiter does,
+    with the system prompt served from the prompt cache after its first
+    call.
+
+    Latency is drawn from `MOCK_LLM_LATENCY`. `MOCK_LLM_RATE_LIMIT_RATE`
+    of calls fail with a 429 and `MOCK_LLM_TIMEOUT_RATE` time out after
+    `MOCK_LLM_TIMEOUT_SECONDS`, with errors classified like a real
+    provider's (see `errors`). Calls beyond `MOCK_LLM_MAX_CONCURRENCY`
+    in flight are rejected with a 429 too.
+    """
+
+    def __init__(
+        self, model: str | None = None, temperature: float | None = None
+    ):
+        self.model = model or config.MOCK_LLM_MODEL
+        self.temperature = temperature if temperature is not None else 0.0
+        self.latency = parse_latency(config.MOCK_LLM_LATENCY)
+        self.statuses = parse_statuses(config.MOCK_LLM_STATUSES)
+        self._random = random.Random(config.MOCK_LLM_SEED or None)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._cached_prompts: set[str] = set()
+
+    def invoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        with self._admit():
+            timed_out = self._inject_faults()
+            time.sleep(self._delay(timed_out))
+            if timed_out:
+                raise TimeoutError("Simulated LLM timeout")
+            return self._respond(system, human, images, output_type)
+
+    async def ainvoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        with self._admit():
+            timed_out = self._inject_faults()
+            await asyncio.sleep(self._delay(timed_out))
+            if timed_out:
+                raise TimeoutError("Simulated LLM timeout")
+            return self._respond(system, human, images, output_type)
+
+    async def astream(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> AsyncIterator[LlmResponse]:
+        with self._admit():
+            timed_out = self._inject_faults()
+            delay = self._delay(timed_out)
+            if timed_out:
+                await asyncio.sleep(delay)
+                raise TimeoutError("Simulated LLM timeout")
+            response = self._respond(system, human, images, output_type)
+            content = response.content
+            chunks = [
+                content[i : i + _STREAM_CHUNK_CHARS]
+                for i in range(0, len(content), _STREAM_CHUNK_CHARS)
+            ]
+            await asyncio.sleep(delay * _FIRST_CHUNK_SHARE)
+            for chunk in chunks:
+                yield LlmResponse(content=chunk)
+                await asyncio.sleep(
+                    delay * (1 - _FIRST_CHUNK_SHARE) / len(chunks)
+                )
+            yield LlmResponse(
+                content="", usage=response.usage, model=self.model
+            )
+
+    @contextmanager
+    def _admit(self) -> Iterator[None]:
+        with self._lock:
+            self._in_flight += 1
+            overloaded = 0 < config.MOCK_LLM_MAX_CONCURRENCY < self._in_flight
+        try:
+            if overloaded:
+                raise SimulatedRateLimitError("Simulated overload")
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _inject_faults(self) -> bool:
+        """Raise a simulated 429, or return whether the call times out."""
+        draw = self._random.random()
+        if draw < config.MOCK_LLM_RATE_LIMIT_RATE:
+            raise SimulatedRateLimitError("Simulated rate limit")
+        return (
+            draw
+            < config.MOCK_LLM_RATE_LIMIT_RATE + config.MOCK_LLM_TIMEOUT_RATE
+        )
+
+    def _delay(self, timed_out: bool) -> float:
+        if timed_out:
+            return config.MOCK_LLM_TIMEOUT_SECONDS
+        return max(0.0, self.latency(self._random))
+
+    def _respond(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None,
+        output_type: type[BaseModel] | None,
+    ) -> LlmResponse:
+        digest = hashlib.sha256(
+            "\0".join([system, human, *(images or [])]).encode()
+        ).hexdigest()
+        if output_type is None:
+            content = f"Simulated response {digest[:16]}."
+        else:
+            schema = output_type.model_json_schema()
+            content = json.dumps(
+                self._generate(schema, schema, digest, "", "", human)
+            )
+        return LlmResponse(
+            content=content,
+            usage=self._usage(system, human, images, content),
+            model=self.model,
+        )
+
+    def _usage(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None,
+        content: str,
+    ) -> LlmUsage:
+        input_tokens = (len(system) + len(human)) // 4 + len(
+            images or []
+        ) * config.LLM_IMAGE_TOKEN_ESTIMATE
+        with self._lock:
+            cached = system in self._cached_prompts
+            self._cached_prompts.add(system)
+        return LlmUsage(
+            input_tokens=input_tokens,
+            output_tokens=max(1, len(content) // 4),
+            cached_input_tokens=(
+                len(system) // 4 // _PROMPT_CACHE_BLOCK * _PROMPT_CACHE_BLOCK
+                if cached
+                else 0
+            ),
+        )
+
+    def _generate(
+        self,
+        node: dict[str, Any],
+        schema: dict[str, Any],
+        seed: str,
+        path: str,
+        name: str,
+        human: str,
+    ) -> Any:
+        ref = node.get("$ref")
+        if ref is not None:
+            node = schema.get("$defs", {})[ref.rsplit("/", 1)[-1]]
+        if "anyOf" in node:
+            node = next(
+                (n for n in node["anyOf"] if n.get("type") != "null"),
+                node["anyOf"][0],
+            )
+        draw = _draw(seed, path)
+        kind = node.get("type")
+        if kind == "object":
+            return {
+                key: self._generate(
+                    value, schema, seed, f"{path}/{key}", key, human
+                )
+                for key, value in node.get("properties", {}).items()
+            }
+        if kind == "array":
+            items = node.get("items", {})
+            item = schema.get("$defs", {}).get(
+                items.get("$ref", "").rsplit("/", 1)[-1], items
+            )
+            if "product_key" in item.get("properties", {}):
+                # One entry per labelled product, as in a packed request.
+                return [
+                    {
+                        **self._generate(
+                            item, schema, f"{seed}:{key}", path, "", human
+                        ),
+                        "product_key": key,
+                    }
+                    for key in _PRODUCT_KEY.findall(human)
+                ]
+            return [
+                self._generate(items, schema, seed, f"{path}/0", name, human)
+            ]
+        if kind == "boolean":
+            return draw < config.MOCK_LLM_TRUE_RATE
+        if kind == "number":
+            return round(draw, 2)
+        if kind == "integer":
+            return int(draw * 100)
+        if kind == "null":
+            return None
+        if "enum" in node:
+            return node["enum"][int(draw * len(node["enum"]))]
+        if name.endswith("status"):
+            return self._status(draw)
+        return f"Simulated {name.replace('_', ' ') or 'text'} {seed[:8]}."
+
+    def _status(self, draw: float) -> str:
+        total = sum(weight for _, weight in self.statuses)
+        threshold = draw * total
+        for status, weight in self.statuses:
+            threshold -= weight
+            if threshold < 0:
+                return status
+        return self.statuses[-1][0]
+
+
+def _draw(seed: str, path: str) -> float:
+    """A number in [0, 1) determined by the seed and the field path."""
+    digest = hashlib.sha256(f"{seed}{path}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+class SimulatedRateLimitError(Exception):
+    """A simulated 429, with a status and headers like a provider error."""
+
+    status_code = 429
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.response = httpx.Response(
+            429,
+            headers={"retry-after": "1"},
+            request=httpx.Request("POST", _MOCK_URL),
+        )
@@ -1,9 +1,11 @@
+from .batch_llm import OpenAiBatchLlmProvider
 from .embedding import OpenAiEmbeddingProvider
 from .image_processor import OpenAiImageProcessor
 from .llm import OpenAiLlmProvider
 
 __all__ = [
     "OpenAiLlmProvider",
+    "OpenAiBatchLlmProvider",
     "OpenAiEmbeddingProvider",
     "OpenAiImageProcessor",
 ]
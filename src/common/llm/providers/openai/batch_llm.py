@@ -0,0 +1,82 @@
+import logging
+from pathlib import Path
+from typing import Any, cast
+
+from openai import AsyncOpenAI
+from openai.types import Batch
+
+from src.common.llm.base_classes import (
+    BaseBatchLlmProvider,
+    BatchJob,
+    BatchResult,
+)
+from src.common.llm.http_client import get_async_http_client
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@register_provider("batch_llm", PROVIDER)
+class OpenAiBatchLlmProvider(BaseBatchLlmProvider):
+    """Runs batch files through the OpenAI Batch API."""
+
+    def __init__(
+        self, model: str | None = None, temperature: float | None = None
+    ):
+        self.model = model or config.OPENAI_LLM_MODEL
+        self.temperature = (
+            temperature
+            if temperature is not None
+            else config.OPENAI_LLM_TEMPERATURE
+        )
+        # Newer OpenAI SDKs are typed for httpx2 clients but accept the
+        # httpx client shared with the chat providers.
+        self._client = AsyncOpenAI(
+            api_key=config.OPENAI_API_KEY,
+            http_client=cast(Any, get_async_http_client()),
+        )
+
+    async def submit(self, path: Path) -> BatchJob:
+        with path.open("rb") as f:
+            input_file = await self._client.files.create(
+                file=f, purpose="batch"
+            )
+        batch = await self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} from {path}")
+        return self._to_job(batch)
+
+    async def retrieve(self, job_id: str) -> BatchJob:
+        return self._to_job(await self._client.batches.retrieve(job_id))
+
+    async def results(self, job: BatchJob) -> list[BatchResult]:
+        results: list[BatchResult] = []
+        for file_id in (job.output_file, job.error_file):
+            if file_id:
+                content = await self._client.files.content(file_id)
+                results.extend(self.parse_results(content.text))
+        return results
+
+    async def cancel(self, job_id: str) -> None:
+        await self._client.batches.cancel(job_id)
+
+    @staticmethod
+    def _to_job(batch: Batch) -> BatchJob:
+        counts = batch.request_counts
+        return BatchJob(
+            job_id=batch.id,
+            status=batch.status,
+            output_file=batch.output_file_id,
+            error_file=batch.error_file_id,
+            request_count=counts.total if counts else 0,
+            completed_count=counts.completed if counts else 0,
+            failed_count=counts.failed if counts else 0,
+        )
@@ -0,0 +1,4 @@
+from .image_processor import RouterImageProcessor
+from .llm import RouterLlmProvider
+
+__all__ = ["RouterImageProcessor", "RouterLlmProvider"]
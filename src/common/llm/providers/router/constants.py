@@ -0,0 +1 @@
+PROVIDER = "router"
@@ -0,0 +1,33 @@
+import logging
+
+from src.common.llm.base_classes import BaseImageProcessor
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+from .constants import PROVIDER
+from .llm import parse_deployments
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@register_provider("image_processor", PROVIDER)
+class RouterImageProcessor(BaseImageProcessor):
+    """
+    Image processor for the router, using the first deployment's format.
+    Every deployment behind a router must accept the same image format.
+    """
+
+    def __init__(self, deployments: str | None = None) -> None:
+        entries = parse_deployments(
+            deployments or config.LLM_ROUTER_DEPLOYMENTS
+        )
+        if not entries:
+            raise ValueError("No LLM deployments configured for the router")
+        self._processor = provider_pool.image_processor(entries[0][0])
+
+    def encode_image(self, image_bytes: bytes) -> str:
+        logger.debug("Encoding image for router provider")
+        return self._processor.encode_image(image_bytes)
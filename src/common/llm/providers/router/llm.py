@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import random
+from typing import AsyncIterator, Iterator
+
+from pydantic import BaseModel
+
+from src.common.concurrency import CircuitBreaker, CircuitBreakerStats
+from src.common.llm.base_classes import BaseLlmProvider, LlmResponse
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.errors import (
+    NoHealthyDeploymentError,
+    error_headers,
+    is_deployment_error,
+    is_rate_limit_error,
+)
+from src.common.llm.rate_limiter import (
+    RateLimiter,
+    estimate_tokens,
+    get_rate_limiter,
+    retry_after,
+)
+from src.common.llm.registry import register_provider
+from src.common.logging import setup_logging
+from src.config import config
+
+from .constants import PROVIDER
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class Deployment:
+    """One provider and model behind the router."""
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        weight: float,
+        temperature: float | None = None,
+    ) -> None:
+        self.name = f"{provider}:{model}"
+        self.model = model
+        self.weight = weight
+        self.provider = provider_pool.llm_provider(
+            provider, model, temperature
+        )
+        self.rate_limiter: RateLimiter = get_rate_limiter(provider, model)
+        self.breaker = CircuitBreaker(
+            f"llm_router[{self.name}]",
+            failure_threshold=config.LLM_ROUTER_BREAKER_FAILURES,
+            cooldown=config.LLM_ROUTER_BREAKER_COOLDOWN,
+        )
+
+    def score(self) -> float:
+        """Routing weight scaled by the share of quota left."""
+        return self.weight * self.rate_limiter.available()
+
+
+def parse_deployments(spec: str) -> list[tuple[str, str, float]]:
+    """
+    Parse a comma-separated list of `provider:model[:weight]` entries,
+    e.g. "azure:gpt-4o:3,openai:gpt-4o:1". The weight defaults to 1.
+    """
+    deployments = []
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        parts = [part.strip() for part in entry.split(":")]
+        if len(parts) not in (2, 3) or not all(parts):
+            raise ValueError(f"Invalid LLM deployment: {entry!r}")
+        weight = float(parts[2]) if len(parts) == 3 else 1.0
+        if weight <= 0:
+            raise ValueError(f"Deployment weight must be positive: {entry!r}")
+        deployments.append((parts[0].lower(), parts[1], weight))
+    return deployments
+
+
+@register_provider("llm", PROVIDER)
+class RouterLlmProvider(BaseLlmProvider):
+    """
+    Spreads calls over several deployments (`LLM_ROUTER_DEPLOYMENTS`).
+
+    Each call goes to a deployment picked at random by weight times the
+    share of its rate-limit quota left, so a deployment close to its
+    limit gets fewer calls. Each deployment has its own rate limiter, fed
+    from its response headers, and a circuit breaker: a deployment that
+    keeps failing is skipped until its cooldown has passed, and a failed
+    call fails over at once to the next deployment rather than waiting
+    for the caller's retry backoff. The caller only sees an error once
+    every available deployment has failed the call.
+
+    Passing `model` restricts the router to deployments of that model.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        temperature: float | None = None,
+        deployments: str | None = None,
+    ) -> None:
+        entries = parse_deployments(
+            deployments or config.LLM_ROUTER_DEPLOYMENTS
+        )
+        if model is not None:
+            entries = [entry for entry in entries if entry[1] == model]
+        if not entries:
+            raise ValueError("No LLM deployments configured for the router")
+        self.deployments = [
+            Deployment(provider, name, weight, temperature)
+            for provider, name, weight in entries
+        ]
+        self.model = model or PROVIDER
+        self.temperature = (
+            temperature
+            if temperature is not None
+            else getattr(self.deployments[0].provider, "temperature", 0.0)
+        )
+
+    @property
+    def deployment_names(self) -> list[str]:
+        """`provider:model` of each deployment calls may be routed to."""
+        return [deployment.name for deployment in self.deployments]
+
+    def invoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        estimated_tokens = estimate_tokens(system, human, images)
+        error: Exception | None = None
+        for deployment in self._candidates():
+            deployment.rate_limiter.acquire_blocking(estimated_tokens)
+            try:
+                response = deployment.provider.invoke(
+                    system, human, images, output_type=output_type
+                )
+            except Exception as e:
+                self._on_failure(deployment, e)
+                deployment.rate_limiter.release(estimated_tokens)
+                error = e
+                continue
+            return self._on_success(deployment, response, estimated_tokens)
+        raise error or NoHealthyDeploymentError(self._unhealthy_message())
+
+    async def ainvoke(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> LlmResponse:
+        estimated_tokens = estimate_tokens(system, human, images)
+        error: Exception | None = None
+        for deployment in self._candidates():
+            await deployment.rate_limiter.acquire(estimated_tokens)
+            try:
+                response = await deployment.provider.ainvoke(
+                    system, human, images, output_type=output_type
+                )
+            except Exception as e:
+                self._on_failure(deployment, e)
+                deployment.rate_limiter.release(estimated_tokens)
+                error = e
+                continue
+            return self._on_success(deployment, response, estimated_tokens)
+        raise error or NoHealthyDeploymentError(self._unhealthy_message())
+
+    async def astream(
+        self,
+        system: str,
+        human: str,
+        images: list[str] | None = None,
+        output_type: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str | LlmResponse]:
+        # Fail over only until the first chunk: after that, the caller
+        # has already seen part of this deployment's output.
+        estimated_tokens = estimate_tokens(system, human, images)
+        error: Exception | None = None
+        for deployment in self._candidates():
+            await deployment.rate_limiter.acquire(estimated_tokens)
+            started = False
+            try:
+                async for chunk in deployment.provider.astream(
+                    system, human, images, output_type=output_type
+                ):
+                    started = True
+                    if isinstance(chunk, LlmResponse) and chunk.usage:
+                        deployment.rate_limiter.settle(
+                            estimated_tokens, chunk.usage.total_tokens
+                        )
+                    yield self._strip(deployment, chunk)
+            except Exception as e:
+                self._on_failure(deployment, e)
+                if started:
+                    raise
+                deployment.rate_limiter.release(estimated_tokens)
+                error = e
+                continue
+            deployment.breaker.record_success()
+            return
+        raise error or NoHealthyDeploymentError(self._unhealthy_message())
+
+    async def awarm_up(self) -> None:
+        results = await asyncio.gather(
+            *(d.provider.awarm_up() for d in self.deployments),
+            return_exceptions=True,
+        )
+        for deployment, result in zip(self.deployments, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Warm-up of deployment {deployment.name} failed: "
+                    f"{result}"
+                )
+
+    def stats(self) -> list[CircuitBreakerStats]:
+        """Circuit breaker state and outcomes per deployment."""
+        return [deployment.breaker.stats() for deployment in self.deployments]
+
+    def _candidates(self) -> Iterator[Deployment]:
+        """
+        Deployments in routing order, skipping those whose circuit is
+        open. The order is a weighted sample without replacement: each
+        deployment draws random() ** (1 / score) and the highest draw
+        goes first.
+        """
+        scores = [deployment.score() for deployment in self.deployments]
+        if not any(scores):
+            # Every quota is drained: fall back to the static weights.
+            scores = [deployment.weight for deployment in self.deployments]
+        keys = [
+            random.random() ** (1 / score) if score > 0 else -random.random()
+            for score in scores
+        ]
+        order = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+        for index in order:
+            deployment = self.deployments[index]
+            if deployment.breaker.allow():
+                yield deployment
+
+    def _on_success(
+        self,
+        deployment: Deployment,
+        response: str | LlmResponse,
+        estimated_tokens: int,
+    ) -> LlmResponse:
+        deployment.breaker.record_success()
+        if not isinstance(response, LlmResponse):
+            return LlmResponse(content=response)
+        if response.usage is not None:
+            deployment.rate_limiter.settle(
+                estimated_tokens, response.usage.total_tokens
+            )
+        deployment.rate_limiter.update_from_headers(response.headers)
+        return response.model_copy(
+            update={"headers": {}, "model": response.model or deployment.model}
+        )
+
+    def _strip(
+        self, deployment: Deployment, chunk: str | LlmResponse
+    ) -> str | LlmResponse:
+        # Rate-limit headers describe one deployment: they feed its own
+        # limiter, not the caller's limiter for the router as a whole.
+        # The chunk is tagged with the deployment's model for pricing.
+        if not isinstance(chunk, LlmResponse):
+            return chunk
+        if chunk.headers:
+            deployment.rate_limiter.update_from_headers(chunk.headers)
+        return chunk.model_copy(
+            update={"headers": {}, "model": chunk.model or deployment.model}
+        )
+
+    def _on_failure(self, deployment: Deployment, error: Exception) -> None:
+        if not is_deployment_error(error):
+            # The request itself is at fault and the deployment answered;
+            # another deployment would reject it too.
+            deployment.breaker.record_success()
+            raise error
+        deployment.breaker.record_failure()
+        if is_rate_limit_error(error):
+            deployment.rate_limiter.on_rate_limited(
+                retry_after(error_headers(error))
+            )
+        logger.warning(
+            f"LLM deployment {deployment.name} failed, failing over: {error}"
+        )
+
+    def _unhealthy_message(self) -> str:
+        names = ", ".join(deployment.name for deployment in self.deployments)
+        return f"No healthy LLM deployment among {names}"
@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Mapping
+
+from pydantic import BaseModel
+
+from src.common.logging import setup_logging
+from src.config import config
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse a rate-limit reset header such as "6m0s", "1.5s" or "20ms"."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_SECONDS[unit] for n, unit in parts)
+
+
+class RateLimiterStats(BaseModel):
+    name: str
+    requests_per_minute: float | None
+    tokens_per_minute: float | None
+    admitted: int
+    waited_seconds: float
+    rate_limited: int
+
+
+class _Bucket:
+    """
+    Token bucket refilled continuously at `limit` per minute.
+
+    Callers reserve capacity up front and the level may go negative; the
+    returned delay is how long the caller must wait for the bucket to
+    refill to zero. This keeps admission first-come, first-served without
+    holding a lock while waiting. A limit of None means unlimited.
+    """
+
+    def __init__(self, limit: float | None) -> None:
+        self.limit = limit
+        self.level = limit or 0.0
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        if not self.limit:
+            return 0.0
+        self._refill(now)
+        self.level -= amount
+        if self.level >= 0:
+            return 0.0
+        return -self.level * 60.0 / self.limit
+
+    def refund(self, amount: float, now: float) -> None:
+        if self.limit:
+            self._refill(now)
+            self.level = min(self.limit, self.level + amount)
+
+    def set_limit(self, limit: float, now: float) -> None:
+        self._refill(now)
+        if self.limit is None:
+            self.level = limit
+        self.limit = limit
+        self.level = min(self.level, limit)
+
+    def cap_level(self, remaining: float, now: float) -> None:
+        """Lower the level to what the server says is left, if lower."""
+        if self.limit:
+            self._refill(now)
+            self.level = min(self.level, remaining)
+
+    def fraction(self, now: float) -> float:
+        """Share of the bucket that is filled, 1 if unlimited."""
+        if not self.limit:
+            return 1.0
+        self._refill(now)
+        return min(max(self.level / self.limit, 0.0), 1.0)
+
+    def _refill(self, now: float) -> None:
+        if self.limit:
+            elapsed = now - self.updated
+            self.level = min(
+                self.limit, self.level + elapsed * self.limit / 60.0
+            )
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one LLM
+    deployment, shared by every Llm instance that calls it.
+
+    Each call reserves one request and its estimated tokens before it is
+    sent and waits if either bucket is empty, so calls are spread out
+    instead of bursting into 429s. Limits start from configuration and
+    are learned from the provider's x-ratelimit-* response headers; the
+    admitted rate is kept at `headroom` times the reported limit. Once a
+    call returns, the token estimate is corrected with the actual usage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        headroom: float = 0.95,
+    ) -> None:
+        self.name = name
+        self.headroom = headroom
+        self._requests = _Bucket(self._scaled(requests_per_minute))
+        self._tokens = _Bucket(self._scaled(tokens_per_minute))
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._admitted = 0
+        self._waited_seconds = 0.0
+        self._rate_limited = 0
+
+    async def acquire(self, tokens: int) -> None:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, tokens: int) -> None:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Correct a reservation once the call's real usage is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                self._tokens.refund(difference, now)
+            elif difference < 0:
+                self._tokens.reserve(-difference, now)
+
+    def release(self, tokens: int) -> None:
+        """
+        Give back the reservation of a call the deployment did not serve,
+        e.g. one that failed over to another deployment.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refund(1, now)
+            self._tokens.refund(tokens, now)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Learn limits and remaining quota from x-ratelimit-* headers."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in (
+                (self._requests, "requests"),
+                (self._tokens, "tokens"),
+            ):
+                limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+                if limit:
+                    scaled = limit * self.headroom
+                    if scaled != bucket.limit:
+                        logger.info(
+                            f"{self.name}: learned {kind} limit {limit:g}/min"
+                        )
+                        bucket.set_limit(scaled, now)
+                remaining = _number(
+                    headers.get(f"x-ratelimit-remaining-{kind}")
+                )
+                if remaining is not None and bucket.limit:
+                    bucket.cap_level(
+                        remaining - (1 - self.headroom) * bucket.limit, now
+                    )
+
+    def on_rate_limited(self, retry_after: float | None = None) -> None:
+        """Stop admitting calls for a while after the provider sent a 429."""
+        wait = retry_after if retry_after is not None else 1.0
+        with self._lock:
+            self._rate_limited += 1
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + wait
+            )
+        logger.warning(
+            f"{self.name}: rate limited by provider, pausing {wait:.1f}s"
+        )
+
+    def available(self) -> float:
+        """
+        Share of the request and token quota left right now, from 0 when
+        either bucket is empty or calls are paused to 1 when both are full
+        or no limit is known.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return 0.0
+            return min(
+                self._requests.fraction(now), self._tokens.fraction(now)
+            )
+
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            name=self.name,
+            requests_per_minute=self._requests.limit,
+            tokens_per_minute=self._tokens.limit,
+            admitted=self._admitted,
+            waited_seconds=self._waited_seconds,
+            rate_limited=self._rate_limited,
+        )
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = max(
+                self._paused_until - now,
+                self._requests.reserve(1, now),
+                self._tokens.reserve(tokens, now),
+            )
+            self._admitted += 1
+            self._waited_seconds += delay
+        return delay
+
+    def _scaled(self, limit: float | None) -> float | None:
+        return limit * self.headroom if limit else None
+
+
+def _number(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait according to a 429 response's headers, if given."""
+    headers = {k.lower(): v for k, v in headers.items()}
+    if "retry-after-ms" in headers:
+        milliseconds = _number(headers["retry-after-ms"])
+        if milliseconds is not None:
+            return milliseconds / 1000
+    if "retry-after" in headers:
+        seconds = _number(headers["retry-after"])
+        if seconds is not None:
+            return seconds
+    resets = [
+        parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if name in headers
+    ]
+    known = [reset for reset in resets if reset is not None]
+    return max(known) if known else None
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str, model: str, configured: bool = True
+) -> RateLimiter:
+    """
+    Return the process-wide limiter for a provider and model. It starts
+    from `LLM_RATE_LIMIT_RPM`/`LLM_RATE_LIMIT_TPM` unless `configured`
+    is false, e.g. for a router whose deployments have limiters of their
+    own; then it only applies limits learned from response headers.
+    """
+    name = f"{provider}:{model}"
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = RateLimiter(
+                name,
+                requests_per_minute=(
+                    config.LLM_RATE_LIMIT_RPM or None if configured else None
+                ),
+                tokens_per_minute=(
+                    config.LLM_RATE_LIMIT_TPM or None if configured else None
+                ),
+                headroom=config.LLM_RATE_LIMIT_HEADROOM,
+            )
+            _limiters[name] = limiter
+    return limiter
+
+
+def estimate_tokens(
+    system: str, human: str, images: list[str] | None = None
+) -> int:
+    """
+    Rough token estimate for a call, used to reserve TPM capacity: about
+    four characters per text token, a fixed cost per image and the
+    expected completion length.
+    """
+    return (
+        (len(system) + len(human)) // 4
+        + len(images or []) * config.LLM_IMAGE_TOKEN_ESTIMATE
+        + config.LLM_OUTPUT_TOKEN_ESTIMATE
+    )
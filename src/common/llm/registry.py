@@ -11,6 +11,7 @@ PROVIDERS: dict[str, dict[str, Type]] = {
     "llm": {},
     "embedding": {},
     "image_processor": {},
+    "batch_llm": {},
 }
 
 
@@ -0,0 +1,157 @@
+import json
+from typing import Any
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}" + _WHITESPACE
+
+
+class IncrementalJsonParser:
+    """
+    Parses the top-level fields of a JSON object while its text is still
+    arriving.
+
+    Text is fed in chunks as it streams; each call to `feed` returns the
+    fields whose values became complete, in the order they appear. Text
+    before the opening brace (e.g. a markdown fence) is ignored. Nested
+    values are returned once they are complete, as parsed by `json`.
+    Malformed text stops the parser quietly; validating the full output
+    is left to the caller.
+    """
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: str | None = None
+        # Progress through the key or value being read, so that each feed
+        # scans only the new text instead of the whole value again.
+        self._scan: int | None = None
+        self._scalar = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self) -> bool:
+        """True once the object has closed or the text was malformed."""
+        return self._state in ("done", "failed")
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        if self.done:
+            return []
+        self._buffer += text
+        completed: list[tuple[str, Any]] = []
+        try:
+            self._parse(completed)
+        except ValueError:
+            self._state = "failed"
+        # Drop the text that has been consumed.
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            if self._scan is not None:
+                self._scan -= self._pos
+            self._pos = 0
+        return completed
+
+    def _parse(self, completed: list[tuple[str, Any]]) -> None:
+        while self._state != "done":
+            self._skip_whitespace()
+            if self._pos >= len(self._buffer):
+                break
+            char = self._buffer[self._pos]
+            if self._state == "start":
+                start = self._buffer.find("{", self._pos)
+                if start < 0:
+                    self._pos = len(self._buffer)
+                    break
+                self._pos = start + 1
+                self._state = "key"
+            elif self._state in ("key", "comma") and char == "}":
+                self._pos += 1
+                self._state = "done"
+            elif self._state == "comma":
+                if char != ",":
+                    raise ValueError(f"Expected ',' at {self._pos}")
+                self._pos += 1
+                self._state = "key"
+            elif self._state == "key":
+                if char != '"':
+                    raise ValueError(f"Expected '\"' at {self._pos}")
+                end = self._token_end(self._pos)
+                if end is None:
+                    break
+                self._key = json.loads(self._buffer[self._pos : end])
+                self._pos = end
+                self._state = "colon"
+            elif self._state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':' at {self._pos}")
+                self._pos += 1
+                self._state = "value"
+            else:
+                end = self._token_end(self._pos)
+                if end is None:
+                    break
+                value = json.loads(self._buffer[self._pos : end])
+                key = str(self._key)
+                self.fields[key] = value
+                completed.append((key, value))
+                self._pos = end
+                self._state = "comma"
+
+    def _skip_whitespace(self) -> None:
+        while (
+            self._pos < len(self._buffer)
+            and self._buffer[self._pos] in _WHITESPACE
+        ):
+            self._pos += 1
+
+    def _token_end(self, start: int) -> int | None:
+        """
+        Index just past the string, object, array or scalar starting at
+        `start`, if it has fully arrived. Scanning resumes where the last
+        call stopped.
+        """
+        buffer = self._buffer
+        if self._scan is None:
+            self._scan = start
+            self._scalar = buffer[start] not in '"{['
+            self._depth = 0
+            self._in_string = False
+            self._escaped = False
+        i = self._scan
+        if self._scalar:
+            # A number, true, false or null ends at the next delimiter,
+            # which must have arrived for the value to be known complete.
+            while i < len(buffer) and buffer[i] not in _SCALAR_END:
+                i += 1
+            if i < len(buffer):
+                self._scan = None
+                return i
+            self._scan = i
+            return None
+        while i < len(buffer):
+            char = buffer[i]
+            i += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        self._scan = None
+                        return i
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._scan = None
+                    return i
+        self._scan = i
+        return None
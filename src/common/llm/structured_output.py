@@ -0,0 +1,233 @@
+import json
+import re
+from typing import Any, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from src.config import config
+
+from .errors import LlmOutputParseError
+
+T = TypeVar("T", bound=BaseModel)
+
+_CODE_FENCE = re.compile(r"^```[\w-]*\s*\n?(.*?)\n?\s*(?:```\s*)?$", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Output types by schema name, for requests that only carry their
+# response format (e.g. batch request files).
+_output_types: dict[str, Type[BaseModel]] = {}
+
+
+class StructuredOutputStats(BaseModel):
+    """How LLM outputs parsed: as returned, after repair, or not at all."""
+
+    parsed: int = 0
+    repaired: int = 0
+    invalid: int = 0
+
+
+def strict_json_schema(output_type: Type[BaseModel]) -> dict[str, Any]:
+    """
+    JSON schema of a model in the form strict structured output accepts:
+    every object closed to extra properties and listing all of its
+    properties as required, without titles or defaults.
+    """
+    schema: dict[str, Any] = _strict(output_type.model_json_schema())
+    return schema
+
+
+# Keywords whose values map names (of properties or definitions) to
+# schemas, so their keys are names rather than keywords.
+_SCHEMA_MAPS = ("properties", "$defs")
+
+
+def _strict(node: Any) -> Any:
+    """
+    Strict form of a schema node. Only keywords of the node itself are
+    dropped, never properties that happen to be called `title`:
+
+    >>> _strict({
+    ...     "type": "object",
+    ...     "title": "Product",
+    ...     "properties": {"title": {"type": "string", "title": "Title"}},
+    ... })  # doctest: +NORMALIZE_WHITESPACE
+    {'type': 'object', 'properties': {'title': {'type': 'string'}},
+     'required': ['title'], 'additionalProperties': False}
+    """
+    if isinstance(node, list):
+        return [_strict(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    strict = {
+        key: (
+            {name: _strict(schema) for name, schema in value.items()}
+            if key in _SCHEMA_MAPS and isinstance(value, dict)
+            else _strict(value)
+        )
+        for key, value in node.items()
+        if key not in ("title", "default")
+    }
+    if strict.get("type") == "object" and "properties" in strict:
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+
+def response_format(
+    output_type: Type[BaseModel] | None,
+) -> dict[str, Any] | None:
+    """
+    The chat completions `response_format` for an output type, according
+    to `LLM_RESPONSE_FORMAT`, or None to leave the format to the prompt.
+    """
+    if output_type is None or config.LLM_RESPONSE_FORMAT == "none":
+        return None
+    if config.LLM_RESPONSE_FORMAT == "json_object":
+        return {"type": "json_object"}
+    _output_types[output_type.__name__] = output_type
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": output_type.__name__,
+            "schema": strict_json_schema(output_type),
+            "strict": True,
+        },
+    }
+
+
+def output_type_for(
+    requested: dict[str, Any] | None,
+) -> Type[BaseModel] | None:
+    """
+    The output type a JSON schema `response_format` was made for by this
+    process, or None for other formats and unknown schemas.
+    """
+    if not requested or requested.get("type") != "json_schema":
+        return None
+    return _output_types.get(requested["json_schema"]["name"])
+
+
+def repair_json(text: str) -> list[str]:
+    """
+    Candidate repairs of malformed JSON output, most complete first.
+
+    Markdown code fences and any text around the top-level value are
+    removed, as are trailing commas before a closing bracket. Output cut
+    off mid-value (e.g. at the token limit) has its open string, arrays
+    and objects closed, and as a fallback is also cut back to each
+    earlier comma, dropping the incomplete member.
+    """
+    text = text.strip()
+    fenced = _CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    start = min(
+        (i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1
+    )
+    if start < 0:
+        return []
+
+    out: list[str] = []
+    stack: list[str] = []
+    commas: list[int] = []
+    in_string = escaped = False
+    for char in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            if not stack or stack.pop() != char:
+                return []
+            if commas and not "".join(out[commas[-1] + 1 :]).strip():
+                del out[commas.pop() :]
+            if not stack:
+                # Drop whatever follows the top-level value.
+                return ["".join(out) + char]
+        elif char == ",":
+            commas.append(len(out))
+        out.append(char)
+
+    repaired = "".join(out)
+    candidates = [_close(repaired)]
+    candidates.extend(_close(repaired[:i]) for i in reversed(commas))
+    return candidates
+
+
+def _close(text: str) -> str:
+    """Close the open string and containers of truncated JSON."""
+    stack: list[str] = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text = text[:-1] if escaped else text
+        text += '"'
+    text = text.rstrip().rstrip(",").rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def parse_output(output_type: Type[T], content: str) -> tuple[T, bool]:
+    """
+    Parse LLM output into `output_type`, repairing it locally if needed.
+    Returns the parsed output and whether it had to be repaired; raises
+    LlmOutputParseError if no repair is valid.
+    """
+    try:
+        return output_type.model_validate_json(content), False
+    except ValidationError as e:
+        error = e
+    for candidate in repair_json(content):
+        try:
+            return output_type.model_validate_json(candidate), True
+        except ValueError:
+            continue
+    raise LlmOutputParseError(
+        f"Invalid {output_type.__name__} output: {error}", content
+    )
+
+
+def parse_items(output_type: Type[T], content: str, field: str) -> list[T]:
+    """
+    Parse the valid items of the list `field` of a JSON object in LLM
+    output, repairing the output locally if needed and skipping items
+    that do not match `output_type`. For output that failed to parse as
+    a whole; returns an empty list if no list can be recovered.
+    """
+    for candidate in [content, *repair_json(content)]:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        items = data.get(field) if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            continue
+        parsed: list[T] = []
+        for item in items:
+            try:
+                parsed.append(output_type.model_validate(item))
+            except ValidationError:
+                continue
+        return parsed
+    return []
@@ -0,0 +1,52 @@
+import threading
+
+from pydantic import BaseModel
+
+from src.common.llm.base_classes import LlmUsage
+
+
+class LlmStageUsage(BaseModel):
+    """Token usage summed over the calls of one stage (e.g. "classify")."""
+
+    stage: str
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of input tokens served from the prompt-prefix cache."""
+        if not self.input_tokens:
+            return 0.0
+        return self.cached_input_tokens / self.input_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.stage}: {self.calls} calls, "
+            f"{self.input_tokens} input tokens "
+            f"({self.cache_hit_rate:.1%} cached), "
+            f"{self.output_tokens} output tokens"
+        )
+
+
+class LlmUsageTracker:
+    """Accumulates reported token usage per stage."""
+
+    def __init__(self) -> None:
+        self._stages: dict[str, LlmStageUsage] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, usage: LlmUsage) -> None:
+        with self._lock:
+            totals = self._stages.get(stage)
+            if totals is None:
+                totals = self._stages[stage] = LlmStageUsage(stage=stage)
+            totals.calls += 1
+            totals.input_tokens += usage.input_tokens
+            totals.cached_input_tokens += usage.cached_input_tokens
+            totals.output_tokens += usage.output_tokens
+
+    def stats(self) -> list[LlmStageUsage]:
+        with self._lock:
+            return [totals.model_copy() for totals in self._stages.values()]
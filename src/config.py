@@ -13,7 +13,7 @@ class Config:
     # LLM Provider Configuration
     LLM_PROVIDER: str = os.getenv(
         "LLM_PROVIDER", "azure"
-    )  # "openai" or "azure"
+    )  # "openai", "azure", "router", "mock" or "cassette"
 
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -95,6 +95,97 @@ class Config:
     DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "2"))
     DB_ASYNC_POOL_SIZE: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
 
+    # Pipeline Configuration
+    PIPELINE_DB_CONCURRENCY: int = int(
+        os.getenv("PIPELINE_DB_CONCURRENCY", "10")
+    )
+    PIPELINE_IO_CONCURRENCY: int = int(
+        os.getenv("PIPELINE_IO_CONCURRENCY", "32")
+    )
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+    PIPELINE_OVERVIEW_BATCH_SIZE: int = int(
+        os.getenv("PIPELINE_OVERVIEW_BATCH_SIZE", "100")
+    )
+    PIPELINE_STATS_LOG_INTERVAL: float = float(
+        os.getenv("PIPELINE_STATS_LOG_INTERVAL", "30")
+    )
+
+    # Prediction Write-Behind Configuration
+    PREDICTION_WRITE_BATCH_SIZE: int = int(
+        os.getenv("PREDICTION_WRITE_BATCH_SIZE", "500")
+    )
+    PREDICTION_WRITE_FLUSH_INTERVAL: float = float(
+        os.getenv("PREDICTION_WRITE_FLUSH_INTERVAL", "2.0")
+    )
+    # Rows a writer holds before new rows wait for a successful flush.
+    PREDICTION_WRITE_MAX_BUFFERED: int = int(
+        os.getenv("PREDICTION_WRITE_MAX_BUFFERED", "5000")
+    )
+
+    # Product Overview Configuration
+    PRODUCT_OVERVIEW_MATERIALIZED: bool = (
+        os.getenv("PRODUCT_OVERVIEW_MATERIALIZED", "False").lower() == "true"
+    )
+
+    # Referee mode: "image" resends the image; "text" works from the
+    # classifier's image summary and sends the image only when unsure
+    LLM_REFEREE_MODE: str = os.getenv("LLM_REFEREE_MODE", "image").lower()
+
+    # Products classified per LLM request (1 = one request per product)
+    LLM_PACK_SIZE: int = int(os.getenv("LLM_PACK_SIZE", "1"))
+
+    # LLM Verdict Cache Configuration
+    VERDICT_CACHE_ENABLED: bool = (
+        os.getenv("VERDICT_CACHE_ENABLED", "True").lower() == "true"
+    )
+    # Also reuse cached verdicts for single-product API requests
+    VERDICT_CACHE_API_ENABLED: bool = (
+        os.getenv("VERDICT_CACHE_API_ENABLED", "False").lower() == "true"
+    )
+    VERDICT_CACHE_LOOKUP_BATCH_SIZE: int = int(
+        os.getenv("VERDICT_CACHE_LOOKUP_BATCH_SIZE", "100")
+    )
+
+    # Attribute Cache Configuration (seconds; 0 disables expiry)
+    ATTRIBUTE_CACHE_TTL: float = float(
+        os.getenv("ATTRIBUTE_CACHE_TTL", "3600")
+    )
+
+    # Batch Runner Configuration
+    BATCH_PAGE_SIZE: int = int(os.getenv("BATCH_PAGE_SIZE", "1000"))
+    BATCH_CHECKPOINT_INTERVAL: int = int(
+        os.getenv("BATCH_CHECKPOINT_INTERVAL", "500")
+    )
+
+    # Offline Batch API Configuration
+    LLM_BATCH_API_ENABLED: bool = (
+        os.getenv("LLM_BATCH_API_ENABLED", "False").lower() == "true"
+    )
+    LLM_BATCH_PROVIDER: str = os.getenv(
+        "LLM_BATCH_PROVIDER", "local"
+    )  # "openai" or "local"
+    LLM_BATCH_WORK_DIR: Path = Path(
+        os.getenv("LLM_BATCH_WORK_DIR", "data/llm_batches")
+    )
+    LLM_BATCH_MAX_REQUESTS: int = int(
+        os.getenv("LLM_BATCH_MAX_REQUESTS", "1000")
+    )
+    # Batch files over this size are split into several jobs; OpenAI
+    # accepts input files of up to 200 MB.
+    LLM_BATCH_MAX_FILE_BYTES: int = int(
+        os.getenv("LLM_BATCH_MAX_FILE_BYTES", "190000000")
+    )
+    LLM_BATCH_MAX_ACTIVE_JOBS: int = int(
+        os.getenv("LLM_BATCH_MAX_ACTIVE_JOBS", "4")
+    )
+    LLM_BATCH_POLL_INTERVAL: float = float(
+        os.getenv("LLM_BATCH_POLL_INTERVAL", "60")
+    )
+    # Share of a model's LLM_MODEL_PRICES price charged for batch tokens
+    LLM_BATCH_PRICE_FACTOR: float = float(
+        os.getenv("LLM_BATCH_PRICE_FACTOR", "0.5")
+    )
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
 
@@ -108,6 +199,136 @@ class Config:
         os.getenv("OPENAI_LLM_BACKOFF_JITTER", "true").lower() == "true"
     )
 
+    # LLM Adaptive Concurrency (AIMD between the min and max limits)
+    LLM_INITIAL_CONCURRENCY: int = int(
+        os.getenv("LLM_INITIAL_CONCURRENCY", "8")
+    )
+    LLM_MIN_CONCURRENCY: int = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+
+    # LLM HTTP Client Pool (shared keep-alive connections)
+    LLM_HTTP_MAX_CONNECTIONS: int = int(
+        os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")
+    )
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "64")
+    )
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120")
+    )
+    LLM_HTTP_TIMEOUT: float = float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+    LLM_WARM_UP_ON_STARTUP: bool = (
+        os.getenv("LLM_WARM_UP_ON_STARTUP", "True").lower() == "true"
+    )
+
+    # LLM Request Hedging (duplicate calls slower than the percentile)
+    LLM_HEDGE_ENABLED: bool = (
+        os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true"
+    )
+    LLM_HEDGE_PERCENTILE: float = float(
+        os.getenv("LLM_HEDGE_PERCENTILE", "95")
+    )
+    LLM_HEDGE_BUDGET: float = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_WINDOW: int = int(os.getenv("LLM_HEDGE_WINDOW", "500"))
+    LLM_HEDGE_PROVIDER: str = os.getenv(
+        "LLM_HEDGE_PROVIDER", ""
+    )  # empty = hedge to the same deployment
+    LLM_HEDGE_MODEL: str = os.getenv("LLM_HEDGE_MODEL", "")
+
+    # LLM Deployment Router (LLM_PROVIDER=router)
+    LLM_ROUTER_DEPLOYMENTS: str = os.getenv(
+        "LLM_ROUTER_DEPLOYMENTS", ""
+    )  # comma-separated provider:model[:weight], e.g. "azure:gpt-4o:3"
+    LLM_ROUTER_BREAKER_FAILURES: int = int(
+        os.getenv("LLM_ROUTER_BREAKER_FAILURES", "5")
+    )
+    LLM_ROUTER_BREAKER_COOLDOWN: float = float(
+        os.getenv("LLM_ROUTER_BREAKER_COOLDOWN", "30")
+    )
+
+    # Simulated LLM for load testing without API calls (LLM_PROVIDER=mock).
+    # Latency in seconds: fixed:S, uniform:LO:HI, exponential:MEAN or
+    # lognormal:MEDIAN:SIGMA
+    MOCK_LLM_MODEL: str = os.getenv("MOCK_LLM_MODEL", "mock")
+    MOCK_LLM_LATENCY: str = os.getenv("MOCK_LLM_LATENCY", "lognormal:1.5:0.4")
+    MOCK_LLM_RATE_LIMIT_RATE: float = float(
+        os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0")
+    )  # share of calls failing with a 429
+    MOCK_LLM_TIMEOUT_RATE: float = float(
+        os.getenv("MOCK_LLM_TIMEOUT_RATE", "0")
+    )  # share of calls timing out after MOCK_LLM_TIMEOUT_SECONDS
+    MOCK_LLM_TIMEOUT_SECONDS: float = float(
+        os.getenv("MOCK_LLM_TIMEOUT_SECONDS", "30")
+    )
+    MOCK_LLM_MAX_CONCURRENCY: int = int(
+        os.getenv("MOCK_LLM_MAX_CONCURRENCY", "0")
+    )  # calls in flight beyond this get a 429 (0 = unlimited)
+    MOCK_LLM_STATUSES: str = os.getenv(
+        "MOCK_LLM_STATUSES",
+        "MATCH:0.6,SUBJECTIVE_MISMATCH:0.25,CONFIDENT_MISMATCH:0.15",
+    )  # status:weight choices for *_status output fields
+    MOCK_LLM_TRUE_RATE: float = float(
+        os.getenv("MOCK_LLM_TRUE_RATE", "0.2")
+    )  # share of boolean output fields answered true
+    MOCK_LLM_SEED: str = os.getenv(
+        "MOCK_LLM_SEED", ""
+    )  # seeds latency and fault injection (empty = unseeded)
+
+    # Recorded LLM responses for reproducible runs (LLM_PROVIDER=cassette)
+    LLM_CASSETTE_MODE: str = os.getenv(
+        "LLM_CASSETTE_MODE", "replay"
+    ).lower()  # "record" or "replay"
+    LLM_CASSETTE_PATH: Path = Path(
+        os.getenv("LLM_CASSETTE_PATH", "data/cassettes/llm.jsonl.gz")
+    )
+    LLM_CASSETTE_PROVIDER: str = os.getenv(
+        "LLM_CASSETTE_PROVIDER", "azure"
+    )  # provider recorded from, and whose image format is used
+    LLM_CASSETTE_REPLAY_TIMING: bool = (
+        os.getenv("LLM_CASSETTE_REPLAY_TIMING", "False").lower() == "true"
+    )  # wait the recorded latency before each replayed response
+
+    # LLM Model Cascade (cheap model first, premium model when unsure)
+    LLM_CASCADE_ENABLED: bool = (
+        os.getenv("LLM_CASCADE_ENABLED", "False").lower() == "true"
+    )
+    LLM_CASCADE_PROVIDER: str = os.getenv(
+        "LLM_CASCADE_PROVIDER", ""
+    )  # empty = LLM_PROVIDER
+    LLM_CASCADE_MODEL: str = os.getenv("LLM_CASCADE_MODEL", "gpt-4o-mini")
+    LLM_CASCADE_CLASSIFY_THRESHOLD: float = float(
+        os.getenv("LLM_CASCADE_CLASSIFY_THRESHOLD", "0.8")
+    )
+    LLM_CASCADE_REFEREE_THRESHOLD: float = float(
+        os.getenv("LLM_CASCADE_REFEREE_THRESHOLD", "0.9")
+    )
+    LLM_CASCADE_ESCALATE_MISMATCHES: bool = (
+        os.getenv("LLM_CASCADE_ESCALATE_MISMATCHES", "True").lower() == "true"
+    )
+    LLM_MODEL_PRICES: str = os.getenv(
+        "LLM_MODEL_PRICES", ""
+    )  # USD per 1M tokens: model:input:output[:cached_input],...
+
+    # LLM Structured Output
+    LLM_RESPONSE_FORMAT: str = os.getenv(
+        "LLM_RESPONSE_FORMAT", "json_schema"
+    ).lower()  # "json_schema", "json_object" or "none"
+    LLM_PARSE_MAX_TRIES: int = int(os.getenv("LLM_PARSE_MAX_TRIES", "3"))
+
+    # LLM Rate Limiting (0 = unknown until learned from response headers)
+    LLM_RATE_LIMIT_RPM: float = float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+    LLM_RATE_LIMIT_TPM: float = float(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+    LLM_RATE_LIMIT_HEADROOM: float = float(
+        os.getenv("LLM_RATE_LIMIT_HEADROOM", "0.95")
+    )
+    LLM_IMAGE_TOKEN_ESTIMATE: int = int(
+        os.getenv("LLM_IMAGE_TOKEN_ESTIMATE", "765")
+    )
+    LLM_OUTPUT_TOKEN_ESTIMATE: int = int(
+        os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "400")
+    )
+
     # Embedding Backoff/Retry Configuration
     OPENAI_EMBEDDING_MAX_TRIES: int = int(
         os.getenv("OPENAI_EMBEDDING_MAX_TRIES", "5")
@@ -147,7 +368,47 @@ class Config:
         return value
 
     @field_validator(
-        "OPENAI_LLM_TEMPERATURE", "OPENAI_LLM_TOP_P", "OPENAI_LLM_FREQ_PENALTY"
+        "PIPELINE_DB_CONCURRENCY",
+        "PIPELINE_IO_CONCURRENCY",
+        "PIPELINE_QUEUE_SIZE",
+        "PIPELINE_OVERVIEW_BATCH_SIZE",
+        "VERDICT_CACHE_LOOKUP_BATCH_SIZE",
+        "PREDICTION_WRITE_BATCH_SIZE",
+        "PREDICTION_WRITE_MAX_BUFFERED",
+        "BATCH_PAGE_SIZE",
+        "BATCH_CHECKPOINT_INTERVAL",
+        "LLM_INITIAL_CONCURRENCY",
+        "LLM_MIN_CONCURRENCY",
+        "LLM_MAX_CONCURRENCY",
+        "LLM_BATCH_MAX_REQUESTS",
+        "LLM_BATCH_MAX_FILE_BYTES",
+        "LLM_BATCH_MAX_ACTIVE_JOBS",
+        "LLM_HTTP_MAX_CONNECTIONS",
+        "LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        "LLM_HEDGE_MIN_SAMPLES",
+        "LLM_HEDGE_WINDOW",
+        "LLM_ROUTER_BREAKER_FAILURES",
+        "LLM_PARSE_MAX_TRIES",
+        "LLM_PACK_SIZE",
+    )
+    @classmethod
+    def validate_pipeline_size(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("Value must be at least 1")
+        return value
+
+    @field_validator(
+        "OPENAI_LLM_TEMPERATURE",
+        "OPENAI_LLM_TOP_P",
+        "OPENAI_LLM_FREQ_PENALTY",
+        "LLM_RATE_LIMIT_HEADROOM",
+        "LLM_HEDGE_BUDGET",
+        "LLM_BATCH_PRICE_FACTOR",
+        "LLM_CASCADE_CLASSIFY_THRESHOLD",
+        "LLM_CASCADE_REFEREE_THRESHOLD",
+        "MOCK_LLM_RATE_LIMIT_RATE",
+        "MOCK_LLM_TIMEOUT_RATE",
+        "MOCK_LLM_TRUE_RATE",
     )
     @classmethod
     def validate_float_range(cls, value: float) -> float:
@@ -155,6 +416,39 @@ class Config:
             raise ValueError("Value must be between 0 and 1")
         return value
 
+    @field_validator("LLM_REFEREE_MODE")
+    @classmethod
+    def validate_referee_mode(cls, value: str) -> str:
+        valid_modes = ["image", "text"]
+        if value.lower() not in valid_modes:
+            raise ValueError(
+                f"Invalid LLM_REFEREE_MODE: {value}. "
+                f"Must be one of {valid_modes}"
+            )
+        return value.lower()
+
+    @field_validator("LLM_CASSETTE_MODE")
+    @classmethod
+    def validate_cassette_mode(cls, value: str) -> str:
+        valid_modes = ["record", "replay"]
+        if value.lower() not in valid_modes:
+            raise ValueError(
+                f"Invalid LLM_CASSETTE_MODE: {value}. "
+                f"Must be one of {valid_modes}"
+            )
+        return value.lower()
+
+    @field_validator("LLM_RESPONSE_FORMAT")
+    @classmethod
+    def validate_response_format(cls, value: str) -> str:
+        valid_formats = ["json_schema", "json_object", "none"]
+        if value.lower() not in valid_formats:
+            raise ValueError(
+                f"Invalid LLM_RESPONSE_FORMAT: {value}. "
+                f"Must be one of {valid_formats}"
+            )
+        return value.lower()
+
     @field_validator("OPENAI_LLM_REASONING_EFFORT")
     @classmethod
     def validate_reasoning_effort(cls, value: str) -> str:
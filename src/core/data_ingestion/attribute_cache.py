@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from src.common.logging import setup_logging
+from src.config import config
+
+from .dtos import AttributeDTO
+from .records import AttributeRecord
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+AttributeMap = Mapping[str, AttributeDTO]
+
+
+class AttributeCache:
+    """
+    Process-wide, read-only view of the `attribute` table keyed by
+    attribute_key (as a string).
+
+    The table is small and effectively static, so it is loaded in one
+    query the first time it is needed and reused until `ttl` seconds
+    have passed or `invalidate` is called. A refresh builds a new map and
+    swaps it in, so readers never see a partially loaded dictionary.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._attributes: AttributeMap | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh: asyncio.Task | None = None
+
+    def invalidate(self) -> None:
+        """Drop the cached map; the next lookup reloads it."""
+        self._attributes = None
+
+    def get_all(self, session: Session) -> AttributeMap:
+        attributes = self._fresh()
+        if attributes is not None:
+            return attributes
+        with self._lock:
+            attributes = self._fresh()
+            if attributes is None:
+                started = time.perf_counter()
+                records = session.query(AttributeRecord).all()
+                attributes = self._store(records, started)
+        return attributes
+
+    def get(self, session: Session, attribute_key: str) -> AttributeDTO | None:
+        return self.get_all(session).get(str(attribute_key))
+
+    async def aget_all(self, engine: AsyncEngine) -> AttributeMap:
+        """
+        Async variant of `get_all`. Concurrent callers on the same event
+        loop share a single load.
+        """
+        attributes = self._fresh()
+        if attributes is not None:
+            return attributes
+        refresh = self._refresh
+        if (
+            refresh is None
+            or refresh.done()
+            or refresh.get_loop() is not asyncio.get_running_loop()
+        ):
+            refresh = asyncio.create_task(self._aload(engine))
+            self._refresh = refresh
+        return await asyncio.shield(refresh)
+
+    async def _aload(self, engine: AsyncEngine) -> AttributeMap:
+        started = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            records = (await session.scalars(select(AttributeRecord))).all()
+        return self._store(records, started)
+
+    def _fresh(self) -> AttributeMap | None:
+        attributes = self._attributes
+        if attributes is None:
+            return None
+        if self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl:
+            return None
+        return attributes
+
+    def _store(
+        self, records: Sequence[AttributeRecord], started: float
+    ) -> AttributeMap:
+        attributes = MappingProxyType(
+            {str(record.attribute_key): record.to_dto() for record in records}
+        )
+        self._attributes = attributes
+        self._loaded_at = time.monotonic()
+        logger.info(
+            f"Loaded {len(attributes)} attributes into the attribute cache "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return attributes
+
+
+attribute_cache = AttributeCache(ttl=config.ATTRIBUTE_CACHE_TTL)
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class DunelmCoalesceOutputDTO(BaseModel):
@@ -161,6 +161,10 @@ class AttributeAllowableValueInAnyCategoryDTO(BaseModel):
 
 
 class AttributeDTO(BaseModel):
+    """Immutable, so the process-wide attribute cache can share entries."""
+
+    model_config = ConfigDict(frozen=True)
+
     attribute_key: UUID
     system_name: str
     friendly_name: str | None
@@ -0,0 +1,49 @@
+import sys
+import time
+
+import psycopg2
+
+from src.config import config
+
+
+def refresh_product_overview() -> None:
+    """
+    Refresh the product_overview materialized view after ingest.
+
+    The refresh runs CONCURRENTLY (using the unique index on
+    product_key), so readers keep seeing the previous rows until it
+    commits. It is not incremental: the whole view is recomputed and
+    then diffed against the old rows, so it costs a full rebuild.
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(
+            host=config.DB_HOST,
+            port=config.DB_PORT,
+            dbname=config.DB_NAME,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+        )
+
+        cur = conn.cursor()
+        started = time.perf_counter()
+        cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY product_overview")
+        conn.commit()
+        cur.execute("SELECT count(*) FROM product_overview")
+        row = cur.fetchone()
+        print(
+            f"Refreshed product_overview ({row[0] if row else 0} rows) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        print(f"Error refreshing product_overview: {e}")
+        if conn:
+            conn.rollback()
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+
+if __name__ == "__main__":
+    refresh_product_overview()
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
 
+from .attribute_cache import attribute_cache
+from .dtos import AttributeDTO
 from .records import (
     AttributeAllowableValueInAnyCategoryRecord,
     AttributeAllowableValuesApplicableInEveryCategoryRecord,
@@ -37,6 +39,7 @@ class DunelmCoalesceOutputRepository:
         return (
             self.session.query(DunelmCoalesceOutputRecord)
             .filter_by(product_url=product_url)
+            .order_by(DunelmCoalesceOutputRecord.product_code)
             .first()
         )
 
@@ -458,6 +461,10 @@ class AttributeRepository:
             .first()
         )
 
+    def get_cached(self, attribute_key: str) -> AttributeDTO | None:
+        """Look up an attribute in the process-wide attribute cache."""
+        return attribute_cache.get(self.session, attribute_key)
+
     def find(self, **kwargs: str) -> list[AttributeRecord]:
         """
         Find all records matching the given column-value pairs.
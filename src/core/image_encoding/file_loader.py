@@ -1,12 +1,11 @@
-import re
 from pathlib import Path
 
 from src.core.image_encoding.dtos import ImageLoadResult
+from src.core.image_encoding.filepath_mapping import trim_image_url
 
 
 def load_image_bytes_from_url(image_url: str) -> ImageLoadResult:
-    match = re.search(r"\.(jpg|jpeg|png|webp|gif)", image_url, re.IGNORECASE)
-    trimmed_url = image_url[: match.end()] if match else image_url
+    trimmed_url = trim_image_url(image_url)
     path_obj = Path(trimmed_url)
     if not path_obj.is_file():
         return ImageLoadResult(image_bytes=None, filename=trimmed_url)
@@ -1,8 +1,161 @@
+import asyncio
+import logging
+import os
 import re
+import sys
+import threading
+import time
+from typing import Iterable
 
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
 
-def map_image_url_to_local_path(image_url: str) -> str:
-    """Map an image URL to a local file path using the mapping table."""
-    match = re.search(r"\.(jpg|jpeg|png|webp|gif)", image_url, re.IGNORECASE)
-    trimmed_url = image_url[: match.end()] if match else image_url
-    return trimmed_url
+from src.common.logging import setup_logging
+from src.core.data_ingestion.records import ImageFilePathMappingRecord
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+IMAGE_DIR = "data/image"
+IMAGE_EXTENSION_PATTERN = re.compile(
+    r"\.(jpg|jpeg|png|webp|gif)", re.IGNORECASE
+)
+
+
+def trim_image_url(image_url: str) -> str:
+    """
+    Trim the image_url at the file extension (jpg, jpeg, png, etc.).
+    Bespoke to the current file structure.
+    """
+    match = IMAGE_EXTENSION_PATTERN.search(image_url)
+    return image_url[: match.end()] if match else image_url
+
+
+def image_filename(image_path: str) -> str:
+    return os.path.basename(image_path.replace("\\", "/"))
+
+
+def map_image_url_to_local_path(
+    image_url: str, index: "ImagePathIndex"
+) -> str | None:
+    """Map an image URL to a local file path using the mapping index."""
+    return index.get(image_url)
+
+
+class ImagePathIndexStats(BaseModel):
+    entries: int
+    memory_bytes: int
+    build_seconds: float
+
+
+class ImagePathIndex:
+    """
+    Immutable hash index from trimmed image URL to local image filename,
+    built once from `image_file_path_mapping`.
+
+    Only the filename is stored per URL; the `data/image/` prefix is added
+    on lookup. When a URL is mapped more than once the row with the
+    lowest image path wins, as in the product_overview view.
+    """
+
+    def __init__(
+        self, rows: Iterable[tuple[str, str]], build_seconds: float = 0.0
+    ) -> None:
+        started = time.perf_counter()
+        filenames: dict[str, str] = {}
+        for image_url, image_path in rows:
+            if image_url and image_path and image_url not in filenames:
+                filenames[image_url] = sys.intern(image_filename(image_path))
+        self._filenames = filenames
+        self.build_seconds = build_seconds + time.perf_counter() - started
+
+    def __len__(self) -> int:
+        return len(self._filenames)
+
+    def get(self, image_url: str) -> str | None:
+        """Trim `image_url` and return its local path, if it is mapped."""
+        filename = self._filenames.get(trim_image_url(image_url))
+        return f"{IMAGE_DIR}/{filename}" if filename else None
+
+    def stats(self) -> ImagePathIndexStats:
+        memory_bytes = sys.getsizeof(self._filenames) + sum(
+            sys.getsizeof(url) + sys.getsizeof(filename)
+            for url, filename in self._filenames.items()
+        )
+        return ImagePathIndexStats(
+            entries=len(self._filenames),
+            memory_bytes=memory_bytes,
+            build_seconds=self.build_seconds,
+        )
+
+
+class ImagePathIndexCache:
+    """
+    Holds the process-wide ImagePathIndex. The index is built on first
+    use and kept until `invalidate` is called (e.g. after re-ingesting
+    the image mapping). Concurrent async callers share a single build.
+    """
+
+    def __init__(self) -> None:
+        self._index: ImagePathIndex | None = None
+        self._lock = threading.Lock()
+        self._build: asyncio.Task | None = None
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    def get(self, session: Session) -> ImagePathIndex:
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._index
+            if index is None:
+                started = time.perf_counter()
+                rows = session.execute(self._query()).tuples().all()
+                index = ImagePathIndex(rows, time.perf_counter() - started)
+                self._store(index)
+        return index
+
+    async def aget(self, engine: AsyncEngine) -> ImagePathIndex:
+        index = self._index
+        if index is not None:
+            return index
+        build = self._build
+        if (
+            build is None
+            or build.done()
+            or build.get_loop() is not asyncio.get_running_loop()
+        ):
+            build = asyncio.create_task(self._abuild(engine))
+            self._build = build
+        return await asyncio.shield(build)
+
+    async def _abuild(self, engine: AsyncEngine) -> ImagePathIndex:
+        started = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            rows = (await session.execute(self._query())).tuples().all()
+        index = ImagePathIndex(rows, time.perf_counter() - started)
+        self._store(index)
+        return index
+
+    @staticmethod
+    def _query() -> Select:
+        return select(
+            ImageFilePathMappingRecord.image_url,
+            ImageFilePathMappingRecord.image_path,
+        ).order_by(ImageFilePathMappingRecord.image_path)
+
+    def _store(self, index: ImagePathIndex) -> None:
+        self._index = index
+        stats = index.stats()
+        logger.info(
+            f"Built image path index: {stats.entries} URLs, "
+            f"{stats.memory_bytes / 1024:.1f} KiB, "
+            f"{stats.build_seconds:.3f}s"
+        )
+
+
+image_path_index = ImagePathIndexCache()
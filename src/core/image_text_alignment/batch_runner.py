@@ -0,0 +1,330 @@
+import logging
+import time
+from collections import Counter
+from contextlib import aclosing
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.clock import clock
+from src.common.db.async_session import async_engine
+from src.common.llm.accounting import LlmCallStats
+from src.config import config
+from src.core.image_text_alignment.dtos import (
+    BatchCheckpointDTO,
+    BatchLlmUsageDTO,
+    BatchRunSummary,
+)
+from src.core.image_text_alignment.records import (
+    BatchCheckpointRecord,
+    BatchFailedProductRecord,
+    BatchLlmUsageRecord,
+)
+from src.core.image_text_alignment.repositories import (
+    AsyncBatchCheckpointRepository,
+    AsyncBatchFailedProductRepository,
+    AsyncBatchLlmUsageRepository,
+    AsyncImagePredictionRepository,
+)
+from src.core.image_text_alignment.service import (
+    ImageTextAlignmentService,
+    PipelineRun,
+)
+
+
+class _ProgressTracker:
+    """
+    Tracks the low-water mark of a run: the highest product key such that
+    it and every key dispatched before it have completed. Keys are
+    dispatched in ascending order but complete out of order, so only the
+    contiguous completed prefix can be checkpointed. A key that failed
+    also completes; the runner records it for retry instead.
+    """
+
+    def __init__(self, low_water: UUID | None) -> None:
+        self.low_water = low_water
+        self._pending: dict[str, bool] = {}
+
+    def dispatch(self, product_key: str) -> None:
+        self._pending[product_key] = False
+
+    def complete(self, product_key: str) -> None:
+        if product_key not in self._pending:
+            return
+        self._pending[product_key] = True
+        while self._pending:
+            oldest = next(iter(self._pending))
+            if not self._pending[oldest]:
+                break
+            del self._pending[oldest]
+            self.low_water = UUID(oldest)
+
+
+class BatchRunner:
+    """
+    Processes every product that has no prediction in a batch.
+
+    Unprocessed keys are read in pages of `page_size` in product_key
+    order, so memory stays flat however large the catalogue is. Progress
+    is checkpointed to `batch_checkpoint` every `checkpoint_interval`
+    results (after the prediction writer has been flushed), and a
+    restarted run continues from the last checkpoint instead of scanning
+    the catalogue from the start. Products that fail are skipped without
+    stopping the run and recorded in `batch_failed_product` before the
+    checkpoint moves past them; a resumed run retries the recorded
+    failures that still have no prediction before continuing.
+
+    With `use_batch_api` (default `LLM_BATCH_API_ENABLED`), products are
+    classified through the provider's offline batch API instead of
+    interactive calls.
+
+    The tokens, retries, latency and cost of the run's LLM calls are
+    added to the batch's totals in `batch_llm_usage` with each
+    checkpoint.
+    """
+
+    def __init__(
+        self,
+        service: ImageTextAlignmentService,
+        batch_key: UUID,
+        page_size: int | None = None,
+        checkpoint_interval: int | None = None,
+        logger: logging.Logger | None = None,
+        use_batch_api: bool | None = None,
+    ) -> None:
+        self.service = service
+        self.batch_key = batch_key
+        self.page_size = page_size or config.BATCH_PAGE_SIZE
+        self.checkpoint_interval = (
+            checkpoint_interval or config.BATCH_CHECKPOINT_INTERVAL
+        )
+        self.logger = logger or logging.getLogger(__name__)
+        self.use_batch_api = (
+            use_batch_api
+            if use_batch_api is not None
+            else config.LLM_BATCH_API_ENABLED
+        )
+        self._tracker = _ProgressTracker(None)
+        self._checkpointed_key: UUID | None = None
+        self._processed_before = 0
+        self._created_at = clock.now()
+        self._saved_calls: dict[tuple[str, str], LlmCallStats] = {}
+        self._run = PipelineRun()
+        self._failures: list[BatchFailedProductRecord] = []
+
+    async def run(self) -> BatchRunSummary:
+        checkpoint = await self._load_checkpoint()
+        resumed_from = checkpoint.last_product_key if checkpoint else None
+        if checkpoint:
+            self._processed_before = checkpoint.products_processed
+            self._created_at = checkpoint.created_at
+            self.logger.info(
+                f"Resuming batch {self.batch_key} after product_key="
+                f"{resumed_from} ({self._processed_before} already processed)"
+            )
+        self._tracker = _ProgressTracker(resumed_from)
+        self._checkpointed_key = resumed_from
+        # Calls the service made before this run belong to other batches.
+        calls_before = {
+            (stats.model, stats.stage): stats
+            for stats in self.service.llm_call_stats()
+        }
+        self._saved_calls = dict(calls_before)
+        self._run = PipelineRun(on_failed=self._record_failure)
+        self._failures = []
+        retries = await self._failed_product_keys(resumed_from)
+        if retries:
+            self.logger.info(
+                f"Retrying {len(retries)} products that failed in earlier "
+                f"runs of batch {self.batch_key}"
+            )
+
+        started = time.perf_counter()
+        status_counts: Counter[str] = Counter()
+        processed = 0
+        completed = False
+        stream = (
+            self.service.stream_batch_jobs_for_products
+            if self.use_batch_api
+            else self.service.stream_images_for_products
+        )
+        try:
+            async with aclosing(
+                stream(
+                    self._product_keys(resumed_from, retries),
+                    batch_key=self.batch_key,
+                    run=self._run,
+                )
+            ) as results:
+                async for result in results:
+                    status_counts[result.colour_status] += 1
+                    processed += 1
+                    self._tracker.complete(result.product_key)
+                    if processed % self.checkpoint_interval == 0:
+                        await self._flush_and_checkpoint(processed, started)
+            completed = True
+        finally:
+            # The stream has been closed, so every yielded result has been
+            # flushed unless closing it failed.
+            if completed:
+                self._checkpointed_key = self._tracker.low_water
+            await self._save_failures()
+            await self._save_checkpoint(processed)
+            await self._save_llm_usage()
+
+        return BatchRunSummary(
+            batch_key=self.batch_key,
+            resumed_from=resumed_from,
+            products_processed=processed,
+            status_counts=dict(status_counts),
+            elapsed_seconds=time.perf_counter() - started,
+            products_failed=self._run.failed,
+            verdict_cache=self.service.verdict_cache_stats(),
+            llm_concurrency=self.service.llm_concurrency_stats(),
+            llm_usage=self.service.llm_usage_stats(),
+            llm_hedging=self.service.llm_hedge_stats(),
+            llm_output=self.service.llm_output_stats(),
+            text_referee=self.service.text_referee_stats(),
+            llm_cascade=self.service.llm_cascade_stats(),
+            packed_classify=self.service.packed_classify_stats(),
+            llm_calls=[
+                stats.since(calls_before.get((stats.model, stats.stage)))
+                for stats in self.service.llm_call_stats()
+            ],
+            batch_llm_usage=await self._load_llm_usage(),
+        )
+
+    async def _product_keys(
+        self, after_product_key: UUID | None, retries: list[UUID]
+    ) -> AsyncIterator[str]:
+        # Retried keys lie at or before the checkpoint, so they are not
+        # tracked: the checkpoint has already moved past them.
+        for product_key in retries:
+            yield str(product_key)
+        while True:
+            async with AsyncSession(async_engine) as session:
+                page = await AsyncImagePredictionRepository(
+                    session
+                ).find_unprocessed_product_keys_page(
+                    self.batch_key, after_product_key, self.page_size
+                )
+            for product_key in page:
+                self._tracker.dispatch(str(product_key))
+                yield str(product_key)
+            if len(page) < self.page_size:
+                return
+            after_product_key = page[-1]
+
+    async def _flush_and_checkpoint(
+        self, processed: int, started: float
+    ) -> None:
+        low_water = self._tracker.low_water
+        await self._run.flush()
+        await self._save_failures()
+        self._checkpointed_key = low_water
+        await self._save_checkpoint(processed)
+        await self._save_llm_usage()
+
+        elapsed = time.perf_counter() - started
+        stats = self._run.stats()
+        concurrency = self.service.llm_concurrency_stats()
+        self.logger.info(
+            f"{processed} products processed "
+            f"({processed / elapsed:.1f}/s); checkpoint at {low_water}; "
+            f"LLM concurrency limit {concurrency.limit:.1f}"
+            + (f"; {stats.summary()}" if stats else "")
+        )
+
+    def _record_failure(
+        self, stage: str, product_keys: list[str], error: Exception
+    ) -> None:
+        now = clock.now()
+        for product_key in product_keys:
+            self._tracker.complete(product_key)
+            self._failures.append(
+                BatchFailedProductRecord(
+                    batch_key=self.batch_key,
+                    product_key=UUID(product_key),
+                    stage=stage,
+                    error=f"{type(error).__name__}: {error}",
+                    attempts=1,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+
+    async def _failed_product_keys(
+        self, up_to_product_key: UUID | None
+    ) -> list[UUID]:
+        """Failures of earlier runs that the checkpoint has passed."""
+        if up_to_product_key is None:
+            return []
+        async with AsyncSession(async_engine) as session:
+            return await AsyncBatchFailedProductRepository(
+                session
+            ).find_unprocessed_product_keys(self.batch_key, up_to_product_key)
+
+    async def _save_failures(self) -> None:
+        failures, self._failures = self._failures, []
+        if not failures:
+            return
+        async with AsyncSession(async_engine) as session:
+            await AsyncBatchFailedProductRepository(session).add_many(failures)
+
+    async def _load_checkpoint(self) -> BatchCheckpointDTO | None:
+        async with AsyncSession(async_engine) as session:
+            record = await AsyncBatchCheckpointRepository(session).get(
+                self.batch_key
+            )
+        return record.to_dto() if record else None
+
+    async def _save_checkpoint(self, processed: int) -> None:
+        record = BatchCheckpointRecord(
+            batch_key=self.batch_key,
+            last_product_key=self._checkpointed_key,
+            products_processed=self._processed_before + processed,
+            created_at=self._created_at,
+            updated_at=clock.now(),
+        )
+        async with AsyncSession(async_engine) as session:
+            await AsyncBatchCheckpointRepository(session).save(record)
+
+    async def _save_llm_usage(self) -> None:
+        """Add the LLM calls made since the last save to the batch."""
+        now = clock.now()
+        records = []
+        for stats in self.service.llm_call_stats():
+            key = (stats.model, stats.stage)
+            new = stats.since(self._saved_calls.get(key))
+            if not new.calls:
+                continue
+            self._saved_calls[key] = stats
+            records.append(
+                BatchLlmUsageRecord(
+                    batch_key=self.batch_key,
+                    model=new.model,
+                    stage=new.stage,
+                    calls=new.calls,
+                    failures=new.failures,
+                    retries=new.retries,
+                    input_tokens=new.input_tokens,
+                    cached_input_tokens=new.cached_input_tokens,
+                    output_tokens=new.output_tokens,
+                    latency_seconds=new.seconds,
+                    cost_usd=new.cost_usd,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        if not records:
+            return
+        async with AsyncSession(async_engine) as session:
+            await AsyncBatchLlmUsageRepository(session).add_many(records)
+
+    async def _load_llm_usage(self) -> list[BatchLlmUsageDTO]:
+        async with AsyncSession(async_engine) as session:
+            records = await AsyncBatchLlmUsageRepository(
+                session
+            ).find_by_batch(self.batch_key)
+        return [record.to_dto() for record in records]
@@ -1,7 +1,14 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
+
+from src.common.concurrency import AdaptiveLimiterStats
+from src.common.llm.accounting import LlmCallStats
+from src.common.llm.cascade import CascadeStageStats
+from src.common.llm.hedging import HedgeStats
+from src.common.llm.structured_output import StructuredOutputStats
+from src.common.llm.usage import LlmStageUsage
 
 
 class ProductImageCheckInput(BaseModel):
@@ -38,6 +45,36 @@ class ProductImageRefereeLLMResponse(BaseModel):
     final_colour_justification: str
 
 
+class ProductImageCheckCascadeLLMResponse(ProductImageCheckLLMResponse):
+    """Used for parsing the cascade's cheap-tier classifier output only."""
+
+    confidence: float
+
+
+class ProductImageRefereeCascadeLLMResponse(ProductImageRefereeLLMResponse):
+    """Used for parsing the cascade's cheap-tier referee output only."""
+
+    confidence: float
+
+
+class ProductImageRefereeTextLLMResponse(ProductImageRefereeLLMResponse):
+    """Used for parsing text-only referee output only."""
+
+    needs_image: bool
+
+
+class ProductImageCheckPackedItemLLMResponse(ProductImageCheckLLMResponse):
+    """Used for parsing one product of packed classifier output only."""
+
+    product_key: str
+
+
+class ProductImageCheckPackedLLMResponse(BaseModel):
+    """Used for parsing packed classifier output only."""
+
+    results: list[ProductImageCheckPackedItemLLMResponse]
+
+
 class ProductImageClassificationResult(BaseModel):
     product_key: str
     image_path: str | None
@@ -64,3 +101,150 @@ class ImagePredictionDTO(BaseModel):
     final_colour_justification: str
     created_at: datetime
     updated_at: datetime
+
+
+class BatchCheckpointDTO(BaseModel):
+    batch_key: UUID
+    last_product_key: UUID | None
+    products_processed: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class BatchFailedProductDTO(BaseModel):
+    """A product that failed in a batch, with the stage and error."""
+
+    batch_key: UUID
+    product_key: UUID
+    stage: str
+    error: str
+    attempts: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class LlmVerdictDTO(BaseModel):
+    verdict_key: str
+    colour_status: str
+    colour_justification: str
+    image_summary: str
+    description_synthesis: str
+    final_colour_status: str
+    final_colour_justification: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class BatchLlmUsageDTO(BaseModel):
+    """LLM calls of one model and stage, totalled over a batch's runs."""
+
+    batch_key: UUID
+    model: str
+    stage: str
+    calls: int
+    failures: int
+    retries: int
+    input_tokens: int
+    cached_input_tokens: int
+    output_tokens: int
+    latency_seconds: float
+    cost_usd: float | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class VerdictCacheStats(BaseModel):
+    hits: int
+    misses: int
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TextRefereeStats(BaseModel):
+    """
+    Text-only referee calls, how many were escalated to the referee with
+    the image, and the input tokens and time they took.
+    """
+
+    calls: int = 0
+    escalated: int = 0
+    text_seconds: float = 0.0
+    image_seconds: float = 0.0
+    text_input_tokens: int = 0
+    image_input_tokens: int = 0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.calls if self.calls else 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_text_seconds(self) -> float:
+        return self.text_seconds / self.calls if self.calls else 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_image_seconds(self) -> float:
+        return self.image_seconds / self.escalated if self.escalated else 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def input_tokens_saved(self) -> int | None:
+        """
+        Input tokens saved against refereeing every product with the
+        image: the calls settled from text alone each skipped an image
+        call of the measured mean size, less the tokens of every
+        text-only call. None until an escalated call has been measured.
+        """
+        if not self.escalated:
+            return None
+        mean_image_tokens = self.image_input_tokens / self.escalated
+        return round(
+            (self.calls - self.escalated) * mean_image_tokens
+            - self.text_input_tokens
+        )
+
+
+class PackedClassifyStats(BaseModel):
+    """
+    Packed classifier requests, the products they carried, and how many
+    of those products had to be classified again on their own.
+    """
+
+    requests: int = 0
+    products: int = 0
+    fallbacks: int = 0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_pack_size(self) -> float:
+        return self.products / self.requests if self.requests else 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.products if self.products else 0.0
+
+
+class BatchRunSummary(BaseModel):
+    batch_key: UUID
+    resumed_from: UUID | None
+    products_processed: int
+    status_counts: dict[str, int]
+    elapsed_seconds: float
+    products_failed: int = 0
+    verdict_cache: VerdictCacheStats | None = None
+    llm_concurrency: AdaptiveLimiterStats | None = None
+    llm_usage: list[LlmStageUsage] = []
+    llm_hedging: HedgeStats | None = None
+    llm_output: StructuredOutputStats | None = None
+    text_referee: TextRefereeStats | None = None
+    llm_cascade: list[CascadeStageStats] = []
+    packed_classify: PackedClassifyStats | None = None
+    llm_calls: list[LlmCallStats] = []
+    batch_llm_usage: list[BatchLlmUsageDTO] = []
@@ -1,34 +1,219 @@
+import asyncio
+from contextlib import AbstractAsyncContextManager, nullcontext
+
 from src.common.llm import ImageEncoder, Llm
+from src.common.llm.base_classes import BatchRequest
+from src.common.llm.cascade import CHEAP_TIER, PREMIUM_TIER, ModelCascade
+from src.common.llm.errors import LlmOutputParseError
+from src.common.llm.structured_output import parse_items, response_format
+from src.config import config
 from src.core.image_text_alignment.dtos import (
+    PackedClassifyStats,
+    ProductImageCheckCascadeLLMResponse,
     ProductImageCheckInput,
     ProductImageCheckLLMResponse,
+    ProductImageCheckPackedItemLLMResponse,
+    ProductImageCheckPackedLLMResponse,
     ProductImageClassificationResult,
 )
 
-from .prompts import CLASSIFIER_PROMPT
+from .prompts import (
+    CLASSIFIER_CASCADE_PROMPT,
+    CLASSIFIER_PACKED_PROMPT,
+    CLASSIFIER_PROMPT,
+)
+
+STAGE = "classify"
+PACKED_STAGE = "classify_packed"
 
 
 class ProductImageLLMClassifier:
-    def __init__(self, llm: Llm, image_encoder: ImageEncoder | None = None):
+    """
+    Classifies product images against their descriptions.
+
+    With a `cascade`, the cascade's cheap model classifies first and also
+    reports its confidence. Its verdict stands if it is a MATCH with at
+    least the stage's threshold confidence; anything else is classified
+    again by the premium model (every non-MATCH can be kept too, with
+    `LLM_CASCADE_ESCALATE_MISMATCHES` off).
+
+    `classify_packed` classifies several products in one request to the
+    main model. Products the response leaves out, or whose entry is
+    malformed, are classified again one at a time.
+    """
+
+    def __init__(
+        self,
+        llm: Llm,
+        image_encoder: ImageEncoder | None = None,
+        cascade: ModelCascade | None = None,
+    ):
         self.llm = llm
         self.image_encoder = image_encoder or ImageEncoder()
         self.system_prompt: str = CLASSIFIER_PROMPT
+        self.cascade_system_prompt: str = CLASSIFIER_CASCADE_PROMPT
+        self.packed_system_prompt: str = CLASSIFIER_PACKED_PROMPT
+        self.stage = STAGE
+        self.cascade = cascade
+        self._packed_stats = PackedClassifyStats()
 
     async def classify_image_colour(
         self, input: ProductImageCheckInput
     ) -> ProductImageClassificationResult:
+        """Classify the image against the description."""
         human_prompt = input.description
         image = input.image
 
-        prediction: ProductImageCheckLLMResponse = await self.llm.ainvoke(
+        if self.cascade is not None:
+            async with self.cascade.tier(self.stage, CHEAP_TIER) as cheap:
+                first: ProductImageCheckCascadeLLMResponse = (
+                    await cheap.ainvoke(
+                        system=self.cascade_system_prompt,
+                        human=human_prompt,
+                        output_type=ProductImageCheckCascadeLLMResponse,
+                        images=[image],
+                        stage=self.stage,
+                    )
+                )
+            if not self._should_escalate(self.cascade, first):
+                return self._to_result(input.product_key, input.image, first)
+
+        prediction: ProductImageCheckLLMResponse
+        async with self._premium() as llm:
+            prediction = await llm.ainvoke(
+                system=self.system_prompt,
+                human=human_prompt,
+                output_type=ProductImageCheckLLMResponse,
+                images=[image],
+                stage=self.stage,
+            )
+        return self._to_result(input.product_key, input.image, prediction)
+
+    async def classify_packed(
+        self, inputs: list[ProductImageCheckInput]
+    ) -> list[ProductImageClassificationResult]:
+        """
+        Classify several products in one request, each labelled with its
+        product_key and with the images attached in the same order.
+        Products missing from the response or with a malformed entry fall
+        back to `classify_image_colour`. Results are in input order.
+        """
+        if len(inputs) <= 1:
+            return [await self.classify_image_colour(i) for i in inputs]
+
+        predictions = await self._ainvoke_packed(inputs)
+        missing = [i for i in inputs if i.product_key not in predictions]
+        stats = self._packed_stats
+        stats.requests += 1
+        stats.products += len(inputs)
+        stats.fallbacks += len(missing)
+
+        fallbacks = dict(
+            zip(
+                (i.product_key for i in missing),
+                await asyncio.gather(
+                    *(self.classify_image_colour(i) for i in missing)
+                ),
+                strict=True,
+            )
+        )
+        return [
+            (
+                self._to_result(
+                    i.product_key, i.image, predictions[i.product_key]
+                )
+                if i.product_key in predictions
+                else fallbacks[i.product_key]
+            )
+            for i in inputs
+        ]
+
+    async def _ainvoke_packed(
+        self, inputs: list[ProductImageCheckInput]
+    ) -> dict[str, ProductImageCheckLLMResponse]:
+        try:
+            # Not retried as a whole: the valid entries are kept and only
+            # the rest are sent again, one product per request.
+            response = await self.llm.ainvoke(
+                system=self.packed_system_prompt,
+                human=self._packed_human_prompt(inputs),
+                output_type=ProductImageCheckPackedLLMResponse,
+                images=[i.image for i in inputs],
+                stage=PACKED_STAGE,
+                parse_tries=1,
+            )
+            items = response.results
+        except LlmOutputParseError as e:
+            items = parse_items(
+                ProductImageCheckPackedItemLLMResponse, e.content, "results"
+            )
+        keys = {i.product_key for i in inputs}
+        predictions: dict[str, ProductImageCheckLLMResponse] = {}
+        for item in items:
+            if item.product_key in keys:
+                predictions.setdefault(item.product_key, item)
+        return predictions
+
+    @staticmethod
+    def _packed_human_prompt(inputs: list[ProductImageCheckInput]) -> str:
+        return "\n\n".join(
+            f"Product {n} of {len(inputs)} (image {n})\n"
+            f"product_key: {i.product_key}\n"
+            f"Description:\n{i.description}"
+            for n, i in enumerate(inputs, start=1)
+        )
+
+    def packed_stats(self) -> PackedClassifyStats:
+        """Packed requests, the products they carried, and fallbacks."""
+        return self._packed_stats.model_copy()
+
+    def _premium(self) -> AbstractAsyncContextManager[Llm]:
+        if self.cascade is None:
+            return nullcontext(self.llm)
+        return self.cascade.tier(self.stage, PREMIUM_TIER)
+
+    def _should_escalate(
+        self,
+        cascade: ModelCascade,
+        prediction: ProductImageCheckCascadeLLMResponse,
+    ) -> bool:
+        if (
+            config.LLM_CASCADE_ESCALATE_MISMATCHES
+            and prediction.colour_status != "MATCH"
+        ):
+            return True
+        return not cascade.is_confident(self.stage, prediction.confidence)
+
+    def batch_request(
+        self, custom_id: str, input: ProductImageCheckInput
+    ) -> BatchRequest:
+        """The same call as `classify_image_colour`, as a batch request."""
+        return BatchRequest(
+            custom_id=custom_id,
             system=self.system_prompt,
-            human=human_prompt,
-            output_type=ProductImageCheckLLMResponse,
-            images=[image],
+            human=input.description,
+            images=[input.image],
+            response_format=response_format(ProductImageCheckLLMResponse),
         )
+
+    def parse_response(
+        self, product_key: str, content: str
+    ) -> ProductImageClassificationResult:
+        """Parse a batch response; raises ValueError if it is invalid."""
+        prediction = self.llm.parse_output(
+            ProductImageCheckLLMResponse, content
+        )
+        return self._to_result(product_key, None, prediction)
+
+    @staticmethod
+    def _to_result(
+        product_key: str,
+        image_path: str | None,
+        prediction: ProductImageCheckLLMResponse,
+    ) -> ProductImageClassificationResult:
         return ProductImageClassificationResult(
-            product_key=input.product_key,
-            image_path=input.image,
+            product_key=product_key,
+            image_path=image_path,
             colour_status=prediction.colour_status,
             colour_justification=prediction.colour_justification,
             description_synthesis=prediction.description_synthesis,
@@ -1,23 +1,163 @@
+import time
+from contextlib import AbstractAsyncContextManager, nullcontext
+
 from src.common.llm import ImageEncoder, Llm
+from src.common.llm.accounting import metered_usage
+from src.common.llm.base_classes import BatchRequest
+from src.common.llm.cascade import CHEAP_TIER, PREMIUM_TIER, ModelCascade
+from src.common.llm.structured_output import response_format
+from src.config import config
 from src.core.image_text_alignment.dtos import (
+    ProductImageRefereeCascadeLLMResponse,
     ProductImageRefereeInput,
     ProductImageRefereeLLMResponse,
     ProductImageRefereeResult,
+    ProductImageRefereeTextLLMResponse,
+    TextRefereeStats,
+)
+
+from .prompts import (
+    REFEREE_CASCADE_PROMPT,
+    REFEREE_PROMPT,
+    REFEREE_TEXT_ONLY_PROMPT,
 )
 
-from .prompts import REFEREE_PROMPT
+STAGE = "referee"
+TEXT_ONLY_STAGE = "referee_text"
 
 
 class ProductImageLLMReferee:
-    def __init__(self, llm: Llm, image_encoder: ImageEncoder | None = None):
+    """
+    Referees non-matching classifier verdicts.
+
+    In "image" mode (the default `LLM_REFEREE_MODE`) the image is sent
+    again with the classifier's output. In "text" mode the referee first
+    works from the classifier's image summary alone, and the call is
+    repeated with the image only if the text-only referee says it needs
+    it; for most disputed products the image tokens are not paid twice.
+
+    With a `cascade`, the call with the image goes to the cascade's cheap
+    model first, and to the premium model only if the cheap model's
+    confidence is below the stage's threshold.
+    """
+
+    def __init__(
+        self,
+        llm: Llm,
+        image_encoder: ImageEncoder | None = None,
+        mode: str | None = None,
+        cascade: ModelCascade | None = None,
+    ):
         self.llm = llm
         self.image_encoder = image_encoder or ImageEncoder()
         self.system_prompt: str = REFEREE_PROMPT
+        self.text_only_system_prompt: str = REFEREE_TEXT_ONLY_PROMPT
+        self.cascade_system_prompt: str = REFEREE_CASCADE_PROMPT
+        self.stage = STAGE
+        self.mode = (mode or config.LLM_REFEREE_MODE).lower()
+        self.cascade = cascade
+        self._text_stats = TextRefereeStats()
+
+    @property
+    def text_only(self) -> bool:
+        return self.mode == "text"
 
     async def referee(
         self, input: ProductImageRefereeInput
     ) -> ProductImageRefereeResult:
-        human_prompt = f"""Product Description: {input.description}
+        human_prompt = self._human_prompt(input)
+        image = input.image
+        stats = self._text_stats
+
+        if self.text_only:
+            started = time.perf_counter()
+            with metered_usage() as text_usage:
+                text_prediction: ProductImageRefereeTextLLMResponse = (
+                    await self.llm.ainvoke(
+                        system=self.text_only_system_prompt,
+                        human=human_prompt,
+                        output_type=ProductImageRefereeTextLLMResponse,
+                        stage=TEXT_ONLY_STAGE,
+                    )
+                )
+            stats.calls += 1
+            stats.text_seconds += time.perf_counter() - started
+            stats.text_input_tokens += text_usage.input_tokens
+            if not text_prediction.needs_image:
+                return self._to_result(text_prediction)
+            stats.escalated += 1
+
+        started = time.perf_counter()
+        with metered_usage() as image_usage:
+            prediction = await self._referee_with_image(human_prompt, image)
+        if self.text_only:
+            stats.image_seconds += time.perf_counter() - started
+            stats.image_input_tokens += image_usage.input_tokens
+        return self._to_result(prediction)
+
+    async def _referee_with_image(
+        self, human_prompt: str, image: str
+    ) -> ProductImageRefereeLLMResponse:
+        if self.cascade is not None:
+            async with self.cascade.tier(self.stage, CHEAP_TIER) as cheap:
+                first: ProductImageRefereeCascadeLLMResponse = (
+                    await cheap.ainvoke(
+                        system=self.cascade_system_prompt,
+                        human=human_prompt,
+                        output_type=ProductImageRefereeCascadeLLMResponse,
+                        images=[image],
+                        stage=self.stage,
+                    )
+                )
+            if self.cascade.is_confident(self.stage, first.confidence):
+                return first
+
+        async with self._premium() as llm:
+            prediction: ProductImageRefereeLLMResponse = await llm.ainvoke(
+                system=self.system_prompt,
+                human=human_prompt,
+                output_type=ProductImageRefereeLLMResponse,
+                images=[image],
+                stage=self.stage,
+            )
+        return prediction
+
+    def _premium(self) -> AbstractAsyncContextManager[Llm]:
+        if self.cascade is None:
+            return nullcontext(self.llm)
+        return self.cascade.tier(self.stage, PREMIUM_TIER)
+
+    def text_only_stats(self) -> TextRefereeStats | None:
+        """Escalations and savings of the text-only mode, if enabled."""
+        if not self.text_only:
+            return None
+        return self._text_stats.model_copy()
+
+    def batch_request(
+        self, custom_id: str, input: ProductImageRefereeInput
+    ) -> BatchRequest:
+        """
+        The same call as `referee` in image mode, as a batch request.
+        Batch jobs always send the image: escalating would need a second
+        job round trip.
+        """
+        return BatchRequest(
+            custom_id=custom_id,
+            system=self.system_prompt,
+            human=self._human_prompt(input),
+            images=[input.image],
+            response_format=response_format(ProductImageRefereeLLMResponse),
+        )
+
+    def parse_response(self, content: str) -> ProductImageRefereeResult:
+        """Parse a batch response; raises ValueError if it is invalid."""
+        return self._to_result(
+            self.llm.parse_output(ProductImageRefereeLLMResponse, content)
+        )
+
+    @staticmethod
+    def _human_prompt(input: ProductImageRefereeInput) -> str:
+        return f"""Product Description: {input.description}
 
 Classifier Output:
 - colour_status: {input.classifier_colour_status}
@@ -25,14 +165,10 @@ Classifier Output:
 - image_summary: {input.classifier_image_summary}
 - description_synthesis: {input.classifier_description_synthesis}"""
 
-        image = input.image
-
-        prediction: ProductImageRefereeLLMResponse = await self.llm.ainvoke(
-            system=self.system_prompt,
-            human=human_prompt,
-            output_type=ProductImageRefereeLLMResponse,
-            images=[image],
-        )
+    @staticmethod
+    def _to_result(
+        prediction: ProductImageRefereeLLMResponse,
+    ) -> ProductImageRefereeResult:
         return ProductImageRefereeResult(
             final_colour_status=prediction.final_colour_status,
             final_colour_justification=prediction.final_colour_justification,
@@ -1,3 +1,17 @@
-from .txt_loading import CLASSIFIER_PROMPT, REFEREE_PROMPT
+from .txt_loading import (
+    CLASSIFIER_CASCADE_PROMPT,
+    CLASSIFIER_PACKED_PROMPT,
+    CLASSIFIER_PROMPT,
+    REFEREE_CASCADE_PROMPT,
+    REFEREE_PROMPT,
+    REFEREE_TEXT_ONLY_PROMPT,
+)
 
-__all__ = ["CLASSIFIER_PROMPT", "REFEREE_PROMPT"]
+__all__ = [
+    "CLASSIFIER_CASCADE_PROMPT",
+    "CLASSIFIER_PACKED_PROMPT",
+    "CLASSIFIER_PROMPT",
+    "REFEREE_CASCADE_PROMPT",
+    "REFEREE_PROMPT",
+    "REFEREE_TEXT_ONLY_PROMPT",
+]
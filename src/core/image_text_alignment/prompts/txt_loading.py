@@ -5,10 +5,33 @@ from src.common.file_readers.txt import read_prompt_from_txt
 
 CLASSIFIER_PROMPT_PATH = Path(__file__).parent / "classifier_prompt.txt"
 REFEREE_PROMPT_PATH = Path(__file__).parent / "referee_prompt.txt"
+REFEREE_TEXT_ONLY_ADDENDUM_PATH = (
+    Path(__file__).parent / "referee_text_only_addendum.txt"
+)
+CONFIDENCE_ADDENDUM_PATH = Path(__file__).parent / "confidence_addendum.txt"
+PACKED_ADDENDUM_PATH = Path(__file__).parent / "packed_addendum.txt"
 
 try:
     CLASSIFIER_PROMPT = read_prompt_from_txt(CLASSIFIER_PROMPT_PATH)
     REFEREE_PROMPT = read_prompt_from_txt(REFEREE_PROMPT_PATH)
+    # The text-only referee shares the full referee prompt as its prefix,
+    # so both modes hit the same prompt cache entry.
+    REFEREE_TEXT_ONLY_PROMPT = (
+        REFEREE_PROMPT
+        + "\n\n"
+        + read_prompt_from_txt(REFEREE_TEXT_ONLY_ADDENDUM_PATH)
+    )
+    # Prompts for the cheap tier of the model cascade, which also reports
+    # how confident it is.
+    CONFIDENCE_ADDENDUM = read_prompt_from_txt(CONFIDENCE_ADDENDUM_PATH)
+    CLASSIFIER_CASCADE_PROMPT = (
+        CLASSIFIER_PROMPT + "\n\n" + CONFIDENCE_ADDENDUM
+    )
+    REFEREE_CASCADE_PROMPT = REFEREE_PROMPT + "\n\n" + CONFIDENCE_ADDENDUM
+    # Classifier prompt for requests that carry several products.
+    CLASSIFIER_PACKED_PROMPT = (
+        CLASSIFIER_PROMPT + "\n\n" + read_prompt_from_txt(PACKED_ADDENDUM_PATH)
+    )
 except Exception as e:
     raise MalformedPrompt(
         f"Failed to load product image system prompt: {e}"
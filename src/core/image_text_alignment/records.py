@@ -1,11 +1,18 @@
 from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy import TIMESTAMP, Column, Text
+from sqlalchemy import TIMESTAMP, BigInteger, Column, Float, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 from src.common.db.base import Base
-from src.core.image_text_alignment.dtos import ImagePredictionDTO
+from src.core.image_text_alignment.dtos import (
+    BatchCheckpointDTO,
+    BatchFailedProductDTO,
+    BatchLlmUsageDTO,
+    ImagePredictionDTO,
+    LlmVerdictDTO,
+)
 
 
 class Categories(BaseModel):
@@ -123,3 +130,168 @@ class ImagePredictionRecord(Base):
 
     def to_dto(self) -> ImagePredictionDTO:
         return self.to_model()
+
+
+class BatchCheckpointRecord(Base):
+    __tablename__ = "batch_checkpoint"
+    batch_key = Column(PG_UUID(as_uuid=True), primary_key=True)
+    last_product_key = Column(PG_UUID(as_uuid=True))
+    products_processed = Column(BigInteger)
+    created_at = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True))
+
+    def to_dict(self) -> dict:
+        return {
+            field: getattr(self, field)
+            for field in BatchCheckpointDTO.model_fields
+        }
+
+    def to_model(self) -> BatchCheckpointDTO:
+        return BatchCheckpointDTO(**self.to_dict())
+
+    def to_dto(self) -> BatchCheckpointDTO:
+        return self.to_model()
+
+
+class BatchFailedProductRecord(Base):
+    """A product skipped by a batch run, kept so later runs retry it."""
+
+    __tablename__ = "batch_failed_product"
+    batch_key = Column(PG_UUID(as_uuid=True), primary_key=True)
+    product_key = Column(PG_UUID(as_uuid=True), primary_key=True)
+    stage = Column(Text)
+    error = Column(Text)
+    attempts = Column(BigInteger)
+    created_at = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True))
+
+    def to_dict(self) -> dict:
+        return {
+            field: getattr(self, field)
+            for field in BatchFailedProductDTO.model_fields
+        }
+
+    def to_model(self) -> BatchFailedProductDTO:
+        return BatchFailedProductDTO(**self.to_dict())
+
+    def to_dto(self) -> BatchFailedProductDTO:
+        return self.to_model()
+
+
+class BatchLlmUsageRecord(Base):
+    """LLM calls, tokens, latency and cost per model and stage of a batch."""
+
+    __tablename__ = "batch_llm_usage"
+    batch_key = Column(PG_UUID(as_uuid=True), primary_key=True)
+    model = Column(Text, primary_key=True)
+    stage = Column(Text, primary_key=True)
+    calls = Column(BigInteger)
+    failures = Column(BigInteger)
+    retries = Column(BigInteger)
+    input_tokens = Column(BigInteger)
+    cached_input_tokens = Column(BigInteger)
+    output_tokens = Column(BigInteger)
+    latency_seconds = Column(Float)
+    cost_usd = Column(Float)
+    created_at = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True))
+
+    def to_dict(self) -> dict:
+        return {
+            field: getattr(self, field)
+            for field in BatchLlmUsageDTO.model_fields
+        }
+
+    def to_model(self) -> BatchLlmUsageDTO:
+        return BatchLlmUsageDTO(**self.to_dict())
+
+    def to_dto(self) -> BatchLlmUsageDTO:
+        return self.to_model()
+
+
+class LlmVerdictRecord(Base):
+    """Cached classifier and referee verdict, keyed by a hash of inputs."""
+
+    __tablename__ = "llm_verdict_cache"
+    verdict_key = Column(Text, primary_key=True)
+    colour_status = Column(Text)
+    colour_justification = Column(Text)
+    image_summary = Column(Text)
+    description_synthesis = Column(Text)
+    final_colour_status = Column(Text)
+    final_colour_justification = Column(Text)
+    created_at = Column(TIMESTAMP(timezone=True))
+    updated_at = Column(TIMESTAMP(timezone=True))
+
+    def to_dict(self) -> dict:
+        return {
+            field: getattr(self, field) for field in LlmVerdictDTO.model_fields
+        }
+
+    def to_model(self) -> LlmVerdictDTO:
+        return LlmVerdictDTO(**self.to_dict())
+
+    def to_dto(self) -> LlmVerdictDTO:
+        return self.to_model()
+
+
+class MaterializedProductOverviewRecord(Base):
+    """
+    Row of the `product_overview` materialized view: one pre-joined
+    overview per product, with attribute values aggregated to JSON and
+    image URLs already resolved to local paths.
+    """
+
+    __tablename__ = "product_overview"
+    product_key = Column(PG_UUID(as_uuid=True), primary_key=True)
+    system_name = Column(Text)
+    friendly_name = Column(Text)
+    product_code = Column(Text)
+    product_title = Column(Text)
+    product_url = Column(Text)
+    category_0 = Column(Text)
+    category_1 = Column(Text)
+    category_2 = Column(Text)
+    category_3 = Column(Text)
+    description_text = Column(Text)
+    specification_text = Column(Text)
+    specification_attributes_xml = Column(Text)
+    image_local_path_1 = Column(Text)
+    image_local_path_2 = Column(Text)
+    image_local_path_3 = Column(Text)
+    image_local_path_4 = Column(Text)
+    image_local_path_5 = Column(Text)
+    image_local_path_6 = Column(Text)
+    image_local_path_7 = Column(Text)
+    image_local_path_8 = Column(Text)
+    image_local_path_9 = Column(Text)
+    image_local_path_10 = Column(Text)
+    now_price = Column(Text)
+    was_price = Column(Text)
+    save_message = Column(Text)
+    on_promotion = Column(Text)
+    review_count = Column(Text)
+    review_rating = Column(Text)
+    attribute_values = Column(JSONB)
+
+    def to_dict(self) -> dict:
+        return {
+            column.name: getattr(self, column.name)
+            for column in self.__table__.columns
+        }
+
+    def to_model(self) -> ProductOverviewRecord:
+        fields = self.to_dict()
+        return ProductOverviewRecord(
+            categories=Categories(
+                **{f: fields.pop(f) for f in Categories.model_fields}
+            ),
+            prices=Prices(**{f: fields.pop(f) for f in Prices.model_fields}),
+            image_local_paths=ImageLocalPaths(
+                **{f: fields.pop(f) for f in ImageLocalPaths.model_fields}
+            ),
+            **fields,
+        )
+
+    def to_dto(self) -> ProductOverviewRecord:
+        return self.to_model()
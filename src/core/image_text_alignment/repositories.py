@@ -1,26 +1,53 @@
 import logging
-import os
-import re
 from typing import Any, cast
 from uuid import UUID
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, exists, func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import Session
 
+from src.common.db.async_session import async_engine
 from src.common.logging import setup_logging
-from src.core.data_ingestion.records import ProductRecord
+from src.config import config
+from src.core.data_ingestion.attribute_cache import (
+    AttributeMap,
+    attribute_cache,
+)
+from src.core.data_ingestion.dtos import (
+    DunelmCoalesceOutputDTO,
+    ProductAttributeValueDTO,
+    ProductDTO,
+)
+from src.core.data_ingestion.records import (
+    DunelmCoalesceOutputRecord,
+    ProductAttributeValueRecord,
+    ProductRecord,
+)
 from src.core.data_ingestion.repositories import (
     AttributeRepository,
     DunelmCoalesceOutputRepository,
-    ImageFilePathMappingRepository,
     ProductAttributeValueRepository,
     ProductRepository,
 )
+from src.core.image_encoding.filepath_mapping import (
+    ImagePathIndex,
+    image_path_index,
+    map_image_url_to_local_path,
+)
+from src.core.image_text_alignment.dtos import (
+    ImagePredictionDTO,
+    LlmVerdictDTO,
+)
 from src.core.image_text_alignment.records import (
+    BatchCheckpointRecord,
+    BatchFailedProductRecord,
+    BatchLlmUsageRecord,
     Categories,
     ImageLocalPaths,
     ImagePredictionRecord,
+    LlmVerdictRecord,
+    MaterializedProductOverviewRecord,
     Prices,
     ProductOverviewRecord,
 )
@@ -28,6 +55,83 @@ from src.core.image_text_alignment.records import (
 logger = logging.getLogger(__name__)
 setup_logging()
 
+# asyncpg allows at most 32767 bind parameters per statement.
+UPSERT_CHUNK_SIZE = 1000
+
+
+def _attribute_value_dict(
+    av_dto: ProductAttributeValueDTO, attr_name: str | None
+) -> dict[str, str | None]:
+    return {
+        "attribute_key": str(av_dto.attribute_key),
+        "attribute_name": attr_name,
+        "value": av_dto.value,
+        "unit": av_dto.unit,
+        "minimum_value": av_dto.minimum_value,
+        "minimum_unit": av_dto.minimum_unit,
+        "maximum_value": av_dto.maximum_value,
+        "maximum_unit": av_dto.maximum_unit,
+        "range_qualifier_enum": av_dto.range_qualifier_enum,
+    }
+
+
+def _sorted_attribute_values(
+    attribute_values: list[dict[str, str | None]],
+) -> list[dict[str, str | None]]:
+    """
+    Order attribute values by attribute name, then key, with unnamed ones
+    last, so every overview path describes a product identically.
+    """
+    return sorted(
+        attribute_values,
+        key=lambda av: (
+            av["attribute_name"] is None,
+            av["attribute_name"] or "",
+            av["attribute_key"] or "",
+        ),
+    )
+
+
+def _build_product_overview(
+    product: ProductDTO,
+    coalesce: DunelmCoalesceOutputDTO,
+    attribute_values: list[dict[str, str | None]],
+    image_local_paths: dict[str, str | None],
+) -> ProductOverviewRecord:
+    categories = Categories(
+        **{
+            f"category_{i}": getattr(coalesce, f"category_{i}", None)
+            for i in range(4)
+        }
+    )
+
+    prices = Prices(
+        now_price=getattr(coalesce, "now_price", None),
+        was_price=getattr(coalesce, "was_price", None),
+        save_message=getattr(coalesce, "save_message", None),
+    )
+
+    return ProductOverviewRecord(
+        product_key=product.product_key,
+        system_name=product.system_name,
+        friendly_name=product.friendly_name,
+        product_code=getattr(coalesce, "product_code", None),
+        product_title=getattr(coalesce, "product_title", None),
+        product_url=getattr(coalesce, "product_url", None),
+        categories=categories,
+        description_text=getattr(coalesce, "description_text", None),
+        specification_text=getattr(coalesce, "specification_text", None),
+        specification_attributes_xml=getattr(
+            coalesce, "specification_attributes_xml", None
+        ),
+        image_local_paths=ImageLocalPaths(**image_local_paths),
+        prices=prices,
+        on_promotion=getattr(coalesce, "on_promotion", None),
+        review_count=getattr(coalesce, "review_count", None),
+        review_rating=getattr(coalesce, "review_rating", None),
+        attribute_values=_sorted_attribute_values(attribute_values),
+    )
+
 
 class ProductOverviewRepository:
     def __init__(self, session: Session) -> None:
@@ -35,33 +139,7 @@ class ProductOverviewRepository:
         self.coalesce_repo = DunelmCoalesceOutputRepository(session)
         self.pav_repo = ProductAttributeValueRepository(session)
         self.attr_repo = AttributeRepository(session)
-        self.image_path_repo = ImageFilePathMappingRepository(session)
-
-    @staticmethod
-    def _map_image_url_to_local_path(
-        image_url: str, image_path_repo: ImageFilePathMappingRepository
-    ) -> str | None:
-        """
-        Trim the image_url at the file extension (jpg, jpeg, png, etc.)
-        and map the trimmed url to the local path. Bespoke to the current
-        file structure.
-        """
-        if image_url:
-            match = re.search(
-                r"\.(jpg|jpeg|png|webp|gif)", image_url, re.IGNORECASE
-            )
-            if match:
-                ext = match.group(0)
-                idx = image_url.lower().find(ext) + len(ext)
-                trimmed_url = image_url[:idx]
-            else:
-                trimmed_url = image_url
-            mapping = image_path_repo.find(image_url=trimmed_url)
-            if mapping:
-                local_path = mapping[0].to_dto().image_path.replace("\\", "/")
-                filename = os.path.basename(local_path)
-                return f"data/image/{filename}"
-        return None
+        self.image_path_index: ImagePathIndex = image_path_index.get(session)
 
     def get_product_overview(
         self, product_key: str
@@ -94,70 +172,227 @@ class ProductOverviewRepository:
         attr_values = self.pav_repo.get_by_product_key(product_key)
         attribute_values = []
         for av in attr_values:
-            av_dto = av.to_dto()
-            attr = self.attr_repo.get(str(av.attribute_key))
-            attr_name = attr.to_dto().friendly_name if attr else None
+            attr = self.attr_repo.get_cached(str(av.attribute_key))
+            attr_name = attr.friendly_name if attr else None
             attribute_values.append(
-                {
-                    "attribute_key": str(av_dto.attribute_key),
-                    "attribute_name": attr_name,
-                    "value": av_dto.value,
-                    "unit": av_dto.unit,
-                    "minimum_value": av_dto.minimum_value,
-                    "minimum_unit": av_dto.minimum_unit,
-                    "maximum_value": av_dto.maximum_value,
-                    "maximum_unit": av_dto.maximum_unit,
-                    "range_qualifier_enum": av_dto.range_qualifier_enum,
-                }
+                _attribute_value_dict(av.to_dto(), attr_name)
             )
 
         image_local_paths_dict = {}
         for i in range(1, 11):
             image_url = getattr(coalesce, f"image_url_{i}", None)
             if image_url is not None:
-                local_path = self._map_image_url_to_local_path(
-                    image_url, self.image_path_repo
+                local_path = map_image_url_to_local_path(
+                    image_url, self.image_path_index
                 )
             else:
                 local_path = None
                 logger.debug(f"No image_url_{i} present.")
             image_local_paths_dict[f"image_local_path_{i}"] = local_path
-        image_local_paths = ImageLocalPaths(**image_local_paths_dict)
-
-        categories = Categories(
-            **{
-                f"category_{i}": getattr(coalesce, f"category_{i}", None)
-                for i in range(4)
-            }
-        )
-
-        prices = Prices(
-            now_price=getattr(coalesce, "now_price", None),
-            was_price=getattr(coalesce, "was_price", None),
-            save_message=getattr(coalesce, "save_message", None),
-        )
-
-        return ProductOverviewRecord(
-            product_key=product.product_key,
-            system_name=product.system_name,
-            friendly_name=product.friendly_name,
-            product_code=getattr(coalesce, "product_code", None),
-            product_title=getattr(coalesce, "product_title", None),
-            product_url=getattr(coalesce, "product_url", None),
-            categories=categories,
-            description_text=getattr(coalesce, "description_text", None),
-            specification_text=getattr(coalesce, "specification_text", None),
-            specification_attributes_xml=getattr(
-                coalesce, "specification_attributes_xml", None
-            ),
-            image_local_paths=image_local_paths,
-            prices=prices,
-            on_promotion=getattr(coalesce, "on_promotion", None),
-            review_count=getattr(coalesce, "review_count", None),
-            review_rating=getattr(coalesce, "review_rating", None),
-            attribute_values=attribute_values,
+
+        return _build_product_overview(
+            product, coalesce, attribute_values, image_local_paths_dict
+        )
+
+
+class AsyncProductOverviewRepository:
+    """
+    Async counterpart of ProductOverviewRepository on the asyncpg engine.
+
+    By default overviews are built from the input tables using three
+    set-based queries (products, coalesce rows, attribute values) plus the
+    process-wide attribute cache and image path index. With
+    `materialized=True` they are read from the `product_overview`
+    materialized view instead, one pre-joined row per product in a single
+    query per call; products missing from the view (e.g. ingested since
+    its last refresh) are then built from the input tables. Either way the
+    round trips per page of products stay constant. Each call runs in its
+    own short-lived AsyncSession, so calls can overlap.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = async_engine,
+        materialized: bool | None = None,
+    ) -> None:
+        self.engine = engine
+        self.materialized = (
+            config.PRODUCT_OVERVIEW_MATERIALIZED
+            if materialized is None
+            else materialized
         )
 
+    async def get_product_overview(
+        self, product_key: str
+    ) -> ProductOverviewRecord | None:
+        overviews = await self.get_product_overviews([product_key])
+        return overviews[product_key]
+
+    async def get_product_overviews(
+        self, product_keys: list[str]
+    ) -> dict[str, ProductOverviewRecord | None]:
+        """
+        Get the overviews for `product_keys`, keyed by product key.
+        Products without a usable overview map to None.
+        """
+        if self.materialized:
+            return await self._read_overviews(product_keys)
+        return await self._build_overviews(product_keys)
+
+    async def _read_overviews(
+        self, product_keys: list[str]
+    ) -> dict[str, ProductOverviewRecord | None]:
+        overviews: dict[str, ProductOverviewRecord | None] = dict.fromkeys(
+            product_keys
+        )
+        if not product_keys:
+            return overviews
+
+        async with AsyncSession(self.engine) as session:
+            result = await session.scalars(
+                select(MaterializedProductOverviewRecord).where(
+                    MaterializedProductOverviewRecord.product_key.in_(
+                        product_keys
+                    )
+                )
+            )
+            for record in result:
+                overview = record.to_model()
+                overview.attribute_values = _sorted_attribute_values(
+                    overview.attribute_values
+                )
+                overviews[str(record.product_key)] = overview
+
+        missing = [
+            key for key, overview in overviews.items() if overview is None
+        ]
+        if missing:
+            built = await self._build_overviews(missing)
+            # Products without a system_name or coalesce row are never in
+            # the view; only those that could be built show it is stale.
+            stale = sum(overview is not None for overview in built.values())
+            if stale:
+                logger.warning(
+                    f"{stale} products have no product_overview row and "
+                    "were built from the input tables; the view may need "
+                    "a refresh"
+                )
+            overviews.update(built)
+        return overviews
+
+    async def _build_overviews(
+        self, product_keys: list[str]
+    ) -> dict[str, ProductOverviewRecord | None]:
+        overviews: dict[str, ProductOverviewRecord | None] = dict.fromkeys(
+            product_keys
+        )
+        if not product_keys:
+            return overviews
+
+        attributes = await attribute_cache.aget_all(self.engine)
+        image_paths = await image_path_index.aget(self.engine)
+        async with AsyncSession(self.engine) as session:
+            products = await self._get_products(session, product_keys)
+            coalesces = await self._get_coalesces(
+                session,
+                [p.system_name for p in products.values() if p.system_name],
+            )
+            attribute_values = await self._get_attribute_values(
+                session, list(products), attributes
+            )
+
+        for product_key in product_keys:
+            product = products.get(product_key)
+            if not product:
+                logger.warning(
+                    f"No product record found for product_key={product_key}"
+                )
+                continue
+            if product.system_name is None:
+                logger.warning(
+                    "Product system_name is None for "
+                    f"product_key={product_key}"
+                )
+                continue
+            coalesce = coalesces.get(product.system_name)
+            if not coalesce:
+                logger.warning(
+                    f"No coalesce record found for product_key={product_key}, "
+                    f"system_name={product.system_name}"
+                )
+                continue
+
+            image_local_paths_dict = {}
+            for i in range(1, 11):
+                image_url = getattr(coalesce, f"image_url_{i}", None)
+                image_local_paths_dict[f"image_local_path_{i}"] = (
+                    map_image_url_to_local_path(image_url, image_paths)
+                    if image_url
+                    else None
+                )
+
+            overviews[product_key] = _build_product_overview(
+                product,
+                coalesce,
+                attribute_values.get(product_key, []),
+                image_local_paths_dict,
+            )
+        return overviews
+
+    @staticmethod
+    async def _get_products(
+        session: AsyncSession, product_keys: list[str]
+    ) -> dict[str, ProductDTO]:
+        result = await session.scalars(
+            select(ProductRecord).where(
+                ProductRecord.product_key.in_(product_keys)
+            )
+        )
+        return {str(p.product_key): p.to_dto() for p in result}
+
+    @staticmethod
+    async def _get_coalesces(
+        session: AsyncSession, product_urls: list[str]
+    ) -> dict[str, DunelmCoalesceOutputDTO]:
+        if not product_urls:
+            return {}
+        result = await session.scalars(
+            select(DunelmCoalesceOutputRecord)
+            .where(DunelmCoalesceOutputRecord.product_url.in_(product_urls))
+            .order_by(DunelmCoalesceOutputRecord.product_code)
+        )
+        coalesces: dict[str, DunelmCoalesceOutputDTO] = {}
+        for record in result:
+            coalesce = record.to_dto()
+            # Keep the first row per URL by product code, as
+            # get_by_product_url and the product_overview view do.
+            if coalesce.product_url and coalesce.product_url not in coalesces:
+                coalesces[coalesce.product_url] = coalesce
+        return coalesces
+
+    @staticmethod
+    async def _get_attribute_values(
+        session: AsyncSession,
+        product_keys: list[str],
+        attributes: AttributeMap,
+    ) -> dict[str, list[dict[str, str | None]]]:
+        if not product_keys:
+            return {}
+        result = await session.scalars(
+            select(ProductAttributeValueRecord).where(
+                ProductAttributeValueRecord.product_key.in_(product_keys)
+            )
+        )
+        attribute_values: dict[str, list[dict[str, str | None]]] = {}
+        for av in result:
+            attr = attributes.get(str(av.attribute_key))
+            attribute_values.setdefault(str(av.product_key), []).append(
+                _attribute_value_dict(
+                    av.to_dto(), attr.friendly_name if attr else None
+                )
+            )
+        return attribute_values
+
 
 class ImagePredictionRepository:
     def __init__(self, session: Session):
@@ -228,6 +463,40 @@ class AsyncImagePredictionRepository:
 
         return list(all_product_keys - processed_product_keys)
 
+    async def find_unprocessed_product_keys_page(
+        self,
+        batch_key: UUID,
+        after_product_key: UUID | None = None,
+        limit: int = 1000,
+    ) -> list[UUID]:
+        """
+        Return the next page of product keys with no prediction in the
+        batch, in product_key order, starting after `after_product_key`.
+
+        Rows are read through a server-side cursor, so a page never needs
+        to be buffered by the driver as a whole.
+        """
+        stmt = (
+            select(ProductRecord.product_key)
+            .where(
+                ~exists().where(
+                    and_(
+                        ImagePredictionRecord.batch_key == batch_key,
+                        ImagePredictionRecord.product_key
+                        == ProductRecord.product_key,
+                    )
+                )
+            )
+            .order_by(ProductRecord.product_key)
+            .limit(limit)
+        )
+        if after_product_key is not None:
+            stmt = stmt.where(ProductRecord.product_key > after_product_key)
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=limit)
+        )
+        return [product_key async for product_key in result]
+
     async def add(self, record: ImagePredictionRecord) -> None:
         stmt = pg_insert(ImagePredictionRecord).values(record.to_dict())
         stmt = stmt.on_conflict_do_update(
@@ -248,3 +517,213 @@ class AsyncImagePredictionRepository:
         )
         await self.session.execute(stmt)
         await self.session.commit()
+
+    async def add_many(self, records: list[ImagePredictionRecord]) -> None:
+        """
+        Upsert many records with multi-row INSERT ... ON CONFLICT
+        statements and a single commit.
+        """
+        # A row may only be upserted once per statement, so keep the last
+        # record for each key.
+        rows = list(
+            {
+                (record.batch_key, record.product_key): record.to_dict()
+                for record in records
+            }.values()
+        )
+        for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(ImagePredictionRecord).values(
+                rows[i : i + UPSERT_CHUNK_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["batch_key", "product_key"],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in ImagePredictionDTO.model_fields
+                    if column not in ("batch_key", "product_key")
+                },
+            )
+            await self.session.execute(stmt)
+        await self.session.commit()
+
+
+class AsyncBatchCheckpointRepository:
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    async def get(self, batch_key: UUID) -> BatchCheckpointRecord | None:
+        result = await self.session.execute(
+            select(BatchCheckpointRecord).where(
+                BatchCheckpointRecord.batch_key == batch_key
+            )
+        )
+        return cast(BatchCheckpointRecord | None, result.scalar_one_or_none())
+
+    async def save(self, record: BatchCheckpointRecord) -> None:
+        stmt = pg_insert(BatchCheckpointRecord).values(record.to_dict())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["batch_key"],
+            set_={
+                "last_product_key": record.last_product_key,
+                "products_processed": record.products_processed,
+                "updated_at": record.updated_at,
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+
+class AsyncBatchFailedProductRepository:
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    async def find_unprocessed_product_keys(
+        self, batch_key: UUID, up_to_product_key: UUID
+    ) -> list[UUID]:
+        """
+        Return the batch's failed product keys, up to and including
+        `up_to_product_key`, that still have no prediction, in
+        product_key order.
+        """
+        result = await self.session.execute(
+            select(BatchFailedProductRecord.product_key)
+            .where(
+                BatchFailedProductRecord.batch_key == batch_key,
+                BatchFailedProductRecord.product_key <= up_to_product_key,
+                ~exists().where(
+                    and_(
+                        ImagePredictionRecord.batch_key == batch_key,
+                        ImagePredictionRecord.product_key
+                        == BatchFailedProductRecord.product_key,
+                    )
+                ),
+            )
+            .order_by(BatchFailedProductRecord.product_key)
+        )
+        return cast(list[UUID], result.scalars().all())
+
+    async def add_many(self, records: list[BatchFailedProductRecord]) -> None:
+        """
+        Record failures in a single commit. A product that failed before
+        keeps its created_at, takes the latest stage and error, and adds
+        to its attempts.
+        """
+        if not records:
+            return
+        table = BatchFailedProductRecord.__table__
+        rows = list(
+            {
+                (record.batch_key, record.product_key): record.to_dict()
+                for record in records
+            }.values()
+        )
+        for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(BatchFailedProductRecord).values(
+                rows[i : i + UPSERT_CHUNK_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["batch_key", "product_key"],
+                set_={
+                    "stage": stmt.excluded.stage,
+                    "error": stmt.excluded.error,
+                    "attempts": table.c.attempts + stmt.excluded.attempts,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            await self.session.execute(stmt)
+        await self.session.commit()
+
+
+class AsyncBatchLlmUsageRepository:
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    async def find_by_batch(
+        self, batch_key: UUID
+    ) -> list[BatchLlmUsageRecord]:
+        result = await self.session.execute(
+            select(BatchLlmUsageRecord)
+            .where(BatchLlmUsageRecord.batch_key == batch_key)
+            .order_by(BatchLlmUsageRecord.model, BatchLlmUsageRecord.stage)
+        )
+        return cast(list[BatchLlmUsageRecord], result.scalars().all())
+
+    async def add_many(self, records: list[BatchLlmUsageRecord]) -> None:
+        """
+        Add the counts in `records` to the batch's totals in a single
+        commit, creating the rows that do not exist yet. The cost stays
+        NULL until calls of the model have been priced.
+        """
+        if not records:
+            return
+        table = BatchLlmUsageRecord.__table__
+        stmt = pg_insert(BatchLlmUsageRecord).values(
+            [record.to_dict() for record in records]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["batch_key", "model", "stage"],
+            set_={
+                **{
+                    column: table.c[column] + stmt.excluded[column]
+                    for column in (
+                        "calls",
+                        "failures",
+                        "retries",
+                        "input_tokens",
+                        "cached_input_tokens",
+                        "output_tokens",
+                        "latency_seconds",
+                    )
+                },
+                "cost_usd": func.coalesce(
+                    table.c.cost_usd + stmt.excluded.cost_usd,
+                    table.c.cost_usd,
+                    stmt.excluded.cost_usd,
+                ),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+
+class AsyncLlmVerdictRepository:
+    def __init__(self, session: Any) -> None:
+        self.session = session
+
+    async def get_many(
+        self, verdict_keys: list[str]
+    ) -> list[LlmVerdictRecord]:
+        if not verdict_keys:
+            return []
+        result = await self.session.execute(
+            select(LlmVerdictRecord).where(
+                LlmVerdictRecord.verdict_key.in_(verdict_keys)
+            )
+        )
+        return cast(list[LlmVerdictRecord], result.scalars().all())
+
+    async def add_many(self, records: list[LlmVerdictRecord]) -> None:
+        """
+        Upsert many verdicts with multi-row INSERT ... ON CONFLICT
+        statements and a single commit. created_at keeps its first value.
+        """
+        rows = list(
+            {
+                record.verdict_key: record.to_dict() for record in records
+            }.values()
+        )
+        for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = pg_insert(LlmVerdictRecord).values(
+                rows[i : i + UPSERT_CHUNK_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["verdict_key"],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in LlmVerdictDTO.model_fields
+                    if column not in ("verdict_key", "created_at")
+                },
+            )
+            await self.session.execute(stmt)
+        await self.session.commit()
@@ -1,52 +1,172 @@
 import asyncio
 import logging
+from contextlib import AsyncExitStack, aclosing
+from functools import partial
+from pathlib import Path
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    cast,
+)
 from uuid import UUID
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.common.clock import clock
+from src.common.concurrency import (
+    AdaptiveLimiterStats,
+    Pipeline,
+    PipelineStats,
+    Stage,
+)
 from src.common.db.async_session import async_engine
 from src.common.db.base import uuid
-from src.common.llm import ImageEncoder, Llm
+from src.common.db.buffered_writer import BufferedWriter
+from src.common.llm import BatchLlm, ImageEncoder, Llm
+from src.common.llm.accounting import LlmCallStats
+from src.common.llm.base_classes import BatchResult
+from src.common.llm.cascade import CascadeStageStats, ModelCascade
+from src.common.llm.hedging import HedgeStats
+from src.common.llm.structured_output import StructuredOutputStats
+from src.common.llm.usage import LlmStageUsage
 from src.config import config
 from src.core.data_ingestion.repositories import ProductRepository
 from src.core.image_encoding import load_image_bytes_from_url
 from src.core.image_text_alignment.dtos import (
+    LlmVerdictDTO,
+    PackedClassifyStats,
     ProductImageCheckInput,
     ProductImageClassificationResult,
     ProductImageRefereeInput,
     ProductImageRefereeResult,
+    TextRefereeStats,
+    VerdictCacheStats,
+)
+from src.core.image_text_alignment.llm_classifier import (
+    STAGE as CLASSIFY_STAGE,
 )
 from src.core.image_text_alignment.llm_classifier import (
     ProductImageLLMClassifier,
 )
+from src.core.image_text_alignment.llm_referee import STAGE as REFEREE_STAGE
 from src.core.image_text_alignment.llm_referee import ProductImageLLMReferee
 from src.core.image_text_alignment.records import (
     ImagePredictionRecord,
+    LlmVerdictRecord,
     ProductOverviewRecord,
 )
 from src.core.image_text_alignment.repositories import (
     AsyncImagePredictionRepository,
+    AsyncProductOverviewRepository,
     ImagePredictionRepository,
-    ProductOverviewRepository,
 )
+from src.core.image_text_alignment.verdict_cache import VerdictCache
+
+
+class ProductAlignmentJob(BaseModel):
+    """State carried for one product as it moves through the pipeline."""
+
+    batch_key: UUID
+    product_key: str
+    # Classified through the provider's batch API rather than interactively.
+    batch_api: bool = False
+    product: ProductOverviewRecord | None = None
+    description: str | None = None
+    image_path: str | None = None
+    image_bytes: bytes | None = None
+    image_digest: str | None = None
+    image: str | None = None
+    verdict_key: str | None = None
+    cached: bool = False
+    result: ProductImageClassificationResult | None = None
+    referee_result: ProductImageRefereeResult | None = None
+
+
+class PipelineRun:
+    """
+    State of one streamed run: its pipeline, its buffered writers and the
+    number of products it skipped. Each run has its own, so runs sharing
+    a service (e.g. overlapping API requests) never write through each
+    other's writers. Callers pass one in to flush or inspect a run while
+    it is going.
+
+    `on_failed(stage, product_keys, error)` is called for every group of
+    products the pipeline skips.
+    """
+
+    def __init__(
+        self,
+        on_failed: Callable[[str, list[str], Exception], None] | None = None,
+    ) -> None:
+        self.on_failed = on_failed
+        self.pipeline: Pipeline | None = None
+        self.prediction_writer: (
+            BufferedWriter[ImagePredictionRecord] | None
+        ) = None
+        self.verdict_writer: BufferedWriter[LlmVerdictRecord] | None = None
+        self.failed = 0
+
+    def stats(self) -> PipelineStats | None:
+        """Counters for the run's pipeline, once it has started."""
+        return self.pipeline.stats() if self.pipeline is not None else None
+
+    async def flush(self) -> None:
+        """Write the predictions buffered so far."""
+        if self.prediction_writer is not None:
+            await self.prediction_writer.flush()
 
 
 class ImageTextAlignmentService:
     def __init__(
         self,
-        product_overview_repo: ProductOverviewRepository,
+        product_overview_repo: AsyncProductOverviewRepository,
         llm: Llm,
         logger: logging.Logger | None = None,
         max_workers: int | None = None,
+        db_concurrency: int | None = None,
+        io_concurrency: int | None = None,
+        queue_size: int | None = None,
+        overview_batch_size: int | None = None,
+        use_verdict_cache: bool | None = None,
+        batch_llm: BatchLlm | None = None,
+        cascade: ModelCascade | None = None,
+        pack_size: int | None = None,
     ) -> None:
         self.product_overview_repo = product_overview_repo
-        self.llm_checker = ProductImageLLMClassifier(llm)
-        self.llm_referee = ProductImageLLMReferee(llm)
-        self.logger = logger or logging.getLogger(__name__)
+        self.llm = llm
         self.image_encoder = ImageEncoder()
-        self.max_workers = max_workers or config.DB_ASYNC_POOL_SIZE
+        if cascade is None and config.LLM_CASCADE_ENABLED:
+            cascade = self._default_cascade(llm)
+        self.cascade = cascade
+        self.llm_checker = ProductImageLLMClassifier(
+            llm, self.image_encoder, cascade=cascade
+        )
+        self.llm_referee = ProductImageLLMReferee(
+            llm, self.image_encoder, cascade=cascade
+        )
+        self.logger = logger or logging.getLogger(__name__)
+        # Ceiling for LLM workers; the adaptive concurrency limiter decides
+        # how many of them actually call the endpoint at once.
+        self.max_workers = max_workers or llm.concurrency_limiter.max_limit
+        self.db_concurrency = db_concurrency or config.PIPELINE_DB_CONCURRENCY
+        self.io_concurrency = io_concurrency or config.PIPELINE_IO_CONCURRENCY
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.overview_batch_size = (
+            overview_batch_size or config.PIPELINE_OVERVIEW_BATCH_SIZE
+        )
+        # Products per classifier request; above 1, classification is not
+        # cascaded, except for fallback calls.
+        self.pack_size = pack_size or config.LLM_PACK_SIZE
+        if use_verdict_cache is None:
+            use_verdict_cache = config.VERDICT_CACHE_ENABLED
+        self.verdict_cache = VerdictCache(llm) if use_verdict_cache else None
+        self.batch_llm = batch_llm
+        self._failed_products = 0
 
     async def check_images_for_products(
         self, product_keys: list[str], batch_key: UUID | None = None
@@ -55,25 +175,247 @@ class ImageTextAlignmentService:
         Process specific product keys, optionally as part of a batch.
         If no batch_key is provided, generates a new one.
         Allows overwriting existing predictions, updating their timestamps.
+        Results are returned in completion order.
+        """
+        return [
+            result
+            async for result in self.stream_images_for_products(
+                product_keys, batch_key=batch_key
+            )
+        ]
+
+    async def check_image_for_product(
+        self, product_key: str, batch_key: UUID | None = None
+    ) -> ProductImageClassificationResult:
+        """
+        Process a single product without the staged pipeline.
+
+        The pipeline's steps run one after another for this product and
+        the result is written as soon as it is ready, so an interactive
+        request starts no stage workers, queues or buffered writers.
         """
         if batch_key is None:
             batch_key = uuid()
+        job = ProductAlignmentJob(batch_key=batch_key, product_key=product_key)
+        (job,) = await self._load_overviews([job])
+        job = await self._load_image(job)
+        (job,) = await self._lookup_verdicts([job])
+        job = await self._encode_image(job)
+        job = await self._classify(job)
+        job = await self._referee(job)
+        result, referee_result = self._finished(job)
+        await self._write_predictions(
+            [self._build_record(batch_key, result, referee_result)]
+        )
+        verdict = self._verdict_record(job)
+        if verdict is not None:
+            await cast(VerdictCache, self.verdict_cache).add_many([verdict])
+        return result
 
-        chunks = [
-            product_keys[i : i + self.max_workers]
-            for i in range(0, len(product_keys), self.max_workers)
-        ]
+    async def stream_images_for_products(
+        self,
+        product_keys: Iterable[str] | AsyncIterable[str],
+        batch_key: UUID | None = None,
+        run: PipelineRun | None = None,
+    ) -> AsyncGenerator[ProductImageClassificationResult, None]:
+        """
+        Process product keys through the staged pipeline, yielding each
+        result as soon as it is queued for storage.
 
-        all_results = []
-        for chunk in chunks:
-            tasks = [
-                self._process_single_product(batch_key, product_key)
-                for product_key in chunk
-            ]
-            chunk_results = await asyncio.gather(*tasks)
-            all_results.extend(chunk_results)
+        DB and disk stages run wide and can work ahead of the LLM stages,
+        which have `max_workers` workers each, gated by the adaptive LLM
+        concurrency limit. Stages are joined by bounded
+        queues, so a backed-up stage slows the ones before it. Results are
+        written in bulk by a buffered writer that is flushed before the
+        stream ends, including on cancellation. A product whose processing
+        raises is logged and skipped, and yields no result.
 
-        return all_results
+        With the verdict cache enabled, products whose description, image,
+        prompts and model match an earlier run reuse its verdict and skip
+        the LLM stages; new verdicts are added to the cache.
+
+        The run's pipeline and writers live in `run` (a new PipelineRun by
+        default).
+        """
+        if batch_key is None:
+            batch_key = uuid()
+        async with aclosing(
+            self._run_pipeline(
+                run or PipelineRun(), self._jobs(product_keys, batch_key)
+            )
+        ) as results:
+            async for result in results:
+                yield result
+
+    async def stream_batch_jobs_for_products(
+        self,
+        product_keys: Iterable[str] | AsyncIterable[str],
+        batch_key: UUID | None = None,
+        run: PipelineRun | None = None,
+    ) -> AsyncGenerator[ProductImageClassificationResult, None]:
+        """
+        Offline variant of `stream_images_for_products` for runs that do
+        not need interactive latency.
+
+        Products go through the same overview, image and verdict cache
+        stages, then are classified in chunks of `LLM_BATCH_MAX_REQUESTS`
+        through the provider's batch API, with up to
+        `LLM_BATCH_MAX_ACTIVE_JOBS` jobs in flight. Each chunk's
+        classifier requests are written to a JSONL file and submitted as
+        one job; the referee requests for its non-matching results follow
+        as a second job. Requests that fail or return invalid output are
+        retried through the interactive LLM. Results are stored under
+        `batch_key` as in the interactive mode.
+        """
+        if batch_key is None:
+            batch_key = uuid()
+        if self.batch_llm is None:
+            self.batch_llm = BatchLlm()
+        async with aclosing(
+            self._run_pipeline(
+                run or PipelineRun(),
+                self._jobs(product_keys, batch_key, batch_api=True),
+                batch_api=True,
+            )
+        ) as results:
+            async for result in results:
+                yield result
+
+    async def _run_pipeline(
+        self,
+        run: PipelineRun,
+        jobs: AsyncIterator[ProductAlignmentJob],
+        batch_api: bool = False,
+    ) -> AsyncGenerator[ProductImageClassificationResult, None]:
+        pipeline = run.pipeline = self._build_pipeline(run, batch_api)
+        async with AsyncExitStack() as writers:
+            run.prediction_writer = await writers.enter_async_context(
+                BufferedWriter(
+                    self._write_predictions,
+                    max_batch_size=config.PREDICTION_WRITE_BATCH_SIZE,
+                    flush_interval=config.PREDICTION_WRITE_FLUSH_INTERVAL,
+                    name="image_prediction_writer",
+                    max_buffered=config.PREDICTION_WRITE_MAX_BUFFERED,
+                )
+            )
+            if self.verdict_cache is not None:
+                run.verdict_writer = await writers.enter_async_context(
+                    BufferedWriter(
+                        self.verdict_cache.add_many,
+                        max_batch_size=config.PREDICTION_WRITE_BATCH_SIZE,
+                        flush_interval=config.PREDICTION_WRITE_FLUSH_INTERVAL,
+                        name="llm_verdict_writer",
+                        max_buffered=config.PREDICTION_WRITE_MAX_BUFFERED,
+                    )
+                )
+            async for job in pipeline.run(jobs):
+                yield cast(ProductImageClassificationResult, job.result)
+        run.prediction_writer = None
+        run.verdict_writer = None
+        self.logger.info(f"Pipeline finished: {pipeline.stats().summary()}")
+        concurrency = self.llm_concurrency_stats()
+        self.logger.info(
+            f"LLM concurrency limit {concurrency.limit:.1f} "
+            f"({concurrency.overloads} overloads)"
+        )
+        for usage in self.llm_usage_stats():
+            self.logger.info(f"LLM usage {usage.summary()}")
+        for calls in self.llm_call_stats():
+            self.logger.info(f"LLM calls {calls.summary()}")
+        for cascade_stats in self.llm_cascade_stats():
+            self.logger.info(f"LLM cascade {cascade_stats.summary()}")
+        packed = self.packed_classify_stats()
+        if packed is not None and packed.requests:
+            self.logger.info(
+                f"Packed classifier: {packed.requests} requests carried "
+                f"{packed.products} products "
+                f"({packed.mean_pack_size:.1f} per request); "
+                f"{packed.fallbacks} fell back to single-product calls "
+                f"({packed.fallback_rate:.1%})"
+            )
+        text_referee = self.text_referee_stats()
+        if text_referee is not None and text_referee.calls:
+            saved = text_referee.input_tokens_saved
+            self.logger.info(
+                f"Text-only referee escalated {text_referee.escalated} of "
+                f"{text_referee.calls} calls "
+                f"({text_referee.escalation_rate:.1%}), "
+                + (
+                    f"saving {saved} input tokens"
+                    if saved is not None
+                    else "savings not measured (no call escalated)"
+                )
+                + f"; {text_referee.mean_text_seconds:.2f}s per text-only "
+                f"call vs {text_referee.mean_image_seconds:.2f}s with the "
+                f"image"
+            )
+        output = self.llm_output_stats()
+        if output.repaired or output.invalid:
+            self.logger.info(
+                f"LLM output: {output.repaired} repaired locally, "
+                f"{output.invalid} unparseable"
+            )
+        hedging = self.llm_hedge_stats()
+        if hedging is not None:
+            self.logger.info(
+                f"Hedged {hedging.hedged} of {hedging.calls} LLM calls "
+                f"({hedging.hedge_rate:.1%}); the hedge won "
+                f"{hedging.hedge_wins}"
+            )
+        cache_stats = self.verdict_cache_stats()
+        if cache_stats is not None:
+            self.logger.info(
+                f"Verdict cache: {cache_stats.hits} hits, "
+                f"{cache_stats.misses} misses "
+                f"({cache_stats.hit_rate:.1%} hit rate)"
+            )
+
+    def failed_product_count(self) -> int:
+        """Products skipped because a pipeline stage raised."""
+        return self._failed_products
+
+    def llm_hedge_stats(self) -> HedgeStats | None:
+        """Hedged LLM calls and how often the hedge finished first."""
+        return self.llm.hedge_stats()
+
+    def llm_cascade_stats(self) -> list[CascadeStageStats]:
+        """Escalation rates and per-tier latency and cost, per stage."""
+        return self.cascade.stats() if self.cascade is not None else []
+
+    def packed_classify_stats(self) -> PackedClassifyStats | None:
+        """Packed classifier requests and their fallbacks, if enabled."""
+        if self.pack_size <= 1:
+            return None
+        return self.llm_checker.packed_stats()
+
+    def text_referee_stats(self) -> TextRefereeStats | None:
+        """Escalations and savings of the text-only referee, if enabled."""
+        return self.llm_referee.text_only_stats()
+
+    def llm_output_stats(self) -> StructuredOutputStats:
+        """LLM outputs parsed as returned, after local repair, or not."""
+        return self.llm.structured_output_stats()
+
+    def llm_call_stats(self) -> list[LlmCallStats]:
+        """Calls, retries, latency and cost per LLM model and stage."""
+        stats = self.llm.call_stats()
+        if self.cascade is not None and self.cascade.cheap is not self.llm:
+            stats.extend(self.cascade.cheap.call_stats())
+        return stats
+
+    def llm_usage_stats(self) -> list[LlmStageUsage]:
+        """Token usage and prompt-cache hit rate per LLM stage."""
+        return self.llm.usage_stats()
+
+    def llm_concurrency_stats(self) -> AdaptiveLimiterStats:
+        """Current adaptive concurrency limit for the LLM endpoint."""
+        return self.llm.concurrency_limiter.stats()
+
+    def verdict_cache_stats(self) -> VerdictCacheStats | None:
+        """Verdict cache hits and misses since the service was created."""
+        if self.verdict_cache is None:
+            return None
+        return self.verdict_cache.stats()
 
     def check_unprocessed_products(
         self, session: Session, batch_key: UUID
@@ -92,118 +434,547 @@ class ImageTextAlignmentService:
         ]
         return unprocessed
 
-    async def _process_single_product(
-        self, batch_key: UUID, product_key: str
-    ) -> ProductImageClassificationResult:
-        """
-        Process a single product and store its result.
-        This is an atomic operation that includes both processing and storage.
-        """
-        product: ProductOverviewRecord | None = (
-            self.product_overview_repo.get_product_overview(product_key)
+    def _build_pipeline(
+        self, run: PipelineRun, batch_api: bool = False
+    ) -> Pipeline:
+        llm_stages = (
+            [
+                # One batch job per chunk; a single chunk waits in the
+                # queue so prepared images do not pile up in memory.
+                Stage(
+                    "batch_api",
+                    self._run_batch_job,
+                    config.LLM_BATCH_MAX_ACTIVE_JOBS,
+                    1,
+                    batch_size=config.LLM_BATCH_MAX_REQUESTS,
+                ),
+            ]
+            if batch_api
+            else [
+                (
+                    Stage(
+                        "classify",
+                        self._classify_packed,
+                        self.max_workers,
+                        self.queue_size,
+                        batch_size=self.pack_size,
+                    )
+                    if self.pack_size > 1
+                    else Stage(
+                        "classify",
+                        self._classify,
+                        self.max_workers,
+                        self.queue_size,
+                    )
+                ),
+                Stage(
+                    "referee",
+                    self._referee,
+                    self.max_workers,
+                    self.queue_size,
+                ),
+            ]
+        )
+        return Pipeline(
+            [
+                Stage(
+                    "overview",
+                    self._load_overviews,
+                    self.db_concurrency,
+                    self.queue_size,
+                    batch_size=self.overview_batch_size,
+                ),
+                Stage(
+                    "load_image",
+                    self._load_image,
+                    self.io_concurrency,
+                    self.queue_size,
+                ),
+                Stage(
+                    "verdict_cache",
+                    self._lookup_verdicts,
+                    self.db_concurrency,
+                    self.queue_size,
+                    batch_size=config.VERDICT_CACHE_LOOKUP_BATCH_SIZE,
+                ),
+                Stage(
+                    "encode_image",
+                    self._encode_image,
+                    self.io_concurrency,
+                    self.queue_size,
+                ),
+                *llm_stages,
+                Stage(
+                    "store",
+                    partial(self._store, run),
+                    self.db_concurrency,
+                    self.queue_size,
+                ),
+            ],
+            name="image_text_alignment",
+            stats_log_interval=config.PIPELINE_STATS_LOG_INTERVAL,
+            on_error=partial(self._skip_failed, run),
+        )
+
+    def _skip_failed(
+        self,
+        run: PipelineRun,
+        stage: str,
+        item: ProductAlignmentJob | list[ProductAlignmentJob],
+        error: Exception,
+    ) -> None:
+        """Log jobs whose stage raised; the pipeline drops them."""
+        jobs = item if isinstance(item, list) else [item]
+        run.failed += len(jobs)
+        self._failed_products += len(jobs)
+        self.logger.error(
+            f"Skipping {len(jobs)} product(s) after the {stage} stage "
+            f"failed: product_key="
+            f"{', '.join(job.product_key for job in jobs)}",
+            exc_info=error,
+        )
+        if run.on_failed is not None:
+            run.on_failed(stage, [job.product_key for job in jobs], error)
+
+    @staticmethod
+    async def _jobs(
+        product_keys: Iterable[str] | AsyncIterable[str],
+        batch_key: UUID,
+        batch_api: bool = False,
+    ) -> AsyncIterator[ProductAlignmentJob]:
+        if isinstance(product_keys, AsyncIterable):
+            async for product_key in product_keys:
+                yield ProductAlignmentJob(
+                    batch_key=batch_key,
+                    product_key=product_key,
+                    batch_api=batch_api,
+                )
+        else:
+            for product_key in product_keys:
+                yield ProductAlignmentJob(
+                    batch_key=batch_key,
+                    product_key=product_key,
+                    batch_api=batch_api,
+                )
+
+    @staticmethod
+    def _not_applicable(
+        job: ProductAlignmentJob, reason: str
+    ) -> ProductAlignmentJob:
+        """Finish a job early with N/A results, skipping the LLM stages."""
+        job.result = ProductImageClassificationResult(
+            product_key=job.product_key,
+            colour_status="N/A",
+            colour_justification=reason,
+            image_path=job.image_path,
+            description_synthesis="N/A",
+            image_summary="N/A",
+        )
+        job.referee_result = ProductImageRefereeResult(
+            final_colour_status="N/A",
+            final_colour_justification=reason,
         )
+        return job
 
+    async def _load_overviews(
+        self, jobs: list[ProductAlignmentJob]
+    ) -> list[ProductAlignmentJob]:
+        """Load the overviews for a batch of jobs in one bulk lookup."""
+        overviews = await self.product_overview_repo.get_product_overviews(
+            [job.product_key for job in jobs]
+        )
+        return [
+            self._attach_overview(job, overviews.get(job.product_key))
+            for job in jobs
+        ]
+
+    def _attach_overview(
+        self, job: ProductAlignmentJob, product: ProductOverviewRecord | None
+    ) -> ProductAlignmentJob:
         if not product:
             self.logger.warning(
-                f"No product overview found for product_key={product_key}"
-            )
-            result = ProductImageClassificationResult(
-                product_key=product_key,
-                colour_status="N/A",
-                colour_justification="No product overview found.",
-                image_path=None,
-                description_synthesis="N/A",
-                image_summary="N/A",
+                f"No product overview found for product_key={job.product_key}"
             )
-            referee_result = ProductImageRefereeResult(
-                final_colour_status="N/A",
-                final_colour_justification="No product overview found.",
-            )
-            await self._store_result(batch_key, result, referee_result)
-            return result
-
-        image_paths = [
-            v for v in product.image_local_paths.model_dump().values() if v
-        ]
+            return self._not_applicable(job, "No product overview found.")
 
+        image_paths = self._get_image_paths(product)
         if not image_paths:
             self.logger.warning(
-                f"No images found for product_key={product_key}"
-            )
-            result = ProductImageClassificationResult(
-                product_key=product_key,
-                colour_status="N/A",
-                colour_justification="No images found.",
-                image_path=None,
-                description_synthesis="N/A",
-                image_summary="N/A",
-            )
-            referee_result = ProductImageRefereeResult(
-                final_colour_status="N/A",
-                final_colour_justification="No images found.",
+                f"No images found for product_key={job.product_key}"
             )
-            await self._store_result(batch_key, result, referee_result)
-            return result
+            return self._not_applicable(job, "No images found.")
 
-        image_url = image_paths[0]
-        image_result = load_image_bytes_from_url(image_url)
+        job.product = product
+        job.image_path = image_paths[0]
+        return job
+
+    async def _load_image(
+        self, job: ProductAlignmentJob
+    ) -> ProductAlignmentJob:
+        if job.result is not None or job.image_path is None:
+            return job
+        image_url = job.image_path
+        image_result = await asyncio.to_thread(
+            load_image_bytes_from_url, image_url
+        )
+        job.image_path = image_result.filename
         if image_result.image_bytes is None:
             self.logger.warning(f"Image file not found: {image_url}")
-            result = ProductImageClassificationResult(
-                product_key=product_key,
-                colour_status="N/A",
-                colour_justification="Image file not found.",
-                image_path=image_result.filename,
-                description_synthesis="N/A",
-                image_summary="N/A",
-            )
-            referee_result = ProductImageRefereeResult(
-                final_colour_status="N/A",
-                final_colour_justification="Image file not found.",
-            )
-            await self._store_result(batch_key, result, referee_result)
-            return result
-
-        image_str = self.image_encoder.encode_image(image_result.image_bytes)
-        description = product.to_llm_string()
-        input_dto = ProductImageCheckInput(
-            product_key=product_key,
-            description=description,
-            image=image_str,
-        )
-        result = await self.llm_checker.classify_image_colour(input_dto)
-        result.image_path = image_result.filename
+            return self._not_applicable(job, "Image file not found.")
+        job.image_bytes = image_result.image_bytes
+        if self.verdict_cache is not None:
+            job.image_digest = self.verdict_cache.image_digest(
+                image_result.image_bytes
+            )
+        return job
+
+    async def _lookup_verdicts(
+        self, jobs: list[ProductAlignmentJob]
+    ) -> list[ProductAlignmentJob]:
+        """Reuse cached verdicts for jobs whose inputs are unchanged."""
+        if self.verdict_cache is None:
+            return jobs
+        pending = [
+            job
+            for job in jobs
+            if job.result is None
+            and job.product is not None
+            and job.image_digest is not None
+        ]
+        for job in pending:
+            job.description = cast(
+                ProductOverviewRecord, job.product
+            ).to_llm_string()
+            job.verdict_key = self.verdict_cache.key(
+                job.description,
+                cast(str, job.image_digest),
+                self._verdict_settings(job.batch_api),
+            )
+        verdicts = await self.verdict_cache.get_many(
+            [cast(str, job.verdict_key) for job in pending]
+        )
+        for job in pending:
+            verdict = verdicts.get(cast(str, job.verdict_key))
+            if verdict is not None:
+                self._apply_verdict(job, verdict)
+        return jobs
+
+    @staticmethod
+    def _apply_verdict(
+        job: ProductAlignmentJob, verdict: LlmVerdictDTO
+    ) -> None:
+        job.result = ProductImageClassificationResult(
+            product_key=job.product_key,
+            image_path=job.image_path,
+            colour_status=verdict.colour_status,
+            colour_justification=verdict.colour_justification,
+            image_summary=verdict.image_summary,
+            description_synthesis=verdict.description_synthesis,
+        )
+        job.referee_result = ProductImageRefereeResult(
+            final_colour_status=verdict.final_colour_status,
+            final_colour_justification=verdict.final_colour_justification,
+        )
+        job.cached = True
+        job.image_bytes = None
+
+    async def _encode_image(
+        self, job: ProductAlignmentJob
+    ) -> ProductAlignmentJob:
+        if job.result is not None or job.image_bytes is None:
+            return job
+        job.image = await asyncio.to_thread(
+            self.image_encoder.encode_image, job.image_bytes
+        )
+        job.image_bytes = None
+        return job
+
+    async def _classify(self, job: ProductAlignmentJob) -> ProductAlignmentJob:
+        if job.result is not None or job.product is None or job.image is None:
+            return job
+        result = await self.llm_checker.classify_image_colour(
+            self._check_input(job)
+        )
+        self._set_classification(job, result)
+        return job
+
+    async def _classify_packed(
+        self, jobs: list[ProductAlignmentJob]
+    ) -> list[ProductAlignmentJob]:
+        pending = [
+            job
+            for job in jobs
+            if job.result is None
+            and job.product is not None
+            and job.image is not None
+        ]
+        results = await self.llm_checker.classify_packed(
+            [self._check_input(job) for job in pending]
+        )
+        for job, result in zip(pending, results, strict=True):
+            self._set_classification(job, result)
+        return jobs
+
+    async def _referee(self, job: ProductAlignmentJob) -> ProductAlignmentJob:
+        if (
+            job.referee_result is not None
+            or job.result is None
+            or job.description is None
+            or job.image is None
+        ):
+            return job
+        job.referee_result = await self.llm_referee.referee(
+            self._referee_input(job)
+        )
+        return job
+
+    @staticmethod
+    def _default_cascade(premium: Llm) -> ModelCascade:
+        return ModelCascade(
+            cheap=Llm(
+                provider=config.LLM_CASCADE_PROVIDER or None,
+                model=config.LLM_CASCADE_MODEL,
+            ),
+            premium=premium,
+            thresholds={
+                CLASSIFY_STAGE: config.LLM_CASCADE_CLASSIFY_THRESHOLD,
+                REFEREE_STAGE: config.LLM_CASCADE_REFEREE_THRESHOLD,
+            },
+        )
+
+    def _verdict_settings(self, batch_api: bool) -> tuple[str, ...]:
+        """
+        Settings that change how verdicts are reached in a mode. Batch jobs
+        classify one product per request on the batch provider's model and
+        always referee with the image.
+        """
+        if batch_api:
+            batch_llm = cast(BatchLlm, self.batch_llm)
+            return (f"batch_api={batch_llm.provider_name}:{batch_llm.model}",)
+        settings: list[str] = []
+        if self.llm_referee.text_only:
+            settings.append("referee_mode=text")
+        if self.pack_size > 1:
+            settings.append(f"pack_size={self.pack_size}")
+        if self.cascade is not None:
+            settings.append(
+                f"cascade={self.cascade.cheap.provider_name}:"
+                f"{self.cascade.cheap.model}:"
+                f"{sorted(self.cascade.thresholds.items())}:"
+                f"{config.LLM_CASCADE_ESCALATE_MISMATCHES}"
+            )
+        return tuple(settings)
+
+    @staticmethod
+    def _check_input(job: ProductAlignmentJob) -> ProductImageCheckInput:
+        if job.description is None:
+            job.description = cast(
+                ProductOverviewRecord, job.product
+            ).to_llm_string()
+        return ProductImageCheckInput(
+            product_key=job.product_key,
+            description=job.description,
+            image=cast(str, job.image),
+        )
+
+    @staticmethod
+    def _referee_input(job: ProductAlignmentJob) -> ProductImageRefereeInput:
+        result = cast(ProductImageClassificationResult, job.result)
+        return ProductImageRefereeInput(
+            product_key=job.product_key,
+            description=cast(str, job.description),
+            image=cast(str, job.image),
+            classifier_colour_status=result.colour_status,
+            classifier_colour_justification=result.colour_justification,
+            classifier_image_summary=result.image_summary,
+            classifier_description_synthesis=result.description_synthesis,
+        )
+
+    @staticmethod
+    def _set_classification(
+        job: ProductAlignmentJob, result: ProductImageClassificationResult
+    ) -> None:
+        result.image_path = job.image_path
+        job.result = result
 
         # Only call referee if the classifier result is not "MATCH"
-        if result.colour_status != "MATCH":
-            referee_input = ProductImageRefereeInput(
-                product_key=product_key,
-                description=description,
-                image=image_str,
-                classifier_colour_status=result.colour_status,
-                classifier_colour_justification=result.colour_justification,
-                classifier_image_summary=result.image_summary,
-                classifier_description_synthesis=result.description_synthesis,
-            )
-            referee_result = await self.llm_referee.referee(referee_input)
-        else:
+        if result.colour_status == "MATCH":
             # If it's a match, use the classifier's result as the final result
-            referee_result = ProductImageRefereeResult(
+            job.referee_result = ProductImageRefereeResult(
                 final_colour_status=result.colour_status,
                 final_colour_justification=result.colour_justification,
             )
 
-        await self._store_result(batch_key, result, referee_result)
-        return result
+    async def _run_batch_job(
+        self, jobs: list[ProductAlignmentJob]
+    ) -> list[ProductAlignmentJob]:
+        """Classify and referee a chunk of jobs through the batch API."""
+        pending = [
+            job
+            for job in jobs
+            if job.result is None
+            and job.product is not None
+            and job.image is not None
+        ]
+        if not pending:
+            return jobs
+        batch_llm = cast(BatchLlm, self.batch_llm)
+        job_dir = (
+            config.LLM_BATCH_WORK_DIR / str(pending[0].batch_key) / uuid().hex
+        )
 
-    async def _store_result(
-        self,
+        # Images are dropped once written and read back from the
+        # classifier file only when needed, so a chunk waiting on its
+        # batch job holds no image data.
+        classify_path = job_dir / "classify.jsonl"
+        batch_llm.write_requests(
+            (
+                self.llm_checker.batch_request(
+                    job.product_key, self._check_input(job)
+                )
+                for job in pending
+            ),
+            classify_path,
+        )
+        for job in pending:
+            job.image = None
+        results = await batch_llm.run(classify_path)
+        retry = []
+        for job in pending:
+            try:
+                self._set_classification(
+                    job,
+                    self.llm_checker.parse_response(
+                        job.product_key,
+                        self._batch_content(
+                            results[job.product_key], self.llm_checker.stage
+                        ),
+                    ),
+                )
+            except ValueError as e:
+                self.logger.warning(
+                    f"Batch classification failed for product_key="
+                    f"{job.product_key}, retrying interactively: {e}"
+                )
+                retry.append(job)
+        unrefereed = [job for job in pending if job.referee_result is None]
+        self._restore_images(batch_llm, classify_path, unrefereed)
+        self._skip_verdict_cache(retry)
+        await asyncio.gather(*map(self._classify, retry))
+
+        unrefereed = [job for job in pending if job.referee_result is None]
+        if unrefereed:
+            referee_path = job_dir / "referee.jsonl"
+            batch_llm.write_requests(
+                (
+                    self.llm_referee.batch_request(
+                        job.product_key, self._referee_input(job)
+                    )
+                    for job in unrefereed
+                ),
+                referee_path,
+            )
+            results = await batch_llm.run(referee_path)
+            retry = []
+            for job in unrefereed:
+                try:
+                    job.referee_result = self.llm_referee.parse_response(
+                        self._batch_content(
+                            results[job.product_key], self.llm_referee.stage
+                        )
+                    )
+                except ValueError as e:
+                    self.logger.warning(
+                        f"Batch referee failed for product_key="
+                        f"{job.product_key}, retrying interactively: {e}"
+                    )
+                    retry.append(job)
+            self._skip_verdict_cache(retry)
+            await asyncio.gather(*map(self._referee, retry))
+        for job in pending:
+            job.image = None
+        return jobs
+
+    @staticmethod
+    def _skip_verdict_cache(jobs: list[ProductAlignmentJob]) -> None:
+        """
+        Keep verdicts finished interactively out of the cache: they were
+        not reached the way batch verdicts are keyed.
+        """
+        for job in jobs:
+            job.verdict_key = None
+
+    def _batch_content(self, result: BatchResult, stage: str) -> str:
+        self.llm.record_batch_call(
+            stage,
+            cast(BatchLlm, self.batch_llm).model,
+            result.usage,
+            failed=result.content is None,
+        )
+        if result.content is None:
+            raise ValueError(result.error or "empty batch result")
+        return result.content
+
+    @staticmethod
+    def _restore_images(
+        batch_llm: BatchLlm, path: Path, jobs: list[ProductAlignmentJob]
+    ) -> None:
+        """Reload the encoded images of `jobs` from a classifier file."""
+        wanted = {job.product_key: job for job in jobs}
+        if not wanted:
+            return
+        for request in batch_llm.read_requests(path):
+            job = wanted.get(request.custom_id)
+            if job is not None:
+                job.image = request.images[0]
+
+    async def _store(
+        self, run: PipelineRun, job: ProductAlignmentJob
+    ) -> ProductAlignmentJob:
+        result, referee_result = self._finished(job)
+        if run.prediction_writer is None:
+            raise RuntimeError("Prediction writer is not running")
+        await run.prediction_writer.add(
+            self._build_record(job.batch_key, result, referee_result)
+        )
+        verdict = self._verdict_record(job)
+        if run.verdict_writer is not None and verdict is not None:
+            await run.verdict_writer.add(verdict)
+        # Drop the heavy fields once queued; only the result is yielded.
+        job.product = None
+        job.image = None
+        return job
+
+    @staticmethod
+    def _finished(
+        job: ProductAlignmentJob,
+    ) -> tuple[ProductImageClassificationResult, ProductImageRefereeResult]:
+        if job.result is None or job.referee_result is None:
+            raise ValueError(
+                "Pipeline produced no result for "
+                f"product_key={job.product_key}"
+            )
+        return job.result, job.referee_result
+
+    def _verdict_record(
+        self, job: ProductAlignmentJob
+    ) -> LlmVerdictRecord | None:
+        """The verdict cache entry for a job's newly reached verdict."""
+        if self.verdict_cache is None or job.verdict_key is None or job.cached:
+            return None
+        result, referee_result = self._finished(job)
+        return self.verdict_cache.build_record(
+            job.verdict_key, result, referee_result
+        )
+
+    @staticmethod
+    def _build_record(
         batch_key: UUID,
         result: ProductImageClassificationResult,
         referee_result: ProductImageRefereeResult,
-    ) -> None:
+    ) -> ImagePredictionRecord:
         """
-        Store or update a prediction result in the database.
+        Build the prediction row for a result.
         Updates the timestamps appropriately.
         """
         now = clock.now()
@@ -223,11 +994,16 @@ class ImageTextAlignmentService:
             created_at=now,
             updated_at=now,
         )
+        return record
+
+    @staticmethod
+    async def _write_predictions(records: list[ImagePredictionRecord]) -> None:
+        """Store or update a batch of prediction results in one upsert."""
         async with AsyncSession(async_engine) as async_session:
             image_prediction_repo = AsyncImagePredictionRepository(
                 async_session
             )
-            await image_prediction_repo.add(record)
+            await image_prediction_repo.add_many(records)
 
     def _get_image_paths(self, product: ProductOverviewRecord) -> list[str]:
         return [
@@ -0,0 +1,123 @@
+import hashlib
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.common.clock import clock
+from src.common.db.async_session import async_engine
+from src.common.llm import Llm
+from src.core.image_text_alignment.dtos import (
+    LlmVerdictDTO,
+    ProductImageClassificationResult,
+    ProductImageRefereeResult,
+    VerdictCacheStats,
+)
+from src.core.image_text_alignment.records import LlmVerdictRecord
+from src.core.image_text_alignment.repositories import (
+    AsyncLlmVerdictRepository,
+)
+
+from .prompts import CLASSIFIER_PROMPT, REFEREE_PROMPT
+
+# Bump to invalidate every cached verdict, e.g. when the way prompts are
+# assembled changes without the prompt files changing.
+VERDICT_CACHE_VERSION = "1"
+
+
+class VerdictCache:
+    """
+    Persistent, content-addressed cache of classifier and referee
+    verdicts.
+
+    A verdict is keyed by a SHA-256 over everything that determines it:
+    the product description sent to the LLM, the image bytes, both
+    prompts, the provider, model, temperature and every deployment that
+    may answer (such as the router's), and the `settings` of the mode
+    that reached it (such as the referee mode, model cascade or batch
+    API). A product whose inputs are unchanged since an earlier batch can
+    reuse that batch's verdict without calling the LLM.
+    """
+
+    def __init__(
+        self,
+        llm: Llm,
+        engine: AsyncEngine = async_engine,
+    ) -> None:
+        self.engine = engine
+        self._prefix = self._hash(
+            VERDICT_CACHE_VERSION,
+            CLASSIFIER_PROMPT,
+            REFEREE_PROMPT,
+            llm.provider_name,
+            llm.model,
+            str(llm.temperature),
+            *llm.deployments(),
+        )
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def image_digest(image_bytes: bytes) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def key(
+        self,
+        description: str,
+        image_digest: str,
+        settings: tuple[str, ...] = (),
+    ) -> str:
+        return self._hash(
+            self._prefix, self._hash(*settings), description, image_digest
+        )
+
+    async def get_many(
+        self, verdict_keys: list[str]
+    ) -> dict[str, LlmVerdictDTO]:
+        """Look up verdicts, counting a hit or miss for every key."""
+        async with AsyncSession(self.engine) as session:
+            records = await AsyncLlmVerdictRepository(session).get_many(
+                verdict_keys
+            )
+        verdicts = {
+            verdict.verdict_key: verdict
+            for verdict in (record.to_dto() for record in records)
+        }
+        hits = sum(1 for key in verdict_keys if key in verdicts)
+        self._hits += hits
+        self._misses += len(verdict_keys) - hits
+        return verdicts
+
+    async def add_many(self, records: list[LlmVerdictRecord]) -> None:
+        async with AsyncSession(self.engine) as session:
+            await AsyncLlmVerdictRepository(session).add_many(records)
+
+    def stats(self) -> VerdictCacheStats:
+        return VerdictCacheStats(hits=self._hits, misses=self._misses)
+
+    @staticmethod
+    def build_record(
+        verdict_key: str,
+        result: ProductImageClassificationResult,
+        referee_result: ProductImageRefereeResult,
+    ) -> LlmVerdictRecord:
+        now = clock.now()
+        return LlmVerdictRecord(
+            verdict_key=verdict_key,
+            colour_status=result.colour_status,
+            colour_justification=result.colour_justification,
+            image_summary=result.image_summary,
+            description_synthesis=result.description_synthesis,
+            final_colour_status=referee_result.final_colour_status,
+            final_colour_justification=referee_result.final_colour_justification,
+            created_at=now,
+            updated_at=now,
+        )
+
+    @staticmethod
+    def _hash(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            encoded = part.encode("utf-8")
+            # Length-prefix each part so boundaries cannot be shifted.
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
@@ -1,8 +1,9 @@
 import logging
 import os
 import uuid
+from contextlib import asynccontextmanager
 from http import HTTPStatus
-from typing import Callable
+from typing import AsyncIterator, Callable
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,7 +11,10 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.api.routers.base_router import base_router
+from src.common.llm.client_pool import provider_pool
+from src.common.llm.http_client import aclose_http_clients
 from src.common.logging import setup_logging
+from src.config import config
 
 logger = logging.getLogger(__name__)
 setup_logging()
@@ -68,12 +72,22 @@ def setup_exception_handlers(app: FastAPI) -> None:
         )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the pooled LLM clients and close their connections."""
+    if config.LLM_WARM_UP_ON_STARTUP:
+        await provider_pool.awarm_up()
+    yield
+    await aclose_http_clients()
+
+
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
         title="AIDA Facet Inference API",
         description="API for inferring product facets using LLMs",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     setup_middleware(app)
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.common.concurrency import AdaptiveConcurrencyLimiter
+
+
+class Overloaded(Exception):
+    pass
+
+
+def _limiter(
+    initial_limit: int = 4, min_limit: int = 1, max_limit: int = 8
+) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(
+        "test",
+        initial_limit=initial_limit,
+        min_limit=min_limit,
+        max_limit=max_limit,
+        is_overload=lambda e: isinstance(e, Overloaded),
+    )
+
+
+async def _succeed(
+    limiter: AdaptiveConcurrencyLimiter, seconds: float = 0.0
+) -> None:
+    async with limiter.slot():
+        await asyncio.sleep(seconds)
+
+
+async def _fail(limiter: AdaptiveConcurrencyLimiter, error: Exception) -> None:
+    with pytest.raises(type(error)):
+        async with limiter.slot():
+            raise error
+
+
+def test_initial_limit_is_clamped():
+    assert _limiter(initial_limit=20).limit == 8
+    assert _limiter(initial_limit=0, min_limit=2).limit == 2
+
+
+def test_limits_must_be_ordered():
+    with pytest.raises(ValueError):
+        _limiter(min_limit=5, max_limit=4)
+
+
+@pytest.mark.asyncio
+async def test_successes_increase_limit_additively():
+    limiter = _limiter(initial_limit=4)
+
+    for _ in range(4):
+        await _succeed(limiter)
+
+    # About one more slot per window of `limit` successes.
+    assert 4.9 < limiter.limit < 5.1
+    assert limiter.stats().successes == 4
+
+
+@pytest.mark.asyncio
+async def test_limit_does_not_grow_past_max():
+    limiter = _limiter(initial_limit=8, max_limit=8)
+
+    for _ in range(20):
+        await _succeed(limiter)
+
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_overload_halves_limit_down_to_min():
+    limiter = _limiter(initial_limit=8, min_limit=3)
+
+    await _fail(limiter, Overloaded())
+    assert limiter.limit == 4
+    await _fail(limiter, Overloaded())
+    assert limiter.limit == 3
+    assert limiter.stats().overloads == 2
+
+
+@pytest.mark.asyncio
+async def test_overloads_within_one_latency_decrease_once():
+    limiter = _limiter(initial_limit=8)
+    await _succeed(limiter, seconds=0.2)
+    limit = limiter.limit
+
+    await _fail(limiter, Overloaded())
+    await _fail(limiter, Overloaded())
+
+    assert limiter.limit == limit / 2
+    assert limiter.stats().overloads == 2
+
+
+@pytest.mark.asyncio
+async def test_other_errors_leave_limit_unchanged():
+    limiter = _limiter(initial_limit=4)
+
+    await _fail(limiter, ValueError("bad request"))
+
+    assert limiter.limit == 4
+    assert limiter.stats().errors == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_admits_at_most_limit_calls():
+    limiter = _limiter(initial_limit=2, max_limit=2)
+    release = asyncio.Event()
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.stats().in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(call()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert limiter.stats().in_flight == 2
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert peak == 2
+    assert limiter.stats().in_flight == 0
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from src.common.concurrency import WorkerPool
+
+
+async def _double(item: int) -> int:
+    await asyncio.sleep(0)
+    return item * 2
+
+
+async def _fail_on_three(item: int) -> int:
+    if item == 3:
+        raise ValueError("three")
+    return item
+
+
+async def _collect(pool: WorkerPool, items) -> list:
+    return [result async for result in pool.map(items)]
+
+
+@pytest.mark.asyncio
+async def test_map_yields_every_result():
+    pool = WorkerPool(_double, size=3)
+
+    results = await _collect(pool, range(10))
+
+    assert sorted(results) == [i * 2 for i in range(10)]
+    stats = pool.stats()
+    assert stats.submitted == stats.completed == 10
+    assert stats.failed == 0
+    assert stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_map_accepts_async_iterables():
+    async def items():
+        for i in range(5):
+            yield i
+
+    results = await _collect(WorkerPool(_double, size=2), items())
+
+    assert sorted(results) == [0, 2, 4, 6, 8]
+
+
+@pytest.mark.asyncio
+async def test_error_without_handler_is_raised_to_consumer():
+    pool = WorkerPool(_fail_on_three, size=2)
+
+    with pytest.raises(ValueError, match="three"):
+        await _collect(pool, range(10))
+
+
+@pytest.mark.asyncio
+async def test_error_handler_drops_item_and_carries_on():
+    errors: list[tuple[int, Exception]] = []
+    pool = WorkerPool(
+        _fail_on_three,
+        size=2,
+        on_error=lambda item, e: errors.append((item, e)),
+    )
+
+    results = await _collect(pool, range(6))
+
+    assert sorted(results) == [0, 1, 2, 4, 5]
+    assert [item for item, _ in errors] == [3]
+    assert isinstance(errors[0][1], ValueError)
+    assert pool.stats().failed == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_error_handler_does_not_hang_the_pool():
+    def on_error(item: int, error: Exception) -> None:
+        raise RuntimeError("handler broke")
+
+    pool = WorkerPool(_fail_on_three, size=2, on_error=on_error)
+
+    results = await asyncio.wait_for(_collect(pool, range(6)), timeout=5)
+
+    assert sorted(results) == [0, 1, 2, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_feeder_error_is_raised_after_workers_stop():
+    def items():
+        yield 1
+        yield 2
+        raise KeyError("source broke")
+
+    pool = WorkerPool(_double, size=2)
+
+    with pytest.raises(KeyError, match="source broke"):
+        await asyncio.wait_for(_collect(pool, items()), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_closing_the_consumer_cancels_workers():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow(item: int) -> int:
+        if item == 0:
+            return item
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return item
+
+    pool = WorkerPool(slow, size=2)
+    results = pool.map(range(3))
+    assert await results.__anext__() == 0
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    await results.aclose()
+
+    assert cancelled.is_set()
+    assert pool.stats().in_flight == 0
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        WorkerPool(_double, size=0)
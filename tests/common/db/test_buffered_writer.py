@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from src.common.db.buffered_writer import BufferedWriter
+
+
+class Sink:
+    """Flush target that can be made to fail."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[int]] = []
+        self.failing = False
+
+    async def flush(self, batch: list[int]) -> None:
+        if self.failing:
+            raise OSError("database down")
+        self.batches.append(list(batch))
+
+    @property
+    def rows(self) -> list[int]:
+        return [row for batch in self.batches for row in batch]
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_flushed_as_they_fill():
+    sink = Sink()
+    writer = BufferedWriter(sink.flush, max_batch_size=3, flush_interval=0)
+
+    for i in range(7):
+        await writer.add(i)
+
+    assert sink.batches == [[0, 1, 2], [3, 4, 5]]
+    assert writer.stats().buffered == 1
+
+
+@pytest.mark.asyncio
+async def test_closing_flushes_what_is_left():
+    sink = Sink()
+    async with BufferedWriter(
+        sink.flush, max_batch_size=10, flush_interval=0
+    ) as writer:
+        await writer.add(1)
+        await writer.add(2)
+
+    assert sink.rows == [1, 2]
+    stats = writer.stats()
+    assert stats.rows_written == 2
+    assert stats.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_rows_are_flushed_periodically():
+    sink = Sink()
+    async with BufferedWriter(
+        sink.flush, max_batch_size=100, flush_interval=0.01
+    ) as writer:
+        await writer.add(1)
+        await asyncio.sleep(0.05)
+
+        assert sink.rows == [1]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_from_add_keeps_rows_without_raising():
+    sink = Sink()
+    writer = BufferedWriter(
+        sink.flush, max_batch_size=2, flush_interval=0, max_buffered=10
+    )
+    sink.failing = True
+
+    for i in range(4):
+        await writer.add(i)
+
+    assert writer.stats().buffered == 4
+    sink.failing = False
+    await writer.flush()
+    assert sink.rows == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_explicit_flush_failure_is_raised_and_rows_kept():
+    sink = Sink()
+    writer = BufferedWriter(sink.flush, max_batch_size=5, flush_interval=0)
+    await writer.add(1)
+    sink.failing = True
+
+    with pytest.raises(OSError):
+        await writer.flush()
+
+    assert writer.stats().buffered == 1
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_rejects_rows_while_flushes_fail():
+    sink = Sink()
+    writer = BufferedWriter(
+        sink.flush, max_batch_size=2, flush_interval=0, max_buffered=4
+    )
+    sink.failing = True
+    for i in range(4):
+        await writer.add(i)
+
+    with pytest.raises(OSError):
+        await writer.add(4)
+
+    # The rejected row was not buffered.
+    assert writer.stats().buffered == 4
+    sink.failing = False
+    await writer.add(5)
+    await writer.aclose()
+    assert sink.rows == [0, 1, 2, 3, 5]
+
+
+def test_max_buffered_is_at_least_one_batch():
+    writer = BufferedWriter(
+        Sink().flush, max_batch_size=10, flush_interval=0, max_buffered=3
+    )
+
+    assert writer.max_buffered == 10
+    assert (
+        BufferedWriter(Sink().flush, max_batch_size=10, flush_interval=0)
+    ).max_buffered == 100
@@ -0,0 +1,135 @@
+import pytest
+
+from src.common.llm import pricing
+from src.common.llm.accounting import LlmCall, LlmCallLedger, metered_usage
+from src.common.llm.base_classes import LlmUsage
+from src.common.llm.pricing import ModelPrice, parse_prices, usage_cost
+from src.common.llm.usage import LlmStageUsage
+from src.config import config
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    monkeypatch.setattr(
+        config, "LLM_MODEL_PRICES", "cheap:1:4:0.5, premium:10:40"
+    )
+    pricing._configured_prices.cache_clear()
+    yield
+    pricing._configured_prices.cache_clear()
+
+
+def test_parse_prices():
+    prices = parse_prices("gpt-4o-mini:0.15:0.6:0.075, gpt-4o:2.5:10,")
+
+    assert prices["gpt-4o-mini"] == ModelPrice(
+        input=0.15, output=0.6, cached_input=0.075
+    )
+    # Cached input defaults to the input price.
+    assert prices["gpt-4o"].cached_input == 2.5
+
+
+@pytest.mark.parametrize("spec", ["model:1", "model:1:2:3:4", "model:a:b"])
+def test_parse_prices_rejects_malformed_entries(spec: str):
+    with pytest.raises(ValueError):
+        parse_prices(spec)
+
+
+def test_cost_charges_cached_input_at_its_own_price():
+    price = ModelPrice(input=2.0, output=8.0, cached_input=0.5)
+    usage = LlmStageUsage(
+        stage="classify",
+        input_tokens=1_000_000,
+        cached_input_tokens=400_000,
+        output_tokens=100_000,
+    )
+
+    assert price.cost(usage) == pytest.approx(1.2 + 0.2 + 0.8)
+
+
+def test_usage_cost_is_none_for_unpriced_models(prices):
+    usage = LlmStageUsage(stage="classify", input_tokens=10)
+
+    assert usage_cost("unknown", usage) is None
+    assert usage_cost("cheap", usage) == pytest.approx(10 / 1_000_000)
+
+
+def test_call_prices_each_response_at_the_model_that_served_it(prices):
+    call = LlmCall(model="cheap", stage="classify")
+
+    call.add(LlmUsage(input_tokens=1_000_000, output_tokens=0))
+    call.add(LlmUsage(input_tokens=1_000_000, output_tokens=0), "premium")
+
+    assert call.cost_usd == pytest.approx(1.0 + 10.0)
+    assert call.model == "premium"
+
+
+def test_call_applies_the_price_factor(prices):
+    call = LlmCall(model="cheap", stage="classify_batch")
+
+    call.add(
+        LlmUsage(input_tokens=1_000_000, output_tokens=250_000),
+        price_factor=0.5,
+    )
+
+    assert call.cost_usd == pytest.approx((1.0 + 1.0) * 0.5)
+
+
+def test_unpriced_call_has_no_cost(prices):
+    call = LlmCall(model="unknown", stage="classify")
+
+    call.add(LlmUsage(input_tokens=100, output_tokens=10))
+
+    assert call.cost_usd is None
+
+
+def test_ledger_totals_per_model_and_stage(prices):
+    ledger = LlmCallLedger()
+    for model in ("cheap", "cheap", "premium"):
+        with ledger.call(model, "referee") as call:
+            call.add(LlmUsage(input_tokens=1_000_000, output_tokens=0))
+    with pytest.raises(ValueError):
+        with ledger.call("cheap", "referee"):
+            raise ValueError("failed")
+
+    totals = {stats.model: stats for stats in ledger.stats()}
+
+    assert totals["cheap"].calls == 3
+    assert totals["cheap"].failures == 1
+    assert totals["cheap"].cost_usd == pytest.approx(2.0)
+    assert totals["premium"].cost_usd == pytest.approx(10.0)
+
+
+def test_since_subtracts_cost(prices):
+    ledger = LlmCallLedger()
+    with ledger.call("cheap", "classify") as call:
+        call.add(LlmUsage(input_tokens=1_000_000, output_tokens=0))
+    (earlier,) = ledger.stats()
+    with ledger.call("cheap", "classify") as call:
+        call.add(LlmUsage(input_tokens=3_000_000, output_tokens=0))
+    (later,) = ledger.stats()
+
+    new = later.since(earlier)
+
+    assert new.calls == 1
+    assert new.input_tokens == 3_000_000
+    assert new.cost_usd == pytest.approx(3.0)
+
+
+def test_metered_usage_sums_responses_inside_the_block():
+    ledger = LlmCallLedger()
+    with metered_usage() as usage:
+        for _ in range(2):
+            with ledger.call("cheap", "referee") as call:
+                call.add(
+                    LlmUsage(
+                        input_tokens=100,
+                        output_tokens=10,
+                        cached_input_tokens=40,
+                    )
+                )
+    with ledger.call("cheap", "referee") as call:
+        call.add(LlmUsage(input_tokens=1, output_tokens=1))
+
+    assert usage == LlmUsage(
+        input_tokens=200, output_tokens=20, cached_input_tokens=80
+    )
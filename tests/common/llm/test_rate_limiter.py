@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import pytest
+
+from src.common.llm.rate_limiter import (
+    RateLimiter,
+    _Bucket,
+    parse_duration,
+    retry_after,
+)
+
+
+def test_bucket_reserves_without_delay_while_level_covers_it():
+    bucket = _Bucket(60)
+    now = bucket.updated
+
+    assert bucket.reserve(60, now) == 0.0
+    # Overdrawn by 30 at 60 per minute: 30 seconds to refill to zero.
+    assert bucket.reserve(30, now) == pytest.approx(30.0)
+
+
+def test_bucket_refills_continuously_up_to_limit():
+    bucket = _Bucket(60)
+    now = bucket.updated
+    bucket.reserve(60, now)
+
+    assert bucket.fraction(now + 30) == pytest.approx(0.5)
+    assert bucket.fraction(now + 600) == 1.0
+
+
+def test_bucket_refund_is_capped_at_limit():
+    bucket = _Bucket(60)
+    now = bucket.updated
+    bucket.reserve(10, now)
+
+    bucket.refund(100, now)
+
+    assert bucket.level == 60
+
+
+def test_unlimited_bucket_never_delays():
+    bucket = _Bucket(None)
+
+    assert bucket.reserve(10**9, time.monotonic()) == 0.0
+    assert bucket.fraction(time.monotonic()) == 1.0
+
+
+def test_limits_are_scaled_by_headroom():
+    limiter = RateLimiter(
+        "test", requests_per_minute=100, tokens_per_minute=1000, headroom=0.5
+    )
+
+    stats = limiter.stats()
+    assert stats.requests_per_minute == 50
+    assert stats.tokens_per_minute == 500
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_once_the_token_bucket_is_empty():
+    # 6000 tokens per minute refill at 100 per second.
+    limiter = RateLimiter("test", tokens_per_minute=6000, headroom=1.0)
+    await limiter.acquire(6000)
+
+    started = time.perf_counter()
+    await limiter.acquire(10)
+
+    assert time.perf_counter() - started >= 0.05
+    assert limiter.stats().admitted == 2
+
+
+def test_settle_refunds_overestimated_tokens():
+    limiter = RateLimiter("test", tokens_per_minute=1000, headroom=1.0)
+    limiter.acquire_blocking(800)
+
+    limiter.settle(800, 200)
+
+    assert limiter.available() == pytest.approx(0.8, abs=0.01)
+
+
+def test_settle_charges_underestimated_tokens():
+    limiter = RateLimiter("test", tokens_per_minute=1000, headroom=1.0)
+    limiter.acquire_blocking(200)
+
+    limiter.settle(200, 700)
+
+    assert limiter.available() == pytest.approx(0.3, abs=0.01)
+
+
+def test_release_returns_the_whole_reservation():
+    limiter = RateLimiter(
+        "test", requests_per_minute=10, tokens_per_minute=1000, headroom=1.0
+    )
+    limiter.acquire_blocking(900)
+    assert limiter.available() == pytest.approx(0.1, abs=0.01)
+
+    limiter.release(900)
+
+    assert limiter.available() == pytest.approx(1.0)
+
+
+def test_limits_are_learned_from_headers():
+    limiter = RateLimiter("test", headroom=0.5)
+
+    limiter.update_from_headers(
+        {
+            "X-RateLimit-Limit-Requests": "100",
+            "X-RateLimit-Limit-Tokens": "10000",
+            "X-RateLimit-Remaining-Tokens": "5000",
+        }
+    )
+
+    stats = limiter.stats()
+    assert stats.requests_per_minute == 50
+    assert stats.tokens_per_minute == 5000
+    # 5000 left, less the 2500 the headroom keeps back, of a 5000 bucket.
+    assert limiter.available() == pytest.approx(0.5, abs=0.01)
+
+
+def test_rate_limited_pauses_admission():
+    limiter = RateLimiter("test")
+
+    limiter.on_rate_limited(retry_after=30)
+
+    assert limiter.available() == 0.0
+    assert limiter.stats().rate_limited == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [("1.5", 1.5), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m", 3720.0)],
+)
+def test_parse_duration(value: str, seconds: float):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+def test_parse_duration_rejects_unknown_formats():
+    assert parse_duration("soon") is None
+
+
+def test_retry_after_prefers_explicit_headers():
+    assert retry_after({"retry-after-ms": "250", "retry-after": "9"}) == 0.25
+    assert retry_after({"Retry-After": "2"}) == 2.0
+    assert (
+        retry_after(
+            {
+                "x-ratelimit-reset-requests": "1s",
+                "x-ratelimit-reset-tokens": "6m0s",
+            }
+        )
+        == 360.0
+    )
+    assert retry_after({}) is None
+
+
+def test_acquire_works_across_event_loops():
+    limiter = RateLimiter("test", tokens_per_minute=10**6)
+
+    asyncio.run(limiter.acquire(10))
+    asyncio.run(limiter.acquire(10))
+
+    assert limiter.stats().admitted == 2
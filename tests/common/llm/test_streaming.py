@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from src.common.llm.streaming import IncrementalJsonParser
+
+OUTPUT = {
+    "colour_status": "MATCH",
+    "confidence": 0.93,
+    "escalate": False,
+    "note": None,
+    "tags": ["blue", {"shade": 'navy "dark" }]'}],
+    "colour_justification": 'Mostly blue, with a \\ and a "quote".',
+}
+
+
+def _feed_in_chunks(
+    parser: IncrementalJsonParser, text: str, size: int
+) -> list[tuple[str, object]]:
+    fields = []
+    for i in range(0, len(text), size):
+        fields.extend(parser.feed(text[i : i + size]))
+    return fields
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1000])
+def test_fields_match_json_however_the_text_is_chunked(size: int):
+    parser = IncrementalJsonParser()
+
+    fields = _feed_in_chunks(parser, json.dumps(OUTPUT, indent=2), size)
+
+    assert fields == list(OUTPUT.items())
+    assert parser.fields == OUTPUT
+    assert parser.done
+
+
+def test_field_is_returned_as_soon_as_its_value_is_complete():
+    parser = IncrementalJsonParser()
+
+    assert parser.feed('{"colour_status": "MAT') == []
+    assert parser.feed('CH", "colour_justification": "Mostly') == [
+        ("colour_status", "MATCH")
+    ]
+    assert not parser.done
+
+
+def test_scalar_waits_for_its_delimiter():
+    parser = IncrementalJsonParser()
+
+    # "12" could still be the start of 123.
+    assert parser.feed('{"count": 12') == []
+    assert parser.feed("3}") == [("count", 123)]
+    assert parser.done
+
+
+def test_text_before_the_object_is_ignored():
+    parser = IncrementalJsonParser()
+
+    fields = parser.feed('```json\n{"a": 1}\n```')
+
+    assert fields == [("a", 1)]
+
+
+def test_malformed_text_stops_the_parser():
+    parser = IncrementalJsonParser()
+
+    assert parser.feed('{"a": 1 "b": 2}') == [("a", 1)]
+    assert parser.done
+    assert parser.feed('{"c": 3}') == []
+
+
+def test_text_after_the_object_is_ignored():
+    parser = IncrementalJsonParser()
+
+    assert parser.feed('{"a": true} {"b": false}') == [("a", True)]
+    assert parser.feed(', "c": 1}') == []
+
+
+def test_long_value_fed_in_small_chunks_is_scanned_once():
+    parser = IncrementalJsonParser()
+    text = json.dumps({"justification": "x" * 200_000, "done": True})
+
+    fields = _feed_in_chunks(parser, text, 10)
+
+    assert fields[-1] == ("done", True)
+    # Consumed text is dropped, so the buffer does not hold the value.
+    assert len(parser._buffer) < 10
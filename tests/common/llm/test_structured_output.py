@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from src.common.llm.errors import LlmOutputParseError
+from src.common.llm.structured_output import (
+    parse_items,
+    parse_output,
+    repair_json,
+    strict_json_schema,
+)
+
+
+class Verdict(BaseModel):
+    colour_status: str
+    confidence: float = 1.0
+
+
+class Listing(BaseModel):
+    title: str
+    default: str | None = None
+    verdict: Verdict
+
+
+def test_strict_schema_closes_objects_and_requires_every_property():
+    schema = strict_json_schema(Verdict)
+
+    assert schema["required"] == ["colour_status", "confidence"]
+    assert schema["additionalProperties"] is False
+    assert "title" not in schema
+    assert "default" not in schema["properties"]["confidence"]
+
+
+def test_strict_schema_keeps_properties_named_like_keywords():
+    schema = strict_json_schema(Listing)
+
+    assert set(schema["properties"]) == {"title", "default", "verdict"}
+    assert schema["required"] == ["title", "default", "verdict"]
+    assert schema["properties"]["title"] == {"type": "string"}
+    nested = schema["$defs"]["Verdict"]
+    assert nested["additionalProperties"] is False
+    assert nested["required"] == ["colour_status", "confidence"]
+
+
+def test_repair_strips_fences_and_surrounding_text():
+    text = 'Here you go:\n```json\n{"colour_status": "MATCH"}\n```'
+
+    assert repair_json(text)[0] == '{"colour_status": "MATCH"}'
+
+
+def test_repair_drops_trailing_commas():
+    candidate = repair_json('{"tags": ["a", "b",], "x": 1,}')[0]
+
+    assert json.loads(candidate) == {"tags": ["a", "b"], "x": 1}
+
+
+def test_repair_closes_truncated_output():
+    candidates = repair_json('{"colour_status": "MATCH", "note": "cut of')
+
+    assert json.loads(candidates[0]) == {
+        "colour_status": "MATCH",
+        "note": "cut of",
+    }
+    # Falling back to the last complete member.
+    assert json.loads(candidates[-1]) == {"colour_status": "MATCH"}
+
+
+def test_repair_gives_up_without_json():
+    assert repair_json("no json here") == []
+    assert repair_json('{"a": [1}') == []
+
+
+def test_parse_output_reports_whether_it_repaired():
+    verdict, repaired = parse_output(Verdict, '{"colour_status": "MATCH"}')
+    assert verdict == Verdict(colour_status="MATCH")
+    assert not repaired
+
+    verdict, repaired = parse_output(
+        Verdict, '```\n{"colour_status": "MISMATCH", "confidence": 0.4,}\n```'
+    )
+    assert verdict == Verdict(colour_status="MISMATCH", confidence=0.4)
+    assert repaired
+
+
+def test_parse_output_raises_with_the_content():
+    with pytest.raises(LlmOutputParseError) as raised:
+        parse_output(Verdict, '{"confidence": 0.5}')
+
+    assert raised.value.content == '{"confidence": 0.5}'
+
+
+def test_parse_items_skips_invalid_items():
+    content = (
+        '{"items": [{"colour_status": "MATCH"}, {"confidence": 1}, '
+        '{"colour_status": "MISMATCH", "confidence": 0.2}, {"colour_st'
+    )
+
+    items = parse_items(Verdict, content, "items")
+
+    assert [item.colour_status for item in items] == ["MATCH", "MISMATCH"]
+
+
+def test_parse_items_without_the_list_is_empty():
+    assert parse_items(Verdict, '{"other": []}', "items") == []
+    assert parse_items(Verdict, "nothing", "items") == []
@@ -0,0 +1,84 @@
+from typing import Any, cast
+from uuid import UUID, uuid4
+
+from src.core.image_text_alignment.batch_runner import (
+    BatchRunner,
+    _ProgressTracker,
+)
+
+KEYS = [str(UUID(int=i)) for i in range(1, 6)]
+
+
+def _dispatched(low_water: UUID | None = None) -> _ProgressTracker:
+    tracker = _ProgressTracker(low_water)
+    for key in KEYS:
+        tracker.dispatch(key)
+    return tracker
+
+
+def test_low_water_starts_at_the_checkpoint():
+    checkpoint = UUID(int=0)
+
+    assert _dispatched(checkpoint).low_water == checkpoint
+    assert _ProgressTracker(None).low_water is None
+
+
+def test_low_water_follows_in_order_completion():
+    tracker = _dispatched()
+
+    tracker.complete(KEYS[0])
+    assert tracker.low_water == UUID(KEYS[0])
+    tracker.complete(KEYS[1])
+    assert tracker.low_water == UUID(KEYS[1])
+
+
+def test_low_water_waits_for_the_oldest_pending_key():
+    tracker = _dispatched()
+
+    tracker.complete(KEYS[1])
+    tracker.complete(KEYS[2])
+    assert tracker.low_water is None
+
+    tracker.complete(KEYS[0])
+    assert tracker.low_water == UUID(KEYS[2])
+    assert list(tracker._pending) == KEYS[3:]
+
+
+def test_completing_every_key_empties_pending():
+    tracker = _dispatched()
+
+    for key in reversed(KEYS):
+        tracker.complete(key)
+
+    assert tracker.low_water == UUID(KEYS[-1])
+    assert not tracker._pending
+
+
+def test_unknown_or_repeated_keys_are_ignored():
+    tracker = _dispatched()
+    tracker.complete(KEYS[0])
+
+    tracker.complete(KEYS[0])
+    tracker.complete(str(uuid4()))
+
+    assert tracker.low_water == UUID(KEYS[0])
+    assert list(tracker._pending) == KEYS[1:]
+
+
+def test_failed_products_complete_and_are_queued_for_retry():
+    runner = BatchRunner(cast(Any, None), batch_key=uuid4())
+    runner._tracker = _dispatched()
+    runner._tracker.complete(KEYS[0])
+
+    runner._record_failure("classify", KEYS[1:3], KeyError("boom"))
+    runner._tracker.complete(KEYS[3])
+
+    assert runner._tracker.low_water == UUID(KEYS[3])
+    assert [record.product_key for record in runner._failures] == [
+        UUID(key) for key in KEYS[1:3]
+    ]
+    failure = runner._failures[0]
+    assert failure.batch_key == runner.batch_key
+    assert failure.stage == "classify"
+    assert failure.error == "KeyError: 'boom'"
+    assert failure.attempts == 1